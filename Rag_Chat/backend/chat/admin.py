@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import User, Chat, SearchLog, RagData, MetaData
+from .models import User, Chat, SearchLog, RagData, MetaData, VectorDocument
 
 @admin.register(User)
 class UserAdmin(admin.ModelAdmin):
@@ -39,3 +39,10 @@ class MetaDataAdmin(admin.ModelAdmin):
         }),
     )
     readonly_fields = ('last_updated',)
+
+@admin.register(VectorDocument)
+class VectorDocumentAdmin(admin.ModelAdmin):
+    list_display = ('key', 'batch', 'source', 'sheet', 'doc_id', 'chunk_id', 'last_updated')
+    list_filter = ('source', 'sheet')
+    search_fields = ('key', 'batch', 'doc_id', 'chunk_id')
+    readonly_fields = ('last_updated',)
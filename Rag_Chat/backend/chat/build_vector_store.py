@@ -21,6 +21,7 @@ django.setup()
 from .vector_metadata import VectorMetadataManager
 from .utils import MetaDataManager
 from .providers import provider_manager
+from .retrieval_filters import add_field_metadata
 
 logger = logging.getLogger(__name__)
 
@@ -98,11 +99,12 @@ def load_excel_data(file_path: str):
     
     return all_docs
 
-def build_vector_store():
+def build_vector_store(incremental: bool = False):
     '''
     RAG를 구축하는 시점과 RAG를 사용하는 시점을 분리
     서버 구동 시 한 번만 실행하기
     메타데이터를 별도로 저장하여 검색 성능 최적화
+    incremental=True 이면 변경된 청크만 임베딩하고 사라진 청크는 삭제
     '''
     try:
         # Generate an ID for this build process
@@ -154,6 +156,9 @@ def build_vector_store():
             })
             enhanced_docs.append(doc)
         
+        # Catalogue columns as field_* metadata so searches can filter on them
+        add_field_metadata(enhanced_docs)
+        
         # Store the original docs metadata
         VectorMetadataManager.store_vector_batch_metadata(
             enhanced_docs,
@@ -180,7 +185,11 @@ def build_vector_store():
         )
         
         # Chroma 벡터스토어 생성 및 저장
-        vector_store = provider_manager.create_vector_store_from_documents(splits)
+        # CSV 청크만 동기화하고 다른 소스(excel)의 청크는 유지
+        from .indexing import sync_index_version
+        sync_result, vector_store = sync_index_version(splits, source="csv", full=not incremental)
+        if not incremental:
+            sync_result = None
         
         # 저장 확인
         doc_count = vector_store._collection.count()
@@ -197,7 +206,9 @@ def build_vector_store():
                 "status": "completed",
                 "document_count": doc_count,
                 "chunk_count": len(splits),
-                "vector_store_path": vector_store._persist_directory
+                "vector_store_path": vector_store._persist_directory,
+                "incremental": incremental,
+                "index_changes": sync_result.as_dict() if sync_result else None
             },
             description="Latest vector store build information"
         )
@@ -218,7 +229,8 @@ def build_vector_store():
         return {
             "status": "success",
             "build_id": build_id,
-            "document_count": doc_count
+            "document_count": doc_count,
+            "index_changes": sync_result.as_dict() if sync_result else None
         }
         
     except Exception as e:
@@ -0,0 +1,300 @@
+"""Incremental, content-hashed vector index builds.
+
+Every chunk gets a deterministic ID derived from its page content and its
+stable metadata. Syncing a new set of chunks against the store therefore only
+embeds chunks whose ID is not indexed yet and deletes IDs that vanished from
+the source; unchanged chunks are never re-embedded. New chunks are embedded
+through the provider's batched :class:`EmbeddingScheduler`. The resulting
+per-chunk manifest is written next to the Chroma files as
+``index_manifest.json``, together with the BM25 and catalogue side indexes
+(``lexical_index.json``, ``catalogue_index.json``).
+
+Syncs may be scoped to one ingestion source (``"csv"`` or ``"excel"``): the
+chunks are stamped with ``ingest_source`` and only that source's chunks are
+compared and deleted, so syncing one source never touches the other.
+
+``sync_index_version`` applies a sync blue/green: it copies the active index
+into a new version, syncs and validates the copy, and only then flips the
+active pointer.
+"""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from langchain.schema import Document
+
+from .providers import provider_manager
+from .providers.embedding_scheduler import EmbeddingScheduler
+from .providers.index_versions import validate_vector_store
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "index_manifest.json"
+SOURCE_METADATA_KEY = "ingest_source"
+
+# Metadata regenerated on every run; hashing it would make every chunk look new.
+# The source stamp is excluded too so chunks indexed before it keep their IDs.
+VOLATILE_METADATA_KEYS = frozenset({
+    "batch_id",
+    "build_id",
+    "chunk_id",
+    "chunk_index",
+    "doc_id",
+    "original_index",
+    "processing_time",
+    SOURCE_METADATA_KEY,
+})
+
+
+def chunk_fingerprint(document: Document) -> str:
+    """Return a SHA-256 of the chunk content and its stable metadata."""
+    stable_metadata = {
+        key: value
+        for key, value in (document.metadata or {}).items()
+        if key not in VOLATILE_METADATA_KEYS
+    }
+    payload = json.dumps(
+        {"content": document.page_content, "metadata": stable_metadata},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def stamp_source(documents: Iterable[Document], source: str) -> None:
+    """Record which ingestion source owns each chunk."""
+    for document in documents:
+        document.metadata = {**(document.metadata or {}), SOURCE_METADATA_KEY: source}
+
+
+def keyed_documents(documents: Iterable[Document], source: Optional[str] = None) -> Dict[str, Document]:
+    """Stamp ``source`` (if given) on each chunk and key the chunks by fingerprint.
+
+    Full builds and syncs both store chunks under these IDs, so a later sync
+    recognises every chunk instead of re-embedding it.
+    """
+    documents = list(documents)
+    if source is not None:
+        stamp_source(documents, source)
+    keyed: Dict[str, Document] = {}
+    for document in documents:
+        keyed.setdefault(chunk_fingerprint(document), document)
+    return keyed
+
+
+@dataclass
+class IndexSyncResult:
+    """Summary of one incremental sync."""
+
+    added: int
+    deleted: int
+    unchanged: int
+    total: int
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.deleted)
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+class IncrementalIndexer:
+    """Synchronise a Chroma collection with a list of chunks by content hash."""
+
+    def __init__(
+        self,
+        vector_store=None,
+        persist_directory: Optional[str] = None,
+        batch_size: int = 256,
+        scheduler: Optional[EmbeddingScheduler] = None,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+    ):
+        self.vector_store = vector_store
+        self.persist_directory = persist_directory or provider_manager.get_vector_store_path()
+        self.batch_size = batch_size
+        self.scheduler = scheduler
+        self.progress_callback = progress_callback
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.persist_directory, MANIFEST_FILENAME)
+
+    def _get_vector_store(self):
+        if self.vector_store is None:
+            self.vector_store = provider_manager.get_vector_store()
+        return self.vector_store
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """Return the manifest of the last sync, or an empty one."""
+        try:
+            with open(self.manifest_path, encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return {"chunks": {}}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable index manifest {self.manifest_path}: {str(e)}")
+            return {"chunks": {}}
+
+    def _write_manifest(self, chunks: Dict[str, Dict[str, Any]]) -> None:
+        os.makedirs(self.persist_directory, exist_ok=True)
+        manifest = {
+            "updated_at": datetime.datetime.now().isoformat(),
+            "chunk_count": len(chunks),
+            "chunks": chunks,
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, ensure_ascii=False)
+        os.replace(tmp_path, self.manifest_path)
+
+    def write_index_files(self, indexed_documents: Dict[str, Document]) -> None:
+        """Write the manifest and the side indexes for every indexed chunk."""
+        self._write_manifest({
+            chunk_id: {
+                "source": document.metadata.get("source"),
+                SOURCE_METADATA_KEY: document.metadata.get(SOURCE_METADATA_KEY),
+                "content_length": len(document.page_content),
+            }
+            for chunk_id, document in indexed_documents.items()
+        })
+        provider_manager.save_side_indexes(indexed_documents.values(), self.persist_directory)
+
+    def _indexed_ids(self, vector_store, source: Optional[str] = None) -> set:
+        # The collection is the source of truth: it also catches chunks that
+        # were appended by earlier full builds with random IDs
+        if source is None:
+            return set(vector_store._collection.get(include=[])["ids"])
+        return set(vector_store._collection.get(where={SOURCE_METADATA_KEY: source}, include=[])["ids"])
+
+    def _stamp_existing(self, vector_store, documents: Dict[str, Document], ids: List[str]) -> List[str]:
+        """Stamp already-indexed chunks that predate the source stamp; return the rest."""
+        existing = set(vector_store._collection.get(ids=ids, include=[])["ids"]) if ids else set()
+        if existing:
+            stamped = sorted(existing)
+            vector_store._collection.update(
+                ids=stamped,
+                metadatas=[documents[chunk_id].metadata for chunk_id in stamped],
+            )
+        return [chunk_id for chunk_id in ids if chunk_id not in existing]
+
+    def _other_source_documents(self, vector_store, source: str) -> Dict[str, Document]:
+        """Chunks in the collection that belong to other sources."""
+        stored = vector_store._collection.get(include=["documents", "metadatas"])
+        return {
+            chunk_id: Document(page_content=text or "", metadata=metadata or {})
+            for chunk_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"])
+            if (metadata or {}).get(SOURCE_METADATA_KEY) != source
+        }
+
+    def _add(self, vector_store, documents: List[Document], ids: List[str]) -> None:
+        scheduler = self.scheduler or provider_manager.get_embedding_scheduler()
+        vectors = scheduler.embed(
+            [document.page_content for document in documents],
+            progress_callback=self.progress_callback,
+        )
+        for start in range(0, len(documents), self.batch_size):
+            end = start + self.batch_size
+            vector_store._collection.upsert(
+                ids=ids[start:end],
+                embeddings=vectors[start:end],
+                documents=[document.page_content for document in documents[start:end]],
+                metadatas=[document.metadata or None for document in documents[start:end]],
+            )
+
+    def _delete(self, vector_store, ids: List[str]) -> None:
+        for start in range(0, len(ids), self.batch_size):
+            vector_store.delete(ids=ids[start:start + self.batch_size])
+
+    def sync(self, documents: List[Document], source: Optional[str] = None, full: bool = False) -> IndexSyncResult:
+        """Embed new or changed chunks and delete vanished ones.
+
+        With ``source`` only chunks stamped with that ingestion source are
+        considered indexed, and only they can be deleted; chunks of other
+        sources stay in place and in the side indexes. ``full`` re-embeds
+        every chunk, replacing all of the source's indexed chunks.
+        """
+        desired = keyed_documents(documents, source)
+
+        vector_store = self._get_vector_store()
+        indexed = self._indexed_ids(vector_store, source)
+
+        if full:
+            new_ids, stale_ids = list(desired), sorted(indexed - desired.keys())
+        else:
+            new_ids = [chunk_id for chunk_id in desired if chunk_id not in indexed]
+            stale_ids = sorted(indexed - desired.keys())
+        unchanged = len(desired) - len(new_ids)
+        if source is not None and not full:
+            # Chunks indexed before source stamping: stamp instead of re-embedding
+            to_embed = self._stamp_existing(vector_store, desired, new_ids)
+            unchanged += len(new_ids) - len(to_embed)
+            new_ids = to_embed
+
+        if stale_ids:
+            self._delete(vector_store, stale_ids)
+        if new_ids:
+            self._add(vector_store, [desired[chunk_id] for chunk_id in new_ids], new_ids)
+
+        indexed_documents = dict(desired)
+        if source is not None:
+            indexed_documents.update(self._other_source_documents(vector_store, source))
+        self.write_index_files(indexed_documents)
+
+        result = IndexSyncResult(
+            added=len(new_ids),
+            deleted=len(stale_ids),
+            unchanged=unchanged,
+            total=len(indexed_documents),
+        )
+        logger.info(
+            f"Incremental index sync: {result.added} added, {result.deleted} deleted, "
+            f"{result.unchanged} unchanged"
+        )
+        return result
+
+
+def sync_index_version(
+    documents: List[Document],
+    progress_callback: Optional[Callable[[int, int], None]] = None,
+    source: Optional[str] = None,
+    full: bool = False,
+) -> Tuple[IndexSyncResult, Any]:
+    """Incrementally sync a copy of the active index and activate it.
+
+    Returns the sync summary and the vector store now being served. When
+    nothing changed the copy is discarded and the active index is kept.
+    With ``source`` and ``full`` this is a full rebuild of one source merged
+    into a copy of the active index, keeping every other source's chunks.
+    """
+    versions = provider_manager.index_versions
+    version_id = versions.create_version(copy_active=True)
+    path = versions.version_path(version_id)
+    try:
+        vector_store = provider_manager.open_vector_store(path)
+        result = IncrementalIndexer(
+            vector_store=vector_store,
+            persist_directory=path,
+            progress_callback=progress_callback,
+        ).sync(documents, source=source, full=full)
+        if not result.changed:
+            provider_manager.discard_vector_store_version(version_id)
+            return result, provider_manager.get_vector_store()
+        validate_vector_store(
+            vector_store,
+            expected_count=result.total,
+            sample_queries=provider_manager.get_validation_queries(),
+        )
+    except Exception:
+        provider_manager.discard_vector_store_version(version_id)
+        raise
+    provider_manager.activate_vector_store_version(version_id)
+    return result, vector_store
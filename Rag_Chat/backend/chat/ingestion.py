@@ -0,0 +1,222 @@
+"""Vector ingestion jobs: load → split → embed → persist, off the request path.
+
+``ChatRagAPIView`` modes 1/2 create a job and hand it to the
+``run_ingestion_job`` Celery task. Job state lives in ``MetaData`` under
+``ingest_job_<id>`` so any worker can report progress (rows parsed, chunks
+embedded, throughput, ETA) and honour a cancellation request.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from django.conf import settings
+from django.utils.timezone import now
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.document_loaders import CSVLoader
+
+from .pipeline.base import call_in_worker
+from .providers import provider_manager
+from .retrieval_filters import add_field_metadata
+from .utils import MetaDataManager, RAGUtils
+
+logger = logging.getLogger(__name__)
+
+SOURCES = {"csv", "excel"}
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = {COMPLETED, FAILED, CANCELLED}
+
+# Persist embedding progress at most this often to spare the metadata table
+_PROGRESS_WRITE_INTERVAL = 1.0
+
+
+class IngestionCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested."""
+
+
+def _job_key(job_id: str) -> str:
+    return f"ingest_job_{job_id}"
+
+
+def _cancel_key(job_id: str) -> str:
+    # Kept apart from the job record so progress writes can never clobber it
+    return f"ingest_cancel_{job_id}"
+
+
+def create_job(source: str, incremental: bool = False) -> Dict[str, Any]:
+    """Register a pending ingestion job and return its state."""
+    if source not in SOURCES:
+        raise ValueError(f"Unsupported ingestion source: {source}")
+    job = {
+        "job_id": uuid.uuid4().hex,
+        "source": source,
+        "incremental": incremental,
+        "status": PENDING,
+        "created_at": now().isoformat(),
+        "rows_parsed": 0,
+        "chunks_total": 0,
+        "chunks_embedded": 0,
+    }
+    MetaDataManager.set(_job_key(job["job_id"]), job, description=f"Vector ingestion job ({source})")
+    return job
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Return the job state with derived throughput and ETA, or None."""
+    job = MetaDataManager.get(_job_key(job_id))
+    if not isinstance(job, dict):
+        return None
+    job["cancel_requested"] = bool(MetaDataManager.get(_cancel_key(job_id), False))
+    embedded = job.get("chunks_embedded", 0)
+    # Incremental jobs only embed new or changed chunks
+    total = job.get("chunks_to_embed") or job.get("chunks_total", 0)
+    started = job.get("embedding_started")
+    elapsed = (job.get("embedding_finished") or time.time()) - started if started else 0
+    throughput = embedded / elapsed if elapsed > 0 else 0.0
+    job["throughput_chunks_per_s"] = round(throughput, 2)
+    job["eta_seconds"] = (
+        round((total - embedded) / throughput, 1)
+        if job["status"] == RUNNING and throughput > 0 and total > embedded
+        else None
+    )
+    return job
+
+
+def update_job(job_id: str, **fields) -> Dict[str, Any]:
+    job = MetaDataManager.get(_job_key(job_id)) or {"job_id": job_id}
+    job.update(fields)
+    MetaDataManager.set(_job_key(job_id), job)
+    return job
+
+
+def request_cancel(job_id: str) -> Optional[Dict[str, Any]]:
+    """Flag a job for cancellation; a pending job is cancelled immediately."""
+    job = get_job(job_id)
+    if job is None or job["status"] in FINISHED_STATES:
+        return job
+    MetaDataManager.set(_cancel_key(job_id), True, description=f"Cancellation flag for ingestion job {job_id}")
+    if job["status"] == PENDING:
+        update_job(job_id, status=CANCELLED, finished_at=now().isoformat())
+    return get_job(job_id)
+
+
+def _check_cancelled(job_id: str) -> None:
+    if MetaDataManager.get(_cancel_key(job_id), False):
+        raise IngestionCancelled(job_id)
+
+
+def load_csv_documents(path: Optional[str] = None) -> List[Document]:
+    """Load one document per catalogue CSV row, with field_* metadata for filtering"""
+    loader = CSVLoader(file_path=path or os.path.join(settings.BASE_DIR, "galaxy_s25_data.csv"))
+    return add_field_metadata(loader.load())
+
+
+def load_excel_documents(path: Optional[str] = None) -> List[Document]:
+    """Load one document per row of every sheet, with image and field_* metadata"""
+    excel_path = path or os.path.join(settings.BASE_DIR, "galaxy_s25_data.xlsx")
+    sheets = pd.read_excel(excel_path, sheet_name=None, engine="openpyxl")
+    all_docs = []
+
+    # Determine sheet with images
+    sheet_names = list(sheets.keys())
+    second_sheet_name = sheet_names[1] if len(sheet_names) > 1 else None
+
+    for sheet_name, df in sheets.items():
+        for _, row in df.iterrows():
+            text = "\n".join(f"{col}: {row[col]}" for col in df.columns if pd.notna(row[col]))
+            metadata = {"sheet": sheet_name}
+
+            # Add image path if available
+            if sheet_name == second_sheet_name and "Image Path" in df.columns:
+                image_path = row.get("Image Path", None)
+                if pd.notna(image_path):
+                    metadata["image_path"] = image_path
+
+            all_docs.append(Document(page_content=text, metadata=metadata))
+    return add_field_metadata(all_docs)
+
+
+def split_documents(documents: List[Document]) -> List[Document]:
+    text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
+    return text_splitter.split_documents(documents)
+
+
+def load_source(source: str) -> List[Document]:
+    return load_csv_documents() if source == "csv" else load_excel_documents()
+
+
+def run_job(job_id: str) -> Dict[str, Any]:
+    """Execute an ingestion job synchronously, recording progress as it goes."""
+    job = get_job(job_id)
+    if job is None:
+        raise ValueError(f"Unknown ingestion job: {job_id}")
+    if job["status"] in FINISHED_STATES:
+        return job
+
+    update_job(job_id, status=RUNNING, started_at=now().isoformat())
+    last_write = [0.0]
+    job_thread = threading.get_ident()
+
+    def record_progress(completed: int, total: int) -> None:
+        _check_cancelled(job_id)
+        update_job(job_id, chunks_embedded=completed, chunks_to_embed=total)
+
+    def on_progress(completed: int, total: int) -> None:
+        current = time.time()
+        if completed < total and current - last_write[0] < _PROGRESS_WRITE_INTERVAL:
+            return
+        last_write[0] = current
+        if threading.get_ident() == job_thread:
+            record_progress(completed, total)
+        else:
+            # EmbeddingScheduler pool threads never see a request boundary
+            call_in_worker(record_progress, completed, total)
+
+    try:
+        documents = load_source(job["source"])
+        update_job(job_id, rows_parsed=len(documents))
+        _check_cancelled(job_id)
+
+        splits = split_documents(documents)
+        update_job(job_id, chunks_total=len(splits), embedding_started=time.time())
+        logger.info(f"Ingestion job {job_id}: {len(documents)} rows, {len(splits)} chunks")
+
+        index_changes = RAGUtils.record_vector_build(
+            splits,
+            incremental=job["incremental"],
+            progress_callback=on_progress,
+            source=job["source"],
+        )
+    except IngestionCancelled:
+        logger.info(f"Ingestion job {job_id} cancelled")
+        update_job(job_id, status=CANCELLED, finished_at=now().isoformat())
+        return get_job(job_id)
+    except Exception as e:
+        logger.error(f"Ingestion job {job_id} failed: {str(e)}")
+        update_job(job_id, status=FAILED, error=str(e), finished_at=now().isoformat())
+        return get_job(job_id)
+
+    embedded = (index_changes or {}).get("added", len(splits))
+    update_job(
+        job_id,
+        status=COMPLETED,
+        chunks_embedded=embedded,
+        chunks_to_embed=embedded,
+        embedding_finished=time.time(),
+        finished_at=now().isoformat(),
+        index_changes=index_changes,
+        vector_store_path=provider_manager.get_vector_store_path(),
+    )
+    return get_job(job_id)
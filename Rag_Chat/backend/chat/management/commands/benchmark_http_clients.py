@@ -0,0 +1,138 @@
+from django.core.management.base import BaseCommand
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import socket
+import threading
+import time
+
+import httpx
+from langchain_core.messages import HumanMessage
+
+from ...providers.manager import ChatOpenAI, ProviderManager
+
+
+class MockChatHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible ``/chat/completions`` endpoint that counts TCP connections"""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body are written separately; without this Nagle + delayed ACK
+        # add ~40ms to every call on a kept-alive connection
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        time.sleep(self.server.latency)
+        payload = json.dumps({
+            "id": "chatcmpl-benchmark",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "ok"},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockChatServer:
+    """Local mock chat server running in a background thread"""
+
+    def __init__(self, latency=0.0):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), MockChatHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.connections = 0
+        self.httpd.lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    @property
+    def connections(self):
+        return self.httpd.connections
+
+    def reset(self):
+        self.httpd.connections = 0
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class Command(BaseCommand):
+    help = 'Compare pooled provider HTTP clients with a new connection per request against a local mock server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Chat calls per run')
+        parser.add_argument('--concurrency', type=int, default=4, help='Concurrent callers')
+        parser.add_argument('--latency-ms', type=float, default=5.0, help='Mock server latency per call')
+
+    def _run(self, label, server, models, options):
+        server.reset()
+        messages = [HumanMessage(content="benchmark")]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as executor:
+            list(executor.map(lambda i: models[i % len(models)].invoke(messages), range(options['requests'])))
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"{label}: {options['requests']} requests, {server.connections} connections, "
+            f"{elapsed * 1000 / options['requests']:.2f} ms/request"
+        )
+        return server.connections
+
+    def handle(self, *args, **options):
+        with MockChatServer(latency=options['latency_ms'] / 1000) as server:
+            overrides = {
+                "QWEN_API_KEY": "benchmark",
+                "QWEN_API_BASE": server.base_url,
+                "HEDGE_ALTERNATES": "",
+            }
+            saved = {name: os.environ.get(name) for name in overrides}
+            os.environ.update(overrides)
+            try:
+                manager = ProviderManager()
+                # Reasoning and generation share the client for QWEN_API_BASE
+                pooled = [manager.get_chat_model("qwen", "REASONING"), manager.get_chat_model("qwen", "GENERATION")]
+                pooled_connections = self._run("shared pooled client", server, pooled, options)
+            finally:
+                for name, value in saved.items():
+                    if value is None:
+                        os.environ.pop(name, None)
+                    else:
+                        os.environ[name] = value
+
+            unpooled = [
+                ChatOpenAI(
+                    api_key="benchmark",
+                    base_url=server.base_url,
+                    model="mock",
+                    http_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=0)),
+                )
+            ]
+            unpooled_connections = self._run("no keep-alive", server, unpooled, options)
+
+        self.stdout.write(
+            f"Connections opened: {pooled_connections} pooled vs {unpooled_connections} without reuse"
+        )
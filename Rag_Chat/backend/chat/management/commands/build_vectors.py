@@ -7,6 +7,7 @@ import os
 import pandas as pd
 from langchain.schema import Document
 
+from ...indexing import stamp_source
 from ...providers import provider_manager
 
 # %pip install --upgrade --quiet  langchain langchain-community azure-ai-documentintelligence
@@ -26,9 +27,19 @@ from ...providers import provider_manager
 class Command(BaseCommand):
     help = 'Build vector store from xlsx and Excel data'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Embed only new or changed chunks and delete vanished ones',
+        )
+
+    def _report_progress(self, completed, total):
+        self.stdout.write(f"Embedded {completed}/{total} chunks")
+
     def handle(self, *args, **options):
         try:
-            all_docs = []
+            docs_by_source = {}
             
             # Load CSV data
             csv_path = os.path.join(settings.BASE_DIR, "db", "galaxy_s25_data.csv")
@@ -40,7 +51,7 @@ class Command(BaseCommand):
                     metadata_columns=["ID(SKU)", "Product_Name", "Main_Feature"]
                 )
                 csv_docs = loader.load()
-                all_docs.extend(csv_docs)
+                docs_by_source["csv"] = csv_docs
                 self.stdout.write(f"Loaded {len(csv_docs)} documents from CSV")
 
             # Load Excel data
@@ -48,6 +59,7 @@ class Command(BaseCommand):
             if os.path.exists(excel_path):
                 self.stdout.write(f"Loading Excel file: {excel_path}")
                 df = pd.read_excel(excel_path, engine="openpyxl")
+                excel_docs = []
                 
                 for _, row in df.iterrows():
                     # Create a document for each row
@@ -66,10 +78,11 @@ class Command(BaseCommand):
                         page_content=content,
                         metadata=metadata
                     )
-                    all_docs.append(doc)
+                    excel_docs.append(doc)
+                docs_by_source["excel"] = excel_docs
                 self.stdout.write(f"Loaded {len(df)} documents from Excel")
 
-            if not all_docs:
+            if not any(docs_by_source.values()):
                 raise Exception("No documents found in either CSV or Excel files")
 
             # Split documents with Korean-aware settings
@@ -79,7 +92,12 @@ class Command(BaseCommand):
                 length_function=len,
                 keep_separator=True
             )
-            splits = text_splitter.split_documents(all_docs)
+            # Split and stamp each source separately so syncs stay scoped to one source
+            splits_by_source = {}
+            for source, docs in docs_by_source.items():
+                splits_by_source[source] = text_splitter.split_documents(docs)
+                stamp_source(splits_by_source[source], source)
+            splits = [chunk for chunks in splits_by_source.values() for chunk in chunks]
             self.stdout.write(f"Created {len(splits)} total chunks")
 
             # Create embeddings
@@ -87,7 +105,20 @@ class Command(BaseCommand):
             if not api_key:
                 raise RuntimeError("GOOGLE_API_KEY is not configured. Set it in the environment or settings.")
 
-            vector_store = provider_manager.create_vector_store_from_documents(splits)
+            if options['incremental']:
+                from ...indexing import sync_index_version
+                for source, source_splits in splits_by_source.items():
+                    result, vector_store = sync_index_version(
+                        source_splits, progress_callback=self._report_progress, source=source
+                    )
+                    self.stdout.write(
+                        f"Incremental sync ({source}): {result.added} added, {result.deleted} deleted, "
+                        f"{result.unchanged} unchanged"
+                    )
+            else:
+                vector_store = provider_manager.create_vector_store_from_documents(
+                    splits, progress_callback=self._report_progress
+                )
             
             self.stdout.write(f"Vector store created with {vector_store._collection.count()} documents")
             self.stdout.write(f"Vector store saved at: {vector_store._persist_directory}")
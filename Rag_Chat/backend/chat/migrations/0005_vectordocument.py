@@ -0,0 +1,156 @@
+# Generated by Django 4.2.30 on 2026-10-17 04:45
+
+import hashlib
+import json
+import logging
+
+from django.db import migrations, models
+
+logger = logging.getLogger(__name__)
+
+DOC_PREFIX = "vector_doc_"
+TEXT_FIELDS = ("batch", "sheet", "source", "doc_id", "chunk_id")
+INTEGER_FIELDS = ("doc_index", "content_length")
+
+
+def copy_metadata_to_vector_documents(apps, schema_editor):
+    """Move vector_doc_* key/value rows into the VectorDocument table"""
+    MetaData = apps.get_model("chat", "MetaData")
+    VectorDocument = apps.get_model("chat", "VectorDocument")
+
+    legacy = MetaData.objects.filter(key__startswith=DOC_PREFIX)
+    rows = []
+    migrated = []
+    skipped = []
+    for entry in legacy.iterator(chunk_size=1000):
+        try:
+            metadata = json.loads(entry.json_value) if entry.json_value else {}
+        except ValueError:
+            skipped.append(entry.key)
+            continue
+        if not isinstance(metadata, dict):
+            skipped.append(entry.key)
+            continue
+        columns = {}
+        for field in TEXT_FIELDS:
+            value = metadata.get(field)
+            if isinstance(value, str) and len(value) <= VectorDocument._meta.get_field(field).max_length:
+                columns[field] = metadata.pop(field)
+        for field in INTEGER_FIELDS:
+            value = metadata.get(field)
+            if isinstance(value, int) and not isinstance(value, bool):
+                columns[field] = metadata.pop(field)
+        rows.append(VectorDocument(key=entry.key[len(DOC_PREFIX):], extra=metadata, **columns))
+        migrated.append(entry.pk)
+        if len(rows) >= 1000:
+            VectorDocument.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    if rows:
+        VectorDocument.objects.bulk_create(rows, ignore_conflicts=True)
+    # Rows that could not be parsed stay in MetaData for manual inspection
+    for start in range(0, len(migrated), 1000):
+        MetaData.objects.filter(pk__in=migrated[start:start + 1000]).delete()
+    if skipped:
+        logger.warning(
+            f"Left {len(skipped)} unparseable {DOC_PREFIX}* MetaData rows in place: {', '.join(skipped)}"
+        )
+
+
+def legacy_key(document_key, max_length):
+    """vector_doc_<key>, shortened with a hash suffix when it exceeds MetaData.key"""
+    key = f"{DOC_PREFIX}{document_key}"
+    if len(key) <= max_length:
+        return key
+    digest = hashlib.sha256(document_key.encode("utf-8")).hexdigest()[:16]
+    return f"{key[:max_length - len(digest) - 1]}-{digest}"
+
+
+def copy_vector_documents_to_metadata(apps, schema_editor):
+    """Reverse: restore VectorDocument rows as vector_doc_* key/value rows"""
+    MetaData = apps.get_model("chat", "MetaData")
+    VectorDocument = apps.get_model("chat", "VectorDocument")
+    max_length = MetaData._meta.get_field("key").max_length
+
+    rows = []
+    shortened = 0
+    for document in VectorDocument.objects.iterator(chunk_size=1000):
+        metadata = dict(document.extra or {})
+        for field in TEXT_FIELDS + INTEGER_FIELDS:
+            value = getattr(document, field)
+            if value is not None:
+                metadata[field] = value
+        key = legacy_key(document.key, max_length)
+        shortened += key != f"{DOC_PREFIX}{document.key}"
+        rows.append(MetaData(
+            key=key,
+            json_value=json.dumps(metadata),
+            # Keeps the full key for rows whose MetaData key was shortened
+            description=f"Vector document metadata for {document.key}",
+        ))
+        if len(rows) >= 1000:
+            MetaData.objects.bulk_create(rows, ignore_conflicts=True)
+            rows = []
+    if rows:
+        MetaData.objects.bulk_create(rows, ignore_conflicts=True)
+    if shortened:
+        logger.warning(
+            f"Shortened {shortened} {DOC_PREFIX}* keys to fit MetaData.key (max_length={max_length}); "
+            f"the full keys are kept in the descriptions"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("chat", "0004_user_last_activity"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="VectorDocument",
+            fields=[
+                (
+                    "key",
+                    models.CharField(max_length=255, primary_key=True, serialize=False),
+                ),
+                (
+                    "batch",
+                    models.CharField(
+                        blank=True, db_index=True, max_length=100, null=True
+                    ),
+                ),
+                (
+                    "sheet",
+                    models.CharField(
+                        blank=True, db_index=True, max_length=100, null=True
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        blank=True, db_index=True, max_length=1024, null=True
+                    ),
+                ),
+                (
+                    "doc_id",
+                    models.CharField(
+                        blank=True, db_index=True, max_length=255, null=True
+                    ),
+                ),
+                (
+                    "chunk_id",
+                    models.CharField(
+                        blank=True, db_index=True, max_length=255, null=True
+                    ),
+                ),
+                ("doc_index", models.IntegerField(blank=True, null=True)),
+                ("content_length", models.IntegerField(blank=True, null=True)),
+                ("extra", models.JSONField(blank=True, default=dict)),
+                ("last_updated", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(
+            copy_metadata_to_vector_documents,
+            copy_vector_documents_to_metadata,
+        ),
+    ]
@@ -97,3 +97,52 @@ class SearchLog(models.Model):
 
     def __str__(self):
         return f"Search {self.search_log_id} for Question {self.question.question_id}"
+
+
+class VectorDocument(models.Model):
+    """Metadata for one indexed vector document or chunk.
+
+    Frequently queried attributes live in indexed columns; everything else
+    stays in ``extra`` so ``as_metadata()`` returns the original dictionary.
+    ``source`` holds full file paths (CSVLoader); a text value longer than its
+    column is kept in ``extra`` rather than truncated.
+    """
+    TEXT_FIELDS = ("batch", "sheet", "source", "doc_id", "chunk_id")
+    INTEGER_FIELDS = ("doc_index", "content_length")
+
+    key = models.CharField(max_length=255, primary_key=True)
+    batch = models.CharField(max_length=100, null=True, blank=True, db_index=True)
+    sheet = models.CharField(max_length=100, null=True, blank=True, db_index=True)
+    source = models.CharField(max_length=1024, null=True, blank=True, db_index=True)
+    doc_id = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    chunk_id = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    doc_index = models.IntegerField(null=True, blank=True)
+    content_length = models.IntegerField(null=True, blank=True)
+    extra = models.JSONField(default=dict, blank=True)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    @classmethod
+    def from_metadata(cls, key, metadata):
+        """Build an unsaved row, splitting typed columns from the rest"""
+        extra = dict(metadata)
+        columns = {}
+        for field in cls.TEXT_FIELDS:
+            value = extra.get(field)
+            if isinstance(value, str) and len(value) <= cls._meta.get_field(field).max_length:
+                columns[field] = extra.pop(field)
+        for field in cls.INTEGER_FIELDS:
+            if field in extra and isinstance(extra[field], int) and not isinstance(extra[field], bool):
+                columns[field] = extra.pop(field)
+        return cls(key=key, extra=extra, **columns)
+
+    def as_metadata(self):
+        """Return the metadata dictionary this row was built from"""
+        metadata = dict(self.extra or {})
+        for field in self.TEXT_FIELDS + self.INTEGER_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                metadata[field] = value
+        return metadata
+
+    def __str__(self):
+        return f"VectorDocument {self.key}"
@@ -1,17 +1,34 @@
 """Utilities for modular RAG pipeline execution."""
 
 from .base import ModuleContext, PipelineModule, ModuleError
-from .modules import RetrieveModule, ReasoningModule, GenerationModule
+from .modules import (
+    RouterModule,
+    RetrieveModule,
+    ReasoningModule,
+    GenerationModule,
+    ReasonAndAnswerModule,
+    SpeculativeAnswerModule,
+    is_complex_question,
+)
 from .runner import PipelineRunner, DEFAULT_REGISTRY
+from .tracing import PipelineHook, StageRecord, metrics_hook, server_timing_header
 
 __all__ = [
     "ModuleContext",
     "PipelineModule",
     "ModuleError",
+    "RouterModule",
     "RetrieveModule",
     "ReasoningModule",
     "GenerationModule",
+    "ReasonAndAnswerModule",
+    "SpeculativeAnswerModule",
+    "is_complex_question",
     "PipelineRunner",
     "DEFAULT_REGISTRY",
+    "PipelineHook",
+    "StageRecord",
+    "metrics_hook",
+    "server_timing_header",
 ]
 
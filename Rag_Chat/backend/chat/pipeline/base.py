@@ -2,9 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.db import close_old_connections
+
+
+def call_in_worker(func: Callable[..., Any], *args: Any) -> Any:
+    """Call ``func`` on a pool thread, closing stale DB connections around it.
+
+    Django only cleans up connections at request boundaries, which pool
+    threads never see; without this each worker keeps its connection open.
+    """
+    close_old_connections()
+    try:
+        return func(*args)
+    finally:
+        close_old_connections()
 
 
 class ModuleError(Exception):
@@ -25,15 +41,27 @@ class ModuleContext:
     reasoning: Optional[str] = None
     response: Optional[str] = None
     extra: Dict[str, Any] = field(default_factory=dict)
+    #: Set by a module that fully answered the question; the runner then
+    #: skips the remaining steps.
+    halted: bool = False
 
 
 class PipelineModule(ABC):
     """Base interface for all pipeline modules."""
 
     name: str = "base"
+    #: ``ModuleContext`` fields this module writes; used by the DAG scheduler.
+    provides: Tuple[str, ...] = ()
 
     @abstractmethod
     def run(self, context: ModuleContext) -> ModuleContext:
         """Execute module logic and return the updated context."""
-        
+
+    async def arun(self, context: ModuleContext) -> ModuleContext:
+        """Async variant of :meth:`run`.
+
+        Modules backed by I/O should override this with native ``ainvoke``
+        calls; the default runs the sync implementation in a worker thread.
+        """
+        return await asyncio.to_thread(call_in_worker, self.run, context)
 
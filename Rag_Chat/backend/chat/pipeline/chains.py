@@ -0,0 +1,112 @@
+"""Process-wide registry of compiled prompt chains.
+
+Prompt templates are built once at import time and ``prompt | model | parser``
+chains are compiled once per ``(kind, provider, purpose)`` key. LangChain
+runnables are immutable after construction, so a compiled chain can be shared
+safely across request threads. Entries are discarded when
+``provider_manager.config_version`` changes.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Callable, Dict, Hashable, Tuple
+
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+from ..providers import provider_manager
+
+
+REASONING_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        """목표: 사용자의 질문에 답변하는 데 필요한 핵심 근거를 간결한 bullet list로 정리하세요.
+다음 규칙을 따르세요:
+- 제공된 컨텍스트 안에서만 근거를 찾을 것
+- 질문에 직접적으로 도움이 되지 않는 내용은 제외할 것
+- 각 근거는 한 문장으로 작성할 것""",
+    ),
+    (
+        "human",
+        "Question: {question}\nContext:\n{context}",
+    ),
+])
+
+GENERATION_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        """You are a friendly Korean AI assistant. Use the provided context and
+reasoning steps to craft a clear, helpful answer. If information is missing,
+acknowledge it honestly.""",
+    ),
+    MessagesPlaceholder(variable_name="history"),
+    (
+        "human",
+        "Question: {question}\n\nContext:\n{context}\n\nReasoning:\n{reasoning}",
+    ),
+])
+
+# Single-call mode: evidence and answer in one response, split on the markers
+ANSWER_EVIDENCE_MARKER = "근거:"
+ANSWER_MARKER = "답변:"
+
+ANSWER_PROMPT = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        f"""You are a friendly Korean AI assistant. 먼저 제공된 컨텍스트에서 질문에 필요한
+핵심 근거를 bullet list로 정리한 뒤, 그 근거로 명확하고 도움이 되는 최종 답변을 작성하세요.
+정보가 부족하면 솔직하게 밝히세요. 반드시 다음 형식을 지키세요:
+{ANSWER_EVIDENCE_MARKER}
+- 한 문장짜리 근거
+{ANSWER_MARKER}
+최종 답변""",
+    ),
+    MessagesPlaceholder(variable_name="history"),
+    (
+        "human",
+        "Question: {question}\n\nContext:\n{context}",
+    ),
+])
+
+
+class ChainRegistry:
+    """Build-once cache of runnables keyed by an arbitrary hashable tuple."""
+
+    def __init__(self) -> None:
+        self._chains: Dict[Tuple[Hashable, ...], object] = {}
+        self._version = provider_manager.config_version
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[Hashable, ...], factory: Callable[[], object]):
+        """Return the chain for ``key``, building it with ``factory`` once."""
+        if self._version != provider_manager.config_version:
+            self.clear()
+
+        chain = self._chains.get(key)
+        if chain is None:
+            with self._lock:
+                chain = self._chains.get(key)
+                if chain is None:
+                    chain = factory()
+                    self._chains[key] = chain
+        return chain
+
+    def clear(self) -> None:
+        with self._lock:
+            self._chains.clear()
+            self._version = provider_manager.config_version
+
+    def __len__(self) -> int:
+        return len(self._chains)
+
+
+chain_registry = ChainRegistry()
+
+
+def get_llm_chain(kind: str, prompt: ChatPromptTemplate, provider: str, purpose: str):
+    """Return the shared ``prompt | model | StrOutputParser()`` chain."""
+    return chain_registry.get(
+        (kind, provider, purpose),
+        lambda: prompt | provider_manager.get_chat_model(provider, purpose) | StrOutputParser(),
+    )
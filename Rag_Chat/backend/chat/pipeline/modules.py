@@ -2,28 +2,201 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.output_parsers import StrOutputParser
+from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables.history import RunnableWithMessageHistory
 
 from ..providers import provider_manager
+from ..providers.catalogue_index import normalize
+from ..retrieval_filters import parse_question_filters
 from ..utils import RAGUtils
-from .base import ModuleContext, PipelineModule, ModuleError
+from ..vector_metadata import VectorMetadataManager
+from .base import ModuleContext, PipelineModule, ModuleError, call_in_worker
+from .chains import (
+    ANSWER_EVIDENCE_MARKER,
+    ANSWER_MARKER,
+    ANSWER_PROMPT,
+    GENERATION_PROMPT,
+    REASONING_PROMPT,
+    chain_registry,
+    get_llm_chain,
+)
+
+logger = logging.getLogger(__name__)
+
+COMPARATIVE_KEYWORDS = (
+    "비교", "차이", "다른 점", "장단점", "보다", "나은", "낫",
+    "compare", "comparison", "difference", "versus", " vs", "better",
+)
+_MODEL_MENTION_RE = re.compile(r"(?<![0-9a-z])s\d{2}(?:\s+(?:ultra|plus|edge|fe))?(?![0-9a-z])")
+
+
+def is_complex_question(question: str) -> bool:
+    """Whether a question needs the separate reasoning call.
+
+    Long questions (over ``COMPLEX_QUESTION_CHARS`` characters), questions
+    naming several products and comparative questions are complex.
+    """
+    question = question or ""
+    if len(question) > int(os.getenv("COMPLEX_QUESTION_CHARS", "120")):
+        return True
+
+    normalized = normalize(question)
+    if any(keyword in normalized for keyword in COMPARATIVE_KEYWORDS):
+        return True
+    if len(set(_MODEL_MENTION_RE.findall(normalized))) > 1:
+        return True
+
+    try:
+        catalogue = provider_manager.get_catalogue_index()
+        models = catalogue.parse_filters(question).get("Model", []) if catalogue is not None else []
+    except Exception as exc:
+        logger.warning(f"Catalogue index unavailable for question routing: {exc}")
+        models = []
+    return len(models) > 1
+
+
+def split_answer(text: str) -> Tuple[str, str]:
+    """Split a combined response into ``(evidence, answer)``.
+
+    Output without the answer marker is treated as the answer.
+    """
+    evidence, marker, answer = (text or "").partition(ANSWER_MARKER)
+    if not marker:
+        return "", evidence.strip()
+    evidence = evidence.strip()
+    if evidence.startswith(ANSWER_EVIDENCE_MARKER):
+        evidence = evidence[len(ANSWER_EVIDENCE_MARKER):].strip()
+    return evidence, answer.strip()
+
+
+class RouterModule(PipelineModule):
+    """Answer spec lookups from the catalogue index without any model calls.
+
+    When the question resolves to a catalogue filter or attribute lookup the
+    templated answer is written to ``context.response`` and the pipeline is
+    halted, skipping retrieval, reasoning and generation. Anything else passes
+    through unchanged. Disabled with ``CATALOGUE_FAST_PATH=false``.
+    """
+
+    name = "router"
+    provides = ("context_text", "images", "response")
+
+    def run(self, context: ModuleContext) -> ModuleContext:
+        if os.getenv("CATALOGUE_FAST_PATH", "true").lower() not in {"1", "true", "yes", "on"}:
+            return context
+        if context.extra.get("filters"):
+            # Explicit request filters are honoured by the retrieval path
+            return context
+
+        try:
+            catalogue = provider_manager.get_catalogue_index()
+            answer = catalogue.answer(context.question) if catalogue is not None else None
+        except Exception as exc:
+            # The fast path is an optimisation; the RAG steps still answer
+            logger.warning(f"Catalogue routing failed: {exc}")
+            return context
+
+        if answer is None:
+            return context
+
+        context.context_text = answer.context
+        context.images = answer.images
+        context.response = answer.response
+        context.extra["route"] = "catalogue"
+        context.extra["rag_metadata"] = {
+            "image_paths": answer.images,
+            "catalogue_filters": answer.filters,
+            "catalogue_attributes": answer.attributes,
+        }
+        if context.history is not None:
+            context.history.add_message(HumanMessage(content=context.question))
+            context.history.add_message(AIMessage(content=answer.response))
+        context.halted = True
+        return context
 
 
 class RetrieveModule(PipelineModule):
-    """Fetch RAG context and associated metadata."""
+    """Fetch RAG context and associated metadata.
+
+    ``mode`` selects the retrieval strategy: ``"basic"`` returns context and
+    images only, ``"enhanced"`` also attaches per-result similarity scores and
+    stored document metadata under ``extra["rag_metadata"]``, and ``"hybrid"``
+    fuses BM25 and vector rankings with reciprocal rank fusion.
+
+    Metadata filters in ``extra["filters"]`` (set from the request) are pushed
+    down into the vector search. With ``auto_filters`` the module otherwise
+    parses model/color/storage filters from the question, and searches
+    unfiltered again if they match nothing.
+    """
 
     name = "retrieve"
+    provides = ("context_text", "images")
+    MODES = ("basic", "enhanced", "hybrid")
+
+    def __init__(self, mode: str = "basic", k: int = 3, auto_filters: bool = False):
+        if mode not in self.MODES:
+            raise ModuleError(f"Unknown retrieval mode: {mode}")
+        self.mode = mode
+        self.k = k
+        self.auto_filters = auto_filters
+
+    def _resolve_filters(self, context: ModuleContext) -> Tuple[Optional[Dict], bool]:
+        """Return the filters to apply and whether they were inferred."""
+        if context.extra.get("filters"):
+            return context.extra["filters"], False
+        if self.auto_filters:
+            parsed = parse_question_filters(context.question)
+            if parsed:
+                context.extra["parsed_filters"] = parsed
+                return parsed, True
+        return None, False
+
+    def _search(self, question: str, filters: Optional[Dict]) -> Dict:
+        if self.mode == "enhanced":
+            return VectorMetadataManager.enhance_vector_search(question, k=self.k, metadata_filters=filters)
+        if self.mode == "hybrid":
+            return RAGUtils.get_hybrid_rag_context(question, k=self.k, filters=filters)
+        return RAGUtils.get_rag_context(question, k=self.k, filters=filters)
+
+    async def _asearch(self, question: str, filters: Optional[Dict]) -> Dict:
+        if self.mode == "enhanced":
+            return await VectorMetadataManager.aenhance_vector_search(question, k=self.k, metadata_filters=filters)
+        if self.mode == "hybrid":
+            return await RAGUtils.aget_hybrid_rag_context(question, k=self.k, filters=filters)
+        return await RAGUtils.aget_rag_context(question, k=self.k, filters=filters)
 
     def run(self, context: ModuleContext) -> ModuleContext:
         try:
-            rag_context = RAGUtils.get_rag_context(context.question)
+            filters, inferred = self._resolve_filters(context)
+            rag_context = self._search(context.question, filters)
+            if inferred and not rag_context.get("context"):
+                # Chunks indexed without field_* metadata: fall back to a plain search
+                rag_context = self._search(context.question, None)
+        except Exception as exc:  # pragma: no cover - defensive guard
+            raise ModuleError(f"Failed to retrieve context: {exc}") from exc
+
+        return self._apply(context, rag_context)
+
+    async def arun(self, context: ModuleContext) -> ModuleContext:
+        try:
+            filters, inferred = self._resolve_filters(context)
+            rag_context = await self._asearch(context.question, filters)
+            if inferred and not rag_context.get("context"):
+                rag_context = await self._asearch(context.question, None)
         except Exception as exc:  # pragma: no cover - defensive guard
             raise ModuleError(f"Failed to retrieve context: {exc}") from exc
 
+        return self._apply(context, rag_context)
+
+    def _apply(self, context: ModuleContext, rag_context: Dict) -> ModuleContext:
         context.context_text = rag_context.get("context", "")
         raw_images = rag_context.get("image_paths", [])
         images: List[str] = []
@@ -44,32 +217,30 @@ class ReasoningModule(PipelineModule):
     """Generate structured reasoning from retrieved context."""
 
     name = "reasoning"
+    provides = ("reasoning",)
+
+    def _build_chain(self, context: ModuleContext):
+        provider = provider_manager.get_active_selection(context.session_id)["reasoning_provider"]
+        chain = get_llm_chain("reasoning", REASONING_PROMPT, provider, "REASONING")
+        inputs = {
+            "question": context.question,
+            "context": context.context_text,
+        }
+        return chain, inputs
 
     def run(self, context: ModuleContext) -> ModuleContext:
-        reasoning_model = provider_manager.get_reasoning_model(context.session_id)
-        prompt = ChatPromptTemplate.from_messages([
-            (
-                "system",
-                """목표: 사용자의 질문에 답변하는 데 필요한 핵심 근거를 간결한 bullet list로 정리하세요.
-다음 규칙을 따르세요:
-- 제공된 컨텍스트 안에서만 근거를 찾을 것
-- 질문에 직접적으로 도움이 되지 않는 내용은 제외할 것
-- 각 근거는 한 문장으로 작성할 것""",
-            ),
-            (
-                "human",
-                "Question: {question}\nContext:\n{context}",
-            ),
-        ])
-
-        try:
-            chain = prompt | reasoning_model | StrOutputParser()
-            context.reasoning = chain.invoke(
-                {
-                    "question": context.question,
-                    "context": context.context_text,
-                }
-            )
+        try:
+            chain, inputs = self._build_chain(context)
+            context.reasoning = chain.invoke(inputs)
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate reasoning: {exc}") from exc
+
+        return context
+
+    async def arun(self, context: ModuleContext) -> ModuleContext:
+        try:
+            chain, inputs = self._build_chain(context)
+            context.reasoning = await chain.ainvoke(inputs)
         except Exception as exc:
             raise ModuleError(f"Failed to generate reasoning: {exc}") from exc
 
@@ -80,48 +251,499 @@ class GenerationModule(PipelineModule):
     """Produce the final answer using reasoning and history."""
 
     name = "generation"
+    provides = ("response",)
 
-    def run(self, context: ModuleContext) -> ModuleContext:
-        generation_model = provider_manager.get_generation_model(context.session_id)
-
-        prompt = ChatPromptTemplate.from_messages([
-            (
-                "system",
-                """You are a friendly Korean AI assistant. Use the provided context and
-reasoning steps to craft a clear, helpful answer. If information is missing,
-acknowledge it honestly.""",
-            ),
-            MessagesPlaceholder(variable_name="history"),
-            (
-                "human",
-                "Question: {question}\n\nContext:\n{context}\n\nReasoning:\n{reasoning}",
-            ),
-        ])
-
-        chain = prompt | generation_model | StrOutputParser()
-
-        inputs: Dict[str, str] = {
+    def _build_chain(self, context: ModuleContext):
+        """Return the runnable, its inputs and invocation config."""
+        provider = provider_manager.get_active_selection(context.session_id)["generation_provider"]
+        chain = get_llm_chain("generation", GENERATION_PROMPT, provider, "GENERATION")
+
+        inputs: Dict[str, object] = {
             "question": context.question,
             "context": context.context_text,
             "reasoning": context.reasoning or "",
         }
 
-        try:
-            if context.history_handler:
-                chain_with_history = RunnableWithMessageHistory(
+        if context.history_handler:
+            chain_with_history = chain_registry.get(
+                ("generation_history", provider, "GENERATION", context.history_handler),
+                lambda: RunnableWithMessageHistory(
                     chain,
                     context.history_handler,
                     input_messages_key="question",
                     history_messages_key="history",
-                )
-                context.response = chain_with_history.invoke(
-                    inputs,
-                    config={"configurable": {"session_id": context.session_id}},
-                )
-            else:
-                context.response = chain.invoke({**inputs, "history": []})
+                ),
+            )
+            config = {"configurable": {"session_id": context.session_id}}
+            return chain_with_history, inputs, config
+
+        return chain, {**inputs, "history": []}, None
+
+    def run(self, context: ModuleContext) -> ModuleContext:
+        runnable, inputs, config = self._build_chain(context)
+
+        try:
+            context.response = runnable.invoke(inputs, config=config)
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate response: {exc}") from exc
+
+        return context
+
+    async def arun(self, context: ModuleContext) -> ModuleContext:
+        runnable, inputs, config = self._build_chain(context)
+
+        try:
+            context.response = await runnable.ainvoke(inputs, config=config)
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate response: {exc}") from exc
+
+        return context
+
+    def stream(self, context: ModuleContext) -> Iterator[str]:
+        """Yield response tokens as they arrive, then set ``context.response``."""
+        runnable, inputs, config = self._build_chain(context)
+
+        chunks: List[str] = []
+        try:
+            for chunk in runnable.stream(inputs, config=config):
+                if not chunk:
+                    continue
+                chunks.append(chunk)
+                yield chunk
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate response: {exc}") from exc
+        finally:
+            context.response = "".join(chunks)
+
+    async def astream(self, context: ModuleContext) -> AsyncIterator[str]:
+        """Async variant of :meth:`stream`."""
+        runnable, inputs, config = self._build_chain(context)
+
+        chunks: List[str] = []
+        try:
+            async for chunk in runnable.astream(inputs, config=config):
+                if not chunk:
+                    continue
+                chunks.append(chunk)
+                yield chunk
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate response: {exc}") from exc
+        finally:
+            context.response = "".join(chunks)
+
+
+class _AnswerStream:
+    """Hold back the evidence section of a streamed combined response."""
+
+    def __init__(self) -> None:
+        self.chunks: List[str] = []
+        self.answer_started = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    def feed(self, chunk: str) -> str:
+        """Return the part of ``chunk`` that belongs to the answer."""
+        self.chunks.append(chunk)
+        if self.answer_started:
+            return chunk
+        # The marker may be split across chunks: look at the whole buffer
+        _, marker, answer = self.text.partition(ANSWER_MARKER)
+        if not marker:
+            return ""
+        self.answer_started = True
+        return answer.lstrip()
+
+    def finish(self) -> str:
+        """Return what is left to send once the model has finished."""
+        if not self.answer_started:
+            # The model ignored the format: everything it wrote is the answer
+            return self.text.strip()
+        return ""
+
+
+class ReasonAndAnswerModule(PipelineModule):
+    """Produce evidence bullets and the final answer in one model call.
+
+    The evidence section goes to ``context.reasoning`` and the answer to
+    ``context.response``, replacing the reasoning and generation steps. With
+    ``complex_fallback`` questions flagged by :func:`is_complex_question`
+    still take the two-call path through those modules.
+    """
+
+    name = "answer"
+    provides = ("reasoning", "response")
+
+    def __init__(self, complex_fallback: bool = True):
+        self.complex_fallback = complex_fallback
+
+    def _use_two_calls(self, context: ModuleContext) -> bool:
+        two_calls = self.complex_fallback and is_complex_question(context.question)
+        context.extra["answer_path"] = "two_call" if two_calls else "single_call"
+        return two_calls
+
+    def _build_chain(self, context: ModuleContext):
+        """Return the runnable, its inputs and the session history (if any)."""
+        provider = provider_manager.get_active_selection(context.session_id)["generation_provider"]
+        chain = get_llm_chain("answer", ANSWER_PROMPT, provider, "GENERATION")
+
+        history = context.history
+        if history is None and context.history_handler:
+            history = context.history_handler(context.session_id)
+        inputs = {
+            "question": context.question,
+            "context": context.context_text,
+            "history": list(history.messages) if history is not None else [],
+        }
+        return chain, inputs, history
+
+    def _apply(self, context: ModuleContext, history, text: str) -> ModuleContext:
+        context.reasoning, context.response = split_answer(text)
+        if history is not None:
+            # Only the answer is kept in the conversation, not the evidence
+            history.add_message(HumanMessage(content=context.question))
+            history.add_message(AIMessage(content=context.response))
+        return context
+
+    def run(self, context: ModuleContext) -> ModuleContext:
+        if self._use_two_calls(context):
+            return GenerationModule().run(ReasoningModule().run(context))
+
+        try:
+            chain, inputs, history = self._build_chain(context)
+            text = chain.invoke(inputs)
         except Exception as exc:
             raise ModuleError(f"Failed to generate response: {exc}") from exc
 
+        return self._apply(context, history, text)
+
+    async def arun(self, context: ModuleContext) -> ModuleContext:
+        if self._use_two_calls(context):
+            return await GenerationModule().arun(await ReasoningModule().arun(context))
+
+        try:
+            # Reading the session history is a sync Redis call
+            chain, inputs, history = await asyncio.to_thread(call_in_worker, self._build_chain, context)
+            text = await chain.ainvoke(inputs)
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate response: {exc}") from exc
+
+        return await asyncio.to_thread(call_in_worker, self._apply, context, history, text)
+
+    def stream(self, context: ModuleContext) -> Iterator[str]:
+        """Yield answer tokens as they arrive; the evidence section is held back."""
+        if self._use_two_calls(context):
+            ReasoningModule().run(context)
+            yield from GenerationModule().stream(context)
+            return
+
+        try:
+            chain, inputs, history = self._build_chain(context)
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate response: {exc}") from exc
+
+        answer = _AnswerStream()
+        try:
+            for chunk in chain.stream(inputs):
+                token = answer.feed(chunk) if chunk else ""
+                if token:
+                    yield token
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate response: {exc}") from exc
+
+        rest = answer.finish()
+        if rest:
+            yield rest
+        self._apply(context, history, answer.text)
+
+    async def astream(self, context: ModuleContext) -> AsyncIterator[str]:
+        """Async variant of :meth:`stream`."""
+        if self._use_two_calls(context):
+            await ReasoningModule().arun(context)
+            async for token in GenerationModule().astream(context):
+                yield token
+            return
+
+        try:
+            chain, inputs, history = await asyncio.to_thread(call_in_worker, self._build_chain, context)
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate response: {exc}") from exc
+
+        answer = _AnswerStream()
+        try:
+            async for chunk in chain.astream(inputs):
+                token = answer.feed(chunk) if chunk else ""
+                if token:
+                    yield token
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate response: {exc}") from exc
+
+        rest = answer.finish()
+        if rest:
+            yield rest
+        await asyncio.to_thread(call_in_worker, self._apply, context, history, answer.text)
+
+
+_SPECULATION_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_SPECULATION_LOOP_LOCK = threading.Lock()
+
+
+def _speculation_loop() -> asyncio.AbstractEventLoop:
+    """Background event loop that runs speculative model calls for sync callers.
+
+    Calls that miss the latency budget are cancelled there instead of
+    occupying a worker thread until the provider answers.
+    """
+    global _SPECULATION_LOOP
+    with _SPECULATION_LOOP_LOCK:
+        if _SPECULATION_LOOP is None or _SPECULATION_LOOP.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="speculative", daemon=True).start()
+            _SPECULATION_LOOP = loop
+        return _SPECULATION_LOOP
+
+
+def _remaining(deadline: float) -> float:
+    return max(0.0, deadline - time.monotonic())
+
+
+async def _next_token(stream) -> Optional[str]:
+    """Return the next non-empty chunk of ``stream``, or None once it is exhausted."""
+    async for chunk in stream:
+        if chunk:
+            return chunk
+    return None
+
+
+async def _aclose(stream) -> None:
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+def _iterate_on_loop(stream, loop: asyncio.AbstractEventLoop) -> Iterator[str]:
+    """Drive an async token stream on ``loop`` from a sync caller."""
+    try:
+        while True:
+            token = asyncio.run_coroutine_threadsafe(_next_token(stream), loop).result()
+            if token is None:
+                return
+            yield token
+    finally:
+        asyncio.run_coroutine_threadsafe(_aclose(stream), loop).result()
+
+
+def _discard_result(task: "asyncio.Future") -> None:
+    # Losing speculative calls may fail after nobody waits for them
+    if not task.cancelled():
+        task.exception()
+
+
+class SpeculativeAnswerModule(PipelineModule):
+    """Run reasoning and a context-only draft answer concurrently.
+
+    If reasoning and the refined answer built from it both finish within
+    ``budget_ms`` (default ``PIPELINE_LATENCY_BUDGET_MS``) of the start, the
+    refined answer is used; otherwise the draft is returned as soon as it is
+    ready. A slow reasoning provider therefore costs at most the budget.
+    When streaming, the refined answer is used if reasoning and its first
+    token arrive within the budget; otherwise the draft is streamed.
+
+    The model calls are asyncio tasks, so the losing calls are cancelled
+    rather than left running. Sync callers submit them to a shared background
+    event loop. The draft must finish (when streaming: start) within
+    ``draft_timeout_ms`` (default ``PIPELINE_DRAFT_TIMEOUT_MS``, 30000).
+    """
+
+    name = "speculative"
+    provides = ("reasoning", "response")
+
+    def __init__(self, budget_ms: Optional[float] = None, draft_timeout_ms: Optional[float] = None):
+        self.budget_ms = budget_ms
+        self.draft_timeout_ms = draft_timeout_ms
+
+    def _budget(self) -> float:
+        budget_ms = self.budget_ms
+        if budget_ms is None:
+            budget_ms = float(os.getenv("PIPELINE_LATENCY_BUDGET_MS", "4000"))
+        return budget_ms / 1000
+
+    def _draft_timeout(self) -> float:
+        draft_timeout_ms = self.draft_timeout_ms
+        if draft_timeout_ms is None:
+            draft_timeout_ms = float(os.getenv("PIPELINE_DRAFT_TIMEOUT_MS", "30000"))
+        return draft_timeout_ms / 1000
+
+    def _build_chains(self, context: ModuleContext):
+        """Return the reasoning chain and inputs, the generation chain, the history and its messages."""
+        try:
+            reasoning_chain, reasoning_inputs = ReasoningModule()._build_chain(context)
+            provider = provider_manager.get_active_selection(context.session_id)["generation_provider"]
+            generation_chain = get_llm_chain("generation", GENERATION_PROMPT, provider, "GENERATION")
+
+            history = context.history
+            if history is None and context.history_handler:
+                history = context.history_handler(context.session_id)
+            messages = list(history.messages) if history is not None else []
+        except Exception as exc:
+            raise ModuleError(f"Failed to generate response: {exc}") from exc
+        return reasoning_chain, reasoning_inputs, generation_chain, history, messages
+
+    @staticmethod
+    def _generation_inputs(context: ModuleContext, messages: List, reasoning: str) -> Dict[str, object]:
+        return {
+            "question": context.question,
+            "context": context.context_text,
+            "reasoning": reasoning,
+            "history": messages,
+        }
+
+    def _apply(self, context: ModuleContext, history, response: str, outcome: str, started: float) -> ModuleContext:
+        context.response = response
+        context.extra["speculative"] = {
+            "outcome": outcome,
+            "budget_ms": round(self._budget() * 1000, 1),
+            "elapsed_ms": round((time.monotonic() - started) * 1000, 1),
+        }
+        if history is not None:
+            history.add_message(HumanMessage(content=context.question))
+            history.add_message(AIMessage(content=response))
         return context
 
+    async def _speculate(self, context: ModuleContext, reasoning_chain, reasoning_inputs, chain, messages,
+                         started: float) -> Tuple[str, str]:
+        """Return the chosen answer and ``"refined"`` or ``"draft"``."""
+        deadline = started + self._budget()
+        draft_task = asyncio.ensure_future(chain.ainvoke(self._generation_inputs(context, messages, "")))
+        draft_task.add_done_callback(_discard_result)
+        try:
+            try:
+                # wait_for cancels the reasoning or refinement call when the budget runs out
+                context.reasoning = await asyncio.wait_for(
+                    reasoning_chain.ainvoke(reasoning_inputs), _remaining(deadline)
+                )
+                response = await asyncio.wait_for(
+                    chain.ainvoke(self._generation_inputs(context, messages, context.reasoning)),
+                    _remaining(deadline),
+                )
+                return response, "refined"
+            except asyncio.TimeoutError:
+                logger.info(f"Latency budget of {self._budget():.1f}s exceeded; answering with the draft")
+            except Exception as exc:
+                logger.warning(f"Speculative refinement failed, answering with the draft: {exc}")
+
+            try:
+                response = await asyncio.wait_for(draft_task, _remaining(started + self._draft_timeout()))
+            except asyncio.TimeoutError as exc:
+                raise ModuleError(f"Draft answer did not finish within {self._draft_timeout():.1f}s") from exc
+            except Exception as exc:
+                raise ModuleError(f"Failed to generate response: {exc}") from exc
+            return response, "draft"
+        finally:
+            draft_task.cancel()
+
+    async def _speculate_stream(self, context: ModuleContext, reasoning_chain, reasoning_inputs, chain, messages,
+                                started: float, state: Dict[str, str]) -> AsyncIterator[str]:
+        """Yield the refined or the draft answer; ``state["outcome"]`` records which."""
+        deadline = started + self._budget()
+        draft = chain.astream(self._generation_inputs(context, messages, ""))
+        # Only the draft's first token is fetched ahead; the rest streams once it is chosen
+        draft_first = asyncio.ensure_future(_next_token(draft))
+        draft_first.add_done_callback(_discard_result)
+        refined = None
+        try:
+            try:
+                context.reasoning = await asyncio.wait_for(
+                    reasoning_chain.ainvoke(reasoning_inputs), _remaining(deadline)
+                )
+                refined = chain.astream(self._generation_inputs(context, messages, context.reasoning))
+                first = await asyncio.wait_for(_next_token(refined), _remaining(deadline))
+                stream = refined
+                state["outcome"] = "refined"
+                draft_first.cancel()
+            except asyncio.TimeoutError:
+                logger.info(f"Latency budget of {self._budget():.1f}s exceeded; streaming the draft")
+                stream = None
+            except Exception as exc:
+                logger.warning(f"Speculative refinement failed, streaming the draft: {exc}")
+                stream = None
+
+            if stream is None:
+                state["outcome"] = "draft"
+                try:
+                    first = await asyncio.wait_for(draft_first, _remaining(started + self._draft_timeout()))
+                except asyncio.TimeoutError as exc:
+                    raise ModuleError(f"Draft answer did not start within {self._draft_timeout():.1f}s") from exc
+                except Exception as exc:
+                    raise ModuleError(f"Failed to generate response: {exc}") from exc
+                stream = draft
+
+            if first is None:
+                return
+            yield first
+            try:
+                async for chunk in stream:
+                    if chunk:
+                        yield chunk
+            except Exception as exc:
+                raise ModuleError(f"Failed to generate response: {exc}") from exc
+        finally:
+            draft_first.cancel()
+            await asyncio.gather(draft_first, return_exceptions=True)
+            await _aclose(draft)
+            if refined is not None:
+                await _aclose(refined)
+
+    def run(self, context: ModuleContext) -> ModuleContext:
+        started = time.monotonic()
+        reasoning_chain, reasoning_inputs, chain, history, messages = self._build_chains(context)
+        future = asyncio.run_coroutine_threadsafe(
+            self._speculate(context, reasoning_chain, reasoning_inputs, chain, messages, started),
+            _speculation_loop(),
+        )
+        # Bounded by the draft timeout inside _speculate
+        response, outcome = future.result()
+        return self._apply(context, history, response, outcome, started)
+
+    async def arun(self, context: ModuleContext) -> ModuleContext:
+        started = time.monotonic()
+        # Reading and writing the session history are sync Redis calls
+        reasoning_chain, reasoning_inputs, chain, history, messages = await asyncio.to_thread(
+            call_in_worker, self._build_chains, context
+        )
+        response, outcome = await self._speculate(context, reasoning_chain, reasoning_inputs, chain, messages, started)
+        return await asyncio.to_thread(
+            call_in_worker, self._apply, context, history, response, outcome, started
+        )
+
+    def stream(self, context: ModuleContext) -> Iterator[str]:
+        """Yield the refined answer's or the draft's tokens as they arrive."""
+        started = time.monotonic()
+        reasoning_chain, reasoning_inputs, chain, history, messages = self._build_chains(context)
+        state = {"outcome": "draft"}
+        tokens = self._speculate_stream(context, reasoning_chain, reasoning_inputs, chain, messages, started, state)
+        chunks: List[str] = []
+        for token in _iterate_on_loop(tokens, _speculation_loop()):
+            chunks.append(token)
+            yield token
+        self._apply(context, history, "".join(chunks), state["outcome"], started)
+
+    async def astream(self, context: ModuleContext) -> AsyncIterator[str]:
+        """Async variant of :meth:`stream`."""
+        started = time.monotonic()
+        reasoning_chain, reasoning_inputs, chain, history, messages = await asyncio.to_thread(
+            call_in_worker, self._build_chains, context
+        )
+        state = {"outcome": "draft"}
+        chunks: List[str] = []
+        tokens = self._speculate_stream(context, reasoning_chain, reasoning_inputs, chain, messages, started, state)
+        try:
+            async for token in tokens:
+                chunks.append(token)
+                yield token
+        finally:
+            await tokens.aclose()
+        await asyncio.to_thread(
+            call_in_worker, self._apply, context, history, "".join(chunks), state["outcome"], started
+        )
@@ -1,29 +1,74 @@
-"""Pipeline runner that executes modular RAG pipelines."""
+"""Pipeline runner that executes modular RAG pipelines.
+
+Steps run strictly in order by default. A step may instead declare the
+``ModuleContext`` fields it ``requires``; the runner then schedules it as soon
+as the earlier steps that provide those fields have finished, running
+independent steps concurrently (threads for :meth:`PipelineRunner.run`,
+tasks for :meth:`PipelineRunner.arun`). Steps that run concurrently share one
+``ModuleContext`` and must update it in place.
+
+A module that answers the question itself (e.g. the catalogue router) sets
+``context.halted``; no further steps are started after that.
+
+:meth:`PipelineRunner.stream` (and :meth:`PipelineRunner.astream` under
+ASGI) runs the same steps for Server-Sent Events, yielding stage progress and
+the last step's tokens as they are produced.
+"""
 
 from __future__ import annotations
 
-from typing import Dict, Iterable, List, Sequence, Union
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
-from .base import ModuleContext, PipelineModule, ModuleError
-from .modules import GenerationModule, ReasoningModule, RetrieveModule
+from .base import ModuleContext, PipelineModule, ModuleError, call_in_worker
+from .modules import (
+    GenerationModule,
+    ReasonAndAnswerModule,
+    ReasoningModule,
+    RetrieveModule,
+    RouterModule,
+    SpeculativeAnswerModule,
+)
+from .tracing import PipelineHook, StageRecord, get_default_hooks, new_span_id, new_trace_id
 
 
 ModuleConfig = Union[PipelineModule, Dict[str, object]]
+#: ``("start", module_name)``, ``("end", module_name)`` or ``("token", text)``
+StreamEvent = Tuple[str, str]
+
+
+_MODULE_CACHE: Dict[Tuple[type, str], PipelineModule] = {}
+_MODULE_CACHE_LOCK = threading.Lock()
 
 
 DEFAULT_REGISTRY = {
+    "router": RouterModule,
     "retrieve": RetrieveModule,
     "reasoning": ReasoningModule,
     "generation": GenerationModule,
+    "answer": ReasonAndAnswerModule,
+    "speculative": SpeculativeAnswerModule,
 }
 
 
 class PipelineRunner:
-    """Execute a sequence of pipeline modules."""
+    """Execute a sequence (or dependency graph) of pipeline modules."""
 
-    def __init__(self, steps: Sequence[ModuleConfig], registry: Dict[str, type] | None = None):
+    def __init__(
+        self,
+        steps: Sequence[ModuleConfig],
+        registry: Dict[str, type] | None = None,
+        max_workers: Optional[int] = None,
+        hooks: Optional[Sequence[PipelineHook]] = None,
+    ):
         self.steps = steps
         self.registry = registry or DEFAULT_REGISTRY
+        self.max_workers = max_workers
+        self.hooks = list(hooks) if hooks is not None else get_default_hooks()
 
     def _build_module(self, config: ModuleConfig) -> PipelineModule:
         if isinstance(config, PipelineModule):
@@ -38,11 +83,245 @@ class PipelineRunner:
 
         params = config.get("config", {}) or {}
         module_cls = self.registry[module_type]
-        return module_cls(**params)
+        try:
+            key = (module_cls, json.dumps(params, sort_keys=True))
+        except (TypeError, ValueError):
+            return module_cls(**params)
 
-    def run(self, context: ModuleContext) -> ModuleContext:
+        # Modules are stateless; share one instance per (class, params) across requests
+        module = _MODULE_CACHE.get(key)
+        if module is None:
+            with _MODULE_CACHE_LOCK:
+                module = _MODULE_CACHE.get(key)
+                if module is None:
+                    module = module_cls(**params)
+                    _MODULE_CACHE[key] = module
+        return module
+
+    # ------------------------------------------------------------------
+    # Dependency graph
+    # ------------------------------------------------------------------
+    def _is_dag(self) -> bool:
+        return any(isinstance(config, dict) and "requires" in config for config in self.steps)
+
+    @staticmethod
+    def _step_provides(config: ModuleConfig, module: PipelineModule) -> Set[str]:
+        fields = config.get("provides") if isinstance(config, dict) else None
+        return set(fields if fields is not None else module.provides)
+
+    def steps_providing(self, field: str) -> Set[str]:
+        """Names of the steps that write ``field`` to the context."""
+        names = set()
         for config in self.steps:
             module = self._build_module(config)
-            context = module.run(context)
+            if field in self._step_provides(config, module):
+                names.add(module.name)
+        return names
+
+    def _dependencies(self, modules: List[PipelineModule]) -> List[Set[int]]:
+        """Return, for each step, the indices of the steps it waits on.
+
+        A step with ``requires`` waits on every earlier step that provides one
+        of those fields; fields nobody provides (``question``, ``history``...)
+        are available from the start. A step without ``requires`` keeps the
+        linear behaviour and waits on every earlier step.
+        """
+        provided = [self._step_provides(config, module) for config, module in zip(self.steps, modules)]
+
+        dependencies: List[Set[int]] = []
+        for index, config in enumerate(self.steps):
+            requires: Optional[Iterable[str]] = (
+                config.get("requires") if isinstance(config, dict) else None
+            )
+            if requires is None:
+                dependencies.append(set(range(index)))
+                continue
+            required = set(requires)
+            dependencies.append({
+                earlier for earlier in range(index) if provided[earlier] & required
+            })
+        return dependencies
+
+    # ------------------------------------------------------------------
+    # Instrumentation
+    # ------------------------------------------------------------------
+    def _start_stage(self, module: PipelineModule, context: ModuleContext) -> StageRecord:
+        trace_id = context.extra.setdefault("trace_id", new_trace_id())
+        record = StageRecord(
+            module=module.name,
+            trace_id=trace_id,
+            span_id=new_span_id(),
+            start_ns=time.time_ns(),
+        )
+        for hook in self.hooks:
+            hook.on_stage_start(module, context, record)
+        return record
+
+    def _finish_stage(
+        self,
+        module: PipelineModule,
+        context: ModuleContext,
+        record: StageRecord,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        record.end_ns = time.time_ns()
+        record.error = str(error) if error is not None else None
+        record.capture_payload(context)
+        context.extra.setdefault("timings", []).append(record.as_dict())
+        for hook in self.hooks:
+            hook.on_stage_end(module, context, record)
+
+    def execute(self, module: PipelineModule, context: ModuleContext) -> ModuleContext:
+        """Run a single module with timing records and hooks applied."""
+        record = self._start_stage(module, context)
+        try:
+            result = module.run(context)
+        except BaseException as exc:
+            self._finish_stage(module, context, record, exc)
+            raise
+        self._finish_stage(module, result, record)
+        return result
+
+    async def aexecute(self, module: PipelineModule, context: ModuleContext) -> ModuleContext:
+        """Async variant of :meth:`execute`."""
+        record = self._start_stage(module, context)
+        try:
+            result = await module.arun(context)
+        except BaseException as exc:
+            self._finish_stage(module, context, record, exc)
+            raise
+        self._finish_stage(module, result, record)
+        return result
+
+    def _stream_stage(self, module: PipelineModule, context: ModuleContext) -> Iterator[StreamEvent]:
+        """Stream a module's tokens with the same timing records as :meth:`execute`."""
+        record = self._start_stage(module, context)
+        try:
+            for token in module.stream(context):
+                yield "token", token
+        except BaseException as exc:
+            self._finish_stage(module, context, record, exc)
+            raise
+        self._finish_stage(module, context, record)
+
+    async def _astream_stage(self, module: PipelineModule, context: ModuleContext) -> AsyncIterator[StreamEvent]:
+        """Async variant of :meth:`_stream_stage`."""
+        record = self._start_stage(module, context)
+        try:
+            async for token in module.astream(context):
+                yield "token", token
+        except BaseException as exc:
+            self._finish_stage(module, context, record, exc)
+            raise
+        self._finish_stage(module, context, record)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+    def run(self, context: ModuleContext) -> ModuleContext:
+        if not self._is_dag():
+            for config in self.steps:
+                module = self._build_module(config)
+                context = self.execute(module, context)
+                if context.halted:
+                    break
+            return context
+
+        modules = [self._build_module(config) for config in self.steps]
+        dependencies = self._dependencies(modules)
+        done: Set[int] = set()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers or len(modules)) as executor:
+            while len(done) < len(modules):
+                for index, module in enumerate(modules):
+                    if context.halted or index in done or index in running.values():
+                        continue
+                    if dependencies[index] <= done:
+                        running[executor.submit(call_in_worker, self.execute, module, context)] = index
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception:
+                        for pending in running:
+                            pending.cancel()
+                        raise
+                    done.add(index)
         return context
 
+    def stream(self, context: ModuleContext) -> Iterator[StreamEvent]:
+        """Run the steps in order, yielding progress events as they happen.
+
+        Each step is bracketed by ``("start", name)`` and ``("end", name)``.
+        The last step streams ``("token", text)`` events through its
+        ``stream`` method when it has one; a step that halts the pipeline has
+        its ``context.response`` yielded as a single token.
+        """
+        modules = [self._build_module(config) for config in self.steps]
+        for index, module in enumerate(modules):
+            yield "start", module.name
+            if index == len(modules) - 1 and hasattr(module, "stream"):
+                yield from self._stream_stage(module, context)
+            else:
+                context = self.execute(module, context)
+            yield "end", module.name
+            if context.halted:
+                if context.response:
+                    yield "token", context.response
+                break
+
+    async def astream(self, context: ModuleContext) -> AsyncIterator[StreamEvent]:
+        """Async variant of :meth:`stream` using ``arun`` and ``astream``."""
+        modules = [self._build_module(config) for config in self.steps]
+        for index, module in enumerate(modules):
+            yield "start", module.name
+            if index == len(modules) - 1 and hasattr(module, "astream"):
+                async for event in self._astream_stage(module, context):
+                    yield event
+            else:
+                context = await self.aexecute(module, context)
+            yield "end", module.name
+            if context.halted:
+                if context.response:
+                    yield "token", context.response
+                break
+
+    async def arun(self, context: ModuleContext) -> ModuleContext:
+        """Execute the steps with each module's awaitable ``arun``."""
+        if not self._is_dag():
+            for config in self.steps:
+                module = self._build_module(config)
+                context = await self.aexecute(module, context)
+                if context.halted:
+                    break
+            return context
+
+        modules = [self._build_module(config) for config in self.steps]
+        dependencies = self._dependencies(modules)
+        done: Set[int] = set()
+        running: Dict[asyncio.Task, int] = {}
+
+        try:
+            while len(done) < len(modules):
+                for index, module in enumerate(modules):
+                    if context.halted or index in done or index in running.values():
+                        continue
+                    if dependencies[index] <= done:
+                        running[asyncio.ensure_future(self.aexecute(module, context))] = index
+                if not running:
+                    break
+
+                finished, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    index = running.pop(task)
+                    task.result()
+                    done.add(index)
+        finally:
+            for task in running:
+                task.cancel()
+        return context
@@ -0,0 +1,217 @@
+"""Per-stage timing records and pluggable tracing hooks for the pipeline.
+
+``PipelineRunner`` wraps every module call in a :class:`StageRecord` (wall
+time, error, payload sizes) and appends it to ``ModuleContext.extra["timings"]``.
+Hooks receive each record; built-ins cover logging, Prometheus-style process
+metrics and OpenTelemetry-compatible spans written to a local JSONL file.
+Hooks are selected with ``PIPELINE_HOOKS`` (default ``logging,metrics``).
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+from .base import ModuleContext, PipelineModule
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageRecord:
+    """Timing and payload information for one module execution."""
+
+    module: str
+    trace_id: str
+    span_id: str
+    start_ns: int
+    end_ns: int = 0
+    error: Optional[str] = None
+    context_chars: int = 0
+    reasoning_chars: int = 0
+    response_chars: int = 0
+    images: int = 0
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1_000_000
+
+    def capture_payload(self, context: ModuleContext) -> None:
+        self.context_chars = len(context.context_text or "")
+        self.reasoning_chars = len(context.reasoning or "")
+        self.response_chars = len(context.response or "")
+        self.images = len(context.images or [])
+
+    def as_dict(self) -> Dict[str, object]:
+        data = asdict(self)
+        data["duration_ms"] = round(self.duration_ms, 3)
+        return data
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex
+
+
+def new_span_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class PipelineHook:
+    """Base hook; override the callbacks you need."""
+
+    def on_stage_start(self, module: PipelineModule, context: ModuleContext, record: StageRecord) -> None:
+        pass
+
+    def on_stage_end(self, module: PipelineModule, context: ModuleContext, record: StageRecord) -> None:
+        pass
+
+
+class LoggingHook(PipelineHook):
+    """Log one line per stage."""
+
+    def on_stage_end(self, module, context, record):
+        if record.error:
+            logger.warning(
+                f"Pipeline stage {record.module} failed after {record.duration_ms:.1f}ms: {record.error}"
+            )
+        else:
+            logger.info(
+                f"Pipeline stage {record.module} took {record.duration_ms:.1f}ms "
+                f"(context={record.context_chars} reasoning={record.reasoning_chars} images={record.images})"
+            )
+
+
+class MetricsHook(PipelineHook):
+    """Aggregate per-module counters and latency histograms in-process."""
+
+    BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._init_state()
+
+    def _init_state(self) -> None:
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.duration_sum_ms: Dict[str, float] = defaultdict(float)
+        self.buckets: Dict[str, List[int]] = defaultdict(lambda: [0] * len(self.BUCKETS_MS))
+        self.payload_chars: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._init_state()
+
+    def on_stage_end(self, module, context, record):
+        duration = record.duration_ms
+        with self._lock:
+            self.calls[record.module] += 1
+            self.duration_sum_ms[record.module] += duration
+            if record.error:
+                self.errors[record.module] += 1
+            counts = self.buckets[record.module]
+            for index, bound in enumerate(self.BUCKETS_MS):
+                if duration <= bound:
+                    counts[index] += 1
+            payload = self.payload_chars[record.module]
+            payload["context"] += record.context_chars
+            payload["reasoning"] += record.reasoning_chars
+            payload["response"] += record.response_chars
+
+    def render_prometheus(self) -> str:
+        """Render the aggregates in the Prometheus text exposition format."""
+        lines = [
+            "# HELP pipeline_stage_duration_ms Pipeline stage wall time in milliseconds.",
+            "# TYPE pipeline_stage_duration_ms histogram",
+        ]
+        with self._lock:
+            modules = sorted(self.calls)
+            for name in modules:
+                counts = self.buckets[name]
+                for bound, count in zip(self.BUCKETS_MS, counts):
+                    lines.append(f'pipeline_stage_duration_ms_bucket{{module="{name}",le="{bound}"}} {count}')
+                lines.append(f'pipeline_stage_duration_ms_bucket{{module="{name}",le="+Inf"}} {self.calls[name]}')
+                lines.append(f'pipeline_stage_duration_ms_sum{{module="{name}"}} {self.duration_sum_ms[name]:.3f}')
+                lines.append(f'pipeline_stage_duration_ms_count{{module="{name}"}} {self.calls[name]}')
+            lines.append("# HELP pipeline_stage_errors_total Pipeline stage failures.")
+            lines.append("# TYPE pipeline_stage_errors_total counter")
+            for name in modules:
+                lines.append(f'pipeline_stage_errors_total{{module="{name}"}} {self.errors[name]}')
+            lines.append("# HELP pipeline_stage_payload_chars_total Characters produced per payload kind.")
+            lines.append("# TYPE pipeline_stage_payload_chars_total counter")
+            for name in modules:
+                for kind, value in sorted(self.payload_chars[name].items()):
+                    lines.append(
+                        f'pipeline_stage_payload_chars_total{{module="{name}",kind="{kind}"}} {value}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+class SpanExporterHook(PipelineHook):
+    """Write OpenTelemetry-compatible span JSON lines to a local file."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or os.getenv("PIPELINE_SPAN_FILE", "pipeline_spans.jsonl")
+        self._lock = threading.Lock()
+
+    def on_stage_end(self, module, context, record):
+        span = {
+            "traceId": record.trace_id,
+            "spanId": record.span_id,
+            "name": f"pipeline.{record.module}",
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": record.start_ns,
+            "endTimeUnixNano": record.end_ns,
+            "attributes": {
+                "rag.context_chars": record.context_chars,
+                "rag.reasoning_chars": record.reasoning_chars,
+                "rag.response_chars": record.response_chars,
+                "rag.images": record.images,
+                "session.id": context.session_id,
+            },
+            "status": {"code": "STATUS_CODE_ERROR", "message": record.error}
+            if record.error
+            else {"code": "STATUS_CODE_OK"},
+        }
+        try:
+            with self._lock, open(self.path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(span, ensure_ascii=False) + "\n")
+        except OSError as exc:
+            logger.error(f"Failed to export pipeline span: {exc}")
+
+
+metrics_hook = MetricsHook()
+
+_HOOK_FACTORIES = {
+    "logging": LoggingHook,
+    "metrics": lambda: metrics_hook,
+    "otel": SpanExporterHook,
+}
+
+
+def get_default_hooks() -> List[PipelineHook]:
+    """Build the hooks listed in ``PIPELINE_HOOKS``."""
+    names = [name.strip() for name in os.getenv("PIPELINE_HOOKS", "logging,metrics").split(",")]
+    hooks = []
+    for name in names:
+        if not name:
+            continue
+        factory = _HOOK_FACTORIES.get(name)
+        if factory is None:
+            logger.warning(f"Unknown pipeline hook: {name}")
+            continue
+        hooks.append(factory())
+    return hooks
+
+
+def server_timing_header(context: ModuleContext) -> str:
+    """Format recorded stage timings as a ``Server-Timing`` header value."""
+    return ", ".join(
+        f"{record['module']};dur={record['duration_ms']}"
+        for record in context.extra.get("timings", [])
+    )
@@ -0,0 +1,351 @@
+"""Columnar index of the product catalogue for LLM-free spec lookups.
+
+The catalogue rows (Model, Color, Storage, RAM, Camera, Display, Battery,
+Price, Image Path) are parsed from the ingested chunks and stored column-wise
+in ``catalogue_index.json`` next to the Chroma files of each index version.
+``CatalogueIndex.answer`` resolves questions such as "256GB 모델 가격" or
+"실버 색상 있나요" to an attribute lookup or filter over those columns and
+renders the answer from a template, without embeddings or chat models.
+Questions it cannot resolve confidently return None and take the RAG path.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from langchain.schema import Document
+
+CATALOGUE_INDEX_FILENAME = "catalogue_index.json"
+
+COLUMNS = ("Model", "Color", "Storage", "RAM", "Camera", "Display", "Battery", "Price", "Image Path")
+FILTER_COLUMNS = ("Model", "Color", "Storage", "RAM")
+
+# Matched per word, not as substrings: "램" must not fire inside "프로그램"
+ATTRIBUTE_KEYWORDS = {
+    "Price": ("가격", "price", "cost"),
+    "Color": ("색상", "색깔", "컬러", "color", "colour"),
+    "Storage": ("저장", "storage"),
+    "RAM": ("ram", "램", "메모리", "memory"),
+    "Camera": ("카메라", "화소", "camera"),
+    "Display": ("디스플레이", "화면", "display", "screen"),
+    "Battery": ("배터리", "battery"),
+}
+ATTRIBUTE_LABELS = {
+    "Price": "가격",
+    "Color": "색상",
+    "Storage": "저장용량",
+    "RAM": "RAM",
+    "Camera": "카메라",
+    "Display": "디스플레이",
+    "Battery": "배터리",
+}
+# "얼마" / "how much" asks about price only when no other attribute is named ("램 얼마나 되나요")
+QUANTITY_KEYWORDS = ("얼마", "how much")
+# An attribute alone ("가격 알려줘") is a lookup only with a question cue; "배터리 수명 관리" is not
+LOOKUP_KEYWORDS = (
+    "알려", "얼마", "뭐", "무엇", "몇", "어떻게 되", "되나요", "인가요", "이에요", "예요", "?",
+    "what", "how much", "list",
+)
+AVAILABILITY_KEYWORDS = ("있나요", "있어요", "있습니까", "있는지", "나오나요", "나와요", "available")
+# Questions that need judgement rather than a lookup stay on the LLM path
+OPEN_ENDED_KEYWORDS = (
+    "비교", "추천", "차이", "장단점", "어때", "좋은", "좋을", "나은", "왜",
+    "compare", "recommend", "better", "difference", "why", " vs",
+)
+SYNONYMS = (
+    ("s25+", "s25 plus"),
+    ("울트라", "ultra"),
+    ("플러스", "plus"),
+    ("엣지", "edge"),
+    ("슬림", "slim"),
+    ("폴드", "fold"),
+    ("플립", "flip"),
+    ("갤럭시", "galaxy"),
+    ("실버", "silver"),
+    ("블랙", "black"),
+    ("네이비", "navy"),
+    ("블루", "blue"),
+    ("그린", "green"),
+    ("화이트", "white"),
+    ("그레이", "gray"),
+    ("핑크", "pink"),
+    ("바이올렛", "violet"),
+    ("민트", "mint"),
+    ("골드", "gold"),
+    ("티타늄", "titanium"),
+    ("테라", "tb"),
+    ("기가", "gb"),
+)
+
+_UNIT_RE = re.compile(r"(\d+)\s*(gb|tb)\b")
+# Mentions that look like catalogue values; unmatched ones mean "not in the catalogue".
+# Model mentions include their variant word, so "s25 edge" is not taken for "s25"
+_VALUE_MENTION_RE = re.compile(
+    r"(?<![0-9a-z])(s\d{2}(?:\s*(?:plus|ultra|edge|fe|slim))?|(?:fold|flip)\d*|\d+(?:gb|tb))(?![0-9a-z])"
+)
+COLOR_TERMS = frozenset({
+    "silver", "black", "navy", "blue", "green", "white", "gray", "pink", "violet", "mint", "gold", "titanium",
+})
+
+
+def normalize(text: str) -> str:
+    """Lowercase, map Korean product terms to catalogue spelling and join units."""
+    text = (text or "").lower()
+    for source, target in SYNONYMS:
+        text = text.replace(source, target)
+    return _UNIT_RE.sub(r"\1\2", text)
+
+
+def _term_pattern(term: str) -> "re.Pattern[str]":
+    return re.compile(rf"(?<![0-9a-z]){re.escape(term)}(?![0-9a-z])")
+
+
+def _keyword_pattern(keyword: str) -> "re.Pattern[str]":
+    if keyword.isascii():
+        return _term_pattern(keyword)
+    # Korean particles attach to the end ("램이", "가격은"), so only the start is anchored
+    return re.compile(rf"(?<![0-9a-z\uac00-\ud7a3]){re.escape(keyword)}")
+
+
+_ATTRIBUTE_PATTERNS = {
+    column: [_keyword_pattern(keyword) for keyword in keywords]
+    for column, keywords in ATTRIBUTE_KEYWORDS.items()
+}
+_QUANTITY_PATTERNS = [_keyword_pattern(keyword) for keyword in QUANTITY_KEYWORDS]
+
+
+def requested_attributes(normalized: str) -> List[str]:
+    """Catalogue columns a normalized question asks about, matched per word."""
+    requested = [
+        column for column, patterns in _ATTRIBUTE_PATTERNS.items()
+        if any(pattern.search(normalized) for pattern in patterns)
+    ]
+    if not requested and any(pattern.search(normalized) for pattern in _QUANTITY_PATTERNS):
+        requested = ["Price"]
+    return requested
+
+
+@dataclass
+class CatalogueAnswer:
+    """A templated answer and the catalogue rows it was built from."""
+
+    response: str
+    rows: List[Dict[str, str]]
+    filters: Dict[str, List[str]]
+    attributes: List[str]
+    images: List[str] = field(default_factory=list)
+
+    @property
+    def context(self) -> str:
+        """Matching rows in the same ``Column: value`` layout as the chunks."""
+        return "\n\n".join(
+            "\n".join(f"{column}: {row[column]}" for column in COLUMNS if row.get(column))
+            for row in self.rows
+        )
+
+
+class CatalogueIndex:
+    """Column-oriented catalogue rows with per-value row postings."""
+
+    def __init__(self, columns: Dict[str, List[str]]) -> None:
+        self.columns = {column: list(columns.get(column, [])) for column in COLUMNS}
+        self.row_count = len(self.columns["Model"])
+        self._postings: Dict[str, Dict[str, List[int]]] = {}
+        self._patterns: Dict[str, List[tuple]] = {}
+        for column in FILTER_COLUMNS:
+            postings: Dict[str, List[int]] = {}
+            for row, value in enumerate(self.columns[column]):
+                if value:
+                    postings.setdefault(value, []).append(row)
+            self._postings[column] = postings
+            self._patterns[column] = [
+                (value, [_term_pattern(term) for term in self._match_terms(column, value)])
+                for value in postings
+            ]
+
+    @staticmethod
+    def _match_terms(column: str, value: str) -> List[str]:
+        normalized = normalize(value)
+        if column == "Model":
+            # "galaxy s25 ultra" is asked for as "s25 ultra" / "S25 울트라"
+            return [normalized.replace("galaxy ", "", 1)]
+        if column == "Color":
+            # "블랙" should find "Phantom Black"
+            return [normalized] + [word for word in normalized.split() if len(word) > 2]
+        return [normalized]
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document]) -> "CatalogueIndex":
+        """Collect one row per chunk that lists catalogue columns as ``Column: value``."""
+        columns: Dict[str, List[str]] = {column: [] for column in COLUMNS}
+        seen = set()
+        for document in documents:
+            row = {}
+            for line in document.page_content.splitlines():
+                name, sep, value = line.partition(":")
+                if sep and name.strip() in COLUMNS and value.strip():
+                    row[name.strip()] = value.strip()
+            image_path = (document.metadata or {}).get("image_path")
+            if image_path and "Image Path" not in row:
+                row["Image Path"] = str(image_path)
+            if "Model" not in row:
+                continue
+            key = tuple(row.get(column, "") for column in COLUMNS)
+            if key in seen:
+                continue
+            seen.add(key)
+            for column in COLUMNS:
+                columns[column].append(row.get(column, ""))
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def row(self, index: int) -> Dict[str, str]:
+        return {column: values[index] for column, values in self.columns.items()}
+
+    def filter(self, filters: Dict[str, Sequence[str]]) -> List[int]:
+        """Row indices matching every column filter (values within a column are OR-ed)."""
+        rows = set(range(self.row_count))
+        for column, values in filters.items():
+            matched = set()
+            for value in values:
+                matched.update(self._postings.get(column, {}).get(value, ()))
+            rows &= matched
+        return sorted(rows)
+
+    def parse_filters(self, question: str) -> Dict[str, List[str]]:
+        """Return the catalogue values mentioned in ``question``, per column."""
+        normalized = normalize(question)
+        filters: Dict[str, List[str]] = {}
+        for column in FILTER_COLUMNS:
+            if column == "Model":
+                # "s25 ultra" also contains "s25": match the longest models first
+                # and blank them out, so "s25" only counts when named on its own
+                text = normalized
+                matched = []
+                for value, patterns in sorted(self._patterns[column], key=lambda item: -len(item[0])):
+                    if any(pattern.search(text) for pattern in patterns):
+                        matched.append(value)
+                        for pattern in patterns:
+                            text = pattern.sub(" ", text)
+            else:
+                matched = [
+                    value for value, patterns in self._patterns[column]
+                    if any(pattern.search(normalized) for pattern in patterns)
+                ]
+            if matched:
+                filters[column] = matched
+
+        # "12GB" can be RAM or storage; the RAM keyword decides
+        shared = set(filters.get("Storage", ())) & set(filters.get("RAM", ()))
+        if shared:
+            keep = "RAM" if "RAM" in requested_attributes(normalized) else "Storage"
+            drop = "Storage" if keep == "RAM" else "RAM"
+            filters[drop] = [value for value in filters[drop] if value not in shared]
+            if not filters[drop]:
+                del filters[drop]
+        return filters
+
+    def unmatched_mentions(self, question: str, filters: Dict[str, List[str]]) -> List[str]:
+        """Model, size and colour mentions that match no catalogue value."""
+        normalized = normalize(question)
+        known = {
+            term
+            for column, values in filters.items()
+            for value in values
+            for term in self._match_terms(column, value)
+            for term in [term, *term.split()]
+        }
+        known.update(normalize(value) for column in ("Storage", "RAM") for value in self._postings[column])
+        mentions = _VALUE_MENTION_RE.findall(normalized)
+        mentions += [word for word in re.findall(r"[a-z]+", normalized) if word in COLOR_TERMS]
+        return [mention for mention in dict.fromkeys(mentions) if mention not in known]
+
+    def answer(self, question: str) -> Optional[CatalogueAnswer]:
+        """Answer a spec lookup or availability question, or return None."""
+        if not self.row_count:
+            return None
+        normalized = normalize(question)
+        if any(keyword in normalized for keyword in OPEN_ENDED_KEYWORDS):
+            return None
+
+        filters = self.parse_filters(question)
+        requested = requested_attributes(normalized)
+        # "실버 색상 있나요": the colour is the filter, not the attribute asked for
+        attributes = [column for column in requested if column not in filters]
+        availability = any(keyword in normalized for keyword in AVAILABILITY_KEYWORDS)
+        unmatched = self.unmatched_mentions(question, filters)
+        if unmatched and not availability:
+            # A model or value the catalogue does not know: let the LLM answer
+            return None
+        if not (filters or unmatched) and not any(keyword in normalized for keyword in LOOKUP_KEYWORDS):
+            # No catalogue value named and no clear lookup question
+            return None
+        if not attributes and not ((filters or unmatched) and (availability or requested)):
+            return None
+
+        rows = [] if unmatched else [self.row(index) for index in self.filter(filters)]
+        if not rows and not availability:
+            return None
+
+        return CatalogueAnswer(
+            response=self._render(rows, filters, attributes, unmatched),
+            rows=rows,
+            filters=filters,
+            attributes=attributes,
+            images=list(dict.fromkeys(row["Image Path"] for row in rows if row.get("Image Path"))),
+        )
+
+    @staticmethod
+    def _render(
+        rows: List[Dict[str, str]],
+        filters: Dict[str, List[str]],
+        attributes: List[str],
+        unmatched: Sequence[str] = (),
+    ) -> str:
+        condition = ", ".join([*(value for values in filters.values() for value in values), *unmatched])
+        if not rows:
+            return f"아니요, 조건({condition})에 맞는 모델은 없습니다."
+
+        identity = ["Model"] + [column for column in ("Color", "Storage") if column not in attributes]
+        lines = []
+        for row in rows:
+            name = " ".join(row[column] for column in identity if row.get(column))
+            if attributes:
+                details = ", ".join(
+                    f"{ATTRIBUTE_LABELS[column]} {row[column]}" for column in attributes if row.get(column)
+                )
+                lines.append(f"- {name}: {details}")
+            else:
+                lines.append(f"- {name}")
+        lines = list(dict.fromkeys(lines))
+
+        if attributes:
+            header = f"조건({condition})에 맞는 모델 정보입니다:" if condition else "전체 모델 정보입니다:"
+        else:
+            header = f"네, 조건({condition})에 맞는 모델이 있습니다:"
+        return "\n".join([header, *lines])
+
+    def save(self, directory: str) -> str:
+        """Write the index atomically to ``directory``; return the file path."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, CATALOGUE_INDEX_FILENAME)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"columns": self.columns}, handle, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["CatalogueIndex"]:
+        """Load the index saved in ``directory``, or None if there is none."""
+        try:
+            with open(os.path.join(directory, CATALOGUE_INDEX_FILENAME), encoding="utf-8") as handle:
+                return cls(json.load(handle)["columns"])
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,360 @@
+"""Latency-aware routing of chat calls across providers.
+
+``ProviderRouter`` keeps per-provider latency and error EWMAs plus a rolling
+window for the p90. ``HedgedChatModel`` is a chat model that sends each call
+to the preferred provider and, once that call has taken longer than the
+provider's observed p90 (or failed), sends a duplicate to the alternate
+provider. The first successful response wins and the other call is
+cancelled. Both attempts are asyncio tasks; sync callers run the race on a
+shared background event loop, so no worker thread is held per attempt.
+Duplicates are capped at ``HEDGE_MAX_IN_FLIGHT`` process-wide; when every
+slot is busy the call keeps waiting on its primary instead of hedging.
+Provider order is steered by the tracked EWMAs, so a degraded provider stops
+being tried first.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessageChunk, BaseMessage, BaseMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+logger = logging.getLogger(__name__)
+
+Backend = Tuple[str, Any]
+
+
+def as_generation_chunk(message: BaseMessage) -> ChatGenerationChunk:
+    """Wrap a streamed message; models without native streaming yield one full message."""
+    if not isinstance(message, BaseMessageChunk):
+        message = AIMessageChunk(content=message.content)
+    return ChatGenerationChunk(message=message)
+
+
+class ProviderStats:
+    """Latency/error EWMAs and a rolling latency window for one provider."""
+
+    def __init__(self, window: int) -> None:
+        self.latency_ewma: Optional[float] = None
+        self.error_ewma = 0.0
+        self.latencies: "deque[float]" = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.hedges = 0
+        self.failovers = 0
+
+    def p90(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.9 * len(ordered)))]
+
+
+class ProviderRouter:
+    """Track provider health and decide call order and hedge delays."""
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        window: int = 200,
+        min_samples: int = 20,
+        default_delay: float = 2.0,
+        min_delay: float = 0.05,
+        error_threshold: float = 0.5,
+        steer_ratio: float = 2.0,
+    ) -> None:
+        self.alpha = alpha
+        self.window = window
+        self.min_samples = min_samples
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.error_threshold = error_threshold
+        self.steer_ratio = steer_ratio
+        self._stats: Dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "ProviderRouter":
+        return cls(
+            alpha=float(os.getenv("HEDGE_EWMA_ALPHA", "0.2")),
+            window=int(os.getenv("HEDGE_WINDOW", "200")),
+            min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "20")),
+            default_delay=float(os.getenv("HEDGE_DEFAULT_DELAY_MS", "2000")) / 1000,
+            min_delay=float(os.getenv("HEDGE_MIN_DELAY_MS", "50")) / 1000,
+            error_threshold=float(os.getenv("HEDGE_ERROR_THRESHOLD", "0.5")),
+            steer_ratio=float(os.getenv("HEDGE_STEER_RATIO", "2.0")),
+        )
+
+    def _get(self, provider: str) -> ProviderStats:
+        stats = self._stats.get(provider)
+        if stats is None:
+            stats = self._stats[provider] = ProviderStats(self.window)
+        return stats
+
+    def record(self, provider: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            stats = self._get(provider)
+            stats.calls += 1
+            stats.error_ewma += self.alpha * ((0.0 if ok else 1.0) - stats.error_ewma)
+            if not ok:
+                stats.errors += 1
+                return
+            stats.latencies.append(latency)
+            if stats.latency_ewma is None:
+                stats.latency_ewma = latency
+            else:
+                stats.latency_ewma += self.alpha * (latency - stats.latency_ewma)
+
+    def record_hedge(self, provider: str, failover: bool = False) -> None:
+        with self._lock:
+            stats = self._get(provider)
+            if failover:
+                stats.failovers += 1
+            else:
+                stats.hedges += 1
+
+    def hedge_delay(self, provider: str) -> float:
+        """Seconds to wait on ``provider`` before hedging: its p90 once known."""
+        with self._lock:
+            stats = self._get(provider)
+            if len(stats.latencies) < self.min_samples:
+                return self.default_delay
+            return max(self.min_delay, stats.p90())
+
+    def _should_swap(self, first: ProviderStats, second: ProviderStats) -> bool:
+        if first.error_ewma >= self.error_threshold and second.error_ewma < first.error_ewma:
+            return True
+        if first.latency_ewma is None or second.latency_ewma is None:
+            return False
+        return first.latency_ewma > self.steer_ratio * second.latency_ewma
+
+    def order(self, backends: Sequence[Backend]) -> List[Backend]:
+        """Return ``backends`` with the healthier provider first."""
+        backends = list(backends)
+        if len(backends) < 2:
+            return backends
+        with self._lock:
+            if self._should_swap(self._get(backends[0][0]), self._get(backends[1][0])):
+                backends[0], backends[1] = backends[1], backends[0]
+        return backends
+
+    def snapshot(self) -> Dict[str, Dict[str, object]]:
+        with self._lock:
+            return {
+                provider: {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "hedges": stats.hedges,
+                    "failovers": stats.failovers,
+                    "latency_ewma_ms": round(stats.latency_ewma * 1000, 1) if stats.latency_ewma is not None else None,
+                    "error_ewma": round(stats.error_ewma, 3),
+                    "p90_ms": round(stats.p90() * 1000, 1) if stats.latencies else None,
+                }
+                for provider, stats in self._stats.items()
+            }
+
+
+_HEDGE_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_HEDGE_SLOTS: Optional[threading.BoundedSemaphore] = None
+_HEDGE_LOCK = threading.Lock()
+
+
+def _hedge_loop() -> asyncio.AbstractEventLoop:
+    """Background event loop that runs hedged races for sync callers."""
+    global _HEDGE_LOOP
+    with _HEDGE_LOCK:
+        if _HEDGE_LOOP is None or _HEDGE_LOOP.is_closed():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="hedge", daemon=True).start()
+            _HEDGE_LOOP = loop
+        return _HEDGE_LOOP
+
+
+def _hedge_slots() -> threading.BoundedSemaphore:
+    """Process-wide cap on in-flight hedge duplicates (``HEDGE_MAX_IN_FLIGHT``)."""
+    global _HEDGE_SLOTS
+    with _HEDGE_LOCK:
+        if _HEDGE_SLOTS is None:
+            _HEDGE_SLOTS = threading.BoundedSemaphore(int(os.getenv("HEDGE_MAX_IN_FLIGHT", "16")))
+        return _HEDGE_SLOTS
+
+
+class HedgedChatModel(BaseChatModel):
+    """Chat model that hedges calls between a primary and an alternate backend.
+
+    ``backends`` is ``[(primary_name, model), (alternate_name, model)]``.
+    With ``hedge=False`` the alternate is only called after a failure (plain
+    failover, called inline on the caller's thread). Sync hedged calls run the
+    async race on a background event loop.
+    Streaming calls are not duplicated: they fail over to the alternate only
+    if the preferred backend errors before its first chunk.
+    """
+
+    backends: List[Tuple[str, Any]]
+    router: Any
+    hedge: bool = True
+
+    @property
+    def _llm_type(self) -> str:
+        return "hedged-chat"
+
+    # ------------------------------------------------------------------
+    def _timed(self, name: str, call: Callable[[], Any]) -> Any:
+        started = time.monotonic()
+        try:
+            result = call()
+        except Exception:
+            self.router.record(name, time.monotonic() - started, ok=False)
+            raise
+        self.router.record(name, time.monotonic() - started, ok=True)
+        return result
+
+    async def _atimed(self, name: str, call: Callable[[], Any]) -> Any:
+        started = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.router.record(name, time.monotonic() - started, ok=False)
+            raise
+        self.router.record(name, time.monotonic() - started, ok=True)
+        return result
+
+    def _hedge_at(self, provider: str) -> float:
+        if not self.hedge:
+            return float("inf")
+        return time.monotonic() + self.router.hedge_delay(provider)
+
+    def _failover(self, call: Callable[[Any], Any]) -> Any:
+        """Call the backends in order on the caller's thread until one succeeds."""
+        backends = self.router.order(self.backends)
+        for position, (name, model) in enumerate(backends):
+            try:
+                return self._timed(name, lambda model=model: call(model))
+            except Exception as exc:
+                if position == len(backends) - 1:
+                    raise
+                logger.warning(f"Chat provider {name} failed, failing over: {exc}")
+                self.router.record_hedge(name, failover=True)
+
+    async def _ahedged(self, call: Callable[[Any], Any]) -> Any:
+        (first_name, first_model), *rest = self.router.order(self.backends)
+        hedge_at = self._hedge_at(first_name)
+        pending = {asyncio.ensure_future(self._atimed(first_name, lambda model=first_model: call(model)))}
+        errors: List[BaseException] = []
+
+        try:
+            while pending:
+                timeout = max(0.0, hedge_at - time.monotonic()) if rest and hedge_at < float("inf") else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    errors.append(task.exception())
+                if rest and (errors or time.monotonic() >= hedge_at):
+                    slots = None if errors else _hedge_slots()
+                    if slots is not None and not slots.acquire(blocking=False):
+                        # Every hedge slot is busy: keep waiting on the primary rather than pile on
+                        logger.info(f"Hedge limit reached; not hedging {first_name}")
+                        hedge_at = float("inf")
+                        continue
+                    self.router.record_hedge(first_name, failover=bool(errors))
+                    second_name, second_model = rest.pop(0)
+                    task = asyncio.ensure_future(self._atimed(second_name, lambda model=second_model: call(model)))
+                    if slots is not None:
+                        task.add_done_callback(lambda _task, slots=slots: slots.release())
+                    pending.add(task)
+            raise errors[-1]
+        finally:
+            # Cancel the slower duplicate (or everything, if the caller was cancelled)
+            for task in pending:
+                task.cancel()
+
+    # ------------------------------------------------------------------
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if not self.hedge:
+            message = self._failover(lambda model: model.invoke(messages, stop=stop, **kwargs))
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        # The loser of a thread race cannot be stopped; on the loop it is cancelled
+        future = asyncio.run_coroutine_threadsafe(
+            self._ahedged(lambda model: model.ainvoke(messages, stop=stop, **kwargs)),
+            _hedge_loop(),
+        )
+        message = future.result()
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = await self._ahedged(lambda model: model.ainvoke(messages, stop=stop, **kwargs))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        backends = self.router.order(self.backends)
+        for position, (name, model) in enumerate(backends):
+            started = time.monotonic()
+            streamed = False
+            try:
+                for chunk in model.stream(messages, stop=stop, **kwargs):
+                    streamed = True
+                    yield as_generation_chunk(chunk)
+            except Exception as exc:
+                self.router.record(name, time.monotonic() - started, ok=False)
+                if streamed or position == len(backends) - 1:
+                    raise
+                logger.warning(f"Chat provider {name} failed before streaming, failing over: {exc}")
+                self.router.record_hedge(name, failover=True)
+                continue
+            self.router.record(name, time.monotonic() - started, ok=True)
+            return
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        backends = self.router.order(self.backends)
+        for position, (name, model) in enumerate(backends):
+            started = time.monotonic()
+            streamed = False
+            try:
+                async for chunk in model.astream(messages, stop=stop, **kwargs):
+                    streamed = True
+                    yield as_generation_chunk(chunk)
+            except Exception as exc:
+                self.router.record(name, time.monotonic() - started, ok=False)
+                if streamed or position == len(backends) - 1:
+                    raise
+                logger.warning(f"Chat provider {name} failed before streaming, failing over: {exc}")
+                self.router.record_hedge(name, failover=True)
+                continue
+            self.router.record(name, time.monotonic() - started, ok=True)
+            return
@@ -0,0 +1,224 @@
+"""Two-tier cache for query embeddings.
+
+``CachedEmbeddings`` wraps any LangChain ``Embeddings`` object and memoises
+``embed_query`` results, first in an in-process LRU and then in a shared Redis
+tier. Keys combine the embedding model name with the normalised question text,
+so identical product questions skip the remote embedding round trip.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalise text so trivially different questions share a cache key."""
+    text = unicodedata.normalize("NFKC", text or "")
+    return _WHITESPACE_RE.sub(" ", text).strip().casefold()
+
+
+class LRUCache:
+    """Thread-safe LRU cache with optional per-entry TTL."""
+
+    def __init__(self, max_size: int = 1024, ttl: Optional[float] = None) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class RedisEmbeddingTier:
+    """Shared Redis tier storing embeddings as JSON arrays.
+
+    Redis failures never break a query: the tier is disabled for
+    ``retry_after`` seconds and lookups fall through to the provider.
+    """
+
+    KEY_PREFIX = "embedding_cache"
+
+    def __init__(self, ttl: Optional[int] = None, retry_after: float = 30.0) -> None:
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self._disabled_until = 0.0
+
+    def _client(self):
+        if time.monotonic() < self._disabled_until:
+            return None
+        try:
+            from ..redis_manager import RedisConnectionManager
+
+            return RedisConnectionManager.get_instance().get_connection()
+        except Exception as exc:
+            self._disable(exc)
+            return None
+
+    def _disable(self, exc: Exception) -> None:
+        logger.warning(f"Redis embedding cache unavailable, bypassing for {self.retry_after}s: {exc}")
+        self._disabled_until = time.monotonic() + self.retry_after
+
+    def key(self, cache_key: str) -> str:
+        return f"{self.KEY_PREFIX}:{cache_key}"
+
+    def get(self, cache_key: str) -> Optional[List[float]]:
+        client = self._client()
+        if client is None:
+            return None
+        try:
+            raw = client.get(self.key(cache_key))
+        except Exception as exc:
+            self._disable(exc)
+            return None
+        return json.loads(raw) if raw else None
+
+    def set(self, cache_key: str, vector: List[float]) -> None:
+        client = self._client()
+        if client is None:
+            return
+        try:
+            client.set(self.key(cache_key), json.dumps(vector), ex=self.ttl or None)
+        except Exception as exc:
+            self._disable(exc)
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that caches ``embed_query`` results.
+
+    ``embed_documents`` is passed straight through: bulk ingestion rarely
+    repeats text and would only churn the query cache.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        model_name: str,
+        max_size: int = 1024,
+        ttl: Optional[int] = None,
+        redis_tier: Optional[RedisEmbeddingTier] = None,
+    ) -> None:
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.local = LRUCache(max_size=max_size, ttl=ttl)
+        self.redis_tier = redis_tier
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+
+    def cache_key(self, text: str) -> str:
+        digest = hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+        return f"{self.model_name}:{digest}"
+
+    def _record(self, counter: str) -> None:
+        with self._stats_lock:
+            self._stats[counter] += 1
+
+    def _lookup_local(self, key: str) -> Optional[List[float]]:
+        vector = self.local.get(key)
+        if vector is not None:
+            self._record("local_hits")
+        return vector
+
+    def _lookup_redis(self, key: str) -> Optional[List[float]]:
+        if self.redis_tier is not None:
+            vector = self.redis_tier.get(key)
+            if vector is not None:
+                self._record("redis_hits")
+                self.local.set(key, vector)
+                return vector
+        self._record("misses")
+        return None
+
+    def _lookup(self, key: str) -> Optional[List[float]]:
+        vector = self._lookup_local(key)
+        return vector if vector is not None else self._lookup_redis(key)
+
+    def _store(self, key: str, vector: List[float]) -> None:
+        self.local.set(key, vector)
+        if self.redis_tier is not None:
+            self.redis_tier.set(key, vector)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self.cache_key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self._store(key, vector)
+        return vector
+
+    async def _off_loop(self, func, *args):
+        """Run a call that may reach the Redis tier in a worker thread."""
+        if self.redis_tier is None:
+            return func(*args)
+        return await asyncio.to_thread(func, *args)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self.cache_key(text)
+        # Local hits stay on the loop; only the Redis round trips are moved off it
+        vector = self._lookup_local(key)
+        if vector is None:
+            vector = await self._off_loop(self._lookup_redis, key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            await self._off_loop(self._store, key, vector)
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embeddings.aembed_documents(texts)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current local cache size."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        hits = stats["local_hits"] + stats["redis_hits"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        stats["local_size"] = len(self.local)
+        stats["model"] = self.model_name
+        return stats
+
+    def clear(self) -> None:
+        """Clear the in-process tier; Redis entries expire via TTL."""
+        self.local.clear()
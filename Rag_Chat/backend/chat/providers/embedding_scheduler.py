@@ -0,0 +1,188 @@
+"""Rate-limit-aware batch embedding for bulk ingestion.
+
+``EmbeddingScheduler`` splits texts into batches, embeds up to
+``concurrency`` batches at once and admits each request through a
+:class:`TokenBucket`, so a large catalogue build is bounded by the provider
+quota rather than by sequential round trips. Rate-limit errors (HTTP 429 /
+``ResourceExhausted``) are retried with exponential backoff and full jitter.
+``ScheduledEmbeddings`` exposes the scheduler as a LangChain ``Embeddings``.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def is_rate_limit_error(exc: Exception) -> bool:
+    """Return True when an embedding error signals throttling."""
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if value == 429 or getattr(value, "value", None) == 429:
+            return True
+    if type(exc).__name__ in {"ResourceExhausted", "RateLimitError", "TooManyRequests"}:
+        return True
+    message = str(exc).lower()
+    return "429" in message or "rate limit" in message or "resource exhausted" in message
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate`` tokens per second."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Block until ``tokens`` are available; return the time waited."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+class EmbeddingScheduler:
+    """Embed documents in concurrent, rate-limited batches."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        requests_per_second: float = 5.0,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+        progress_callback: Optional[ProgressCallback] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.progress_callback = progress_callback
+        self._sleep = sleep
+        self.bucket = TokenBucket(requests_per_second, sleep=sleep)
+        self._stats = {"requests": 0, "retries": 0, "throttle_wait_s": 0.0}
+        self._stats_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, embeddings: Embeddings, **overrides) -> "EmbeddingScheduler":
+        """Build a scheduler configured by the ``EMBEDDING_*`` environment variables."""
+        options = {
+            "batch_size": int(os.getenv("EMBEDDING_BATCH_SIZE", "100")),
+            "concurrency": int(os.getenv("EMBEDDING_CONCURRENCY", "4")),
+            "requests_per_second": float(os.getenv("EMBEDDING_RATE_LIMIT", "5")),
+            "max_retries": int(os.getenv("EMBEDDING_MAX_RETRIES", "5")),
+        }
+        options.update(overrides)
+        return cls(embeddings, **options)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps concurrent batches from retrying in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            with self._stats_lock:
+                self._stats["requests"] += 1
+                self._stats["throttle_wait_s"] += waited
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as exc:
+                if not is_rate_limit_error(exc) or attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                attempt += 1
+                with self._stats_lock:
+                    self._stats["retries"] += 1
+                logger.warning(
+                    f"Embedding batch throttled, retry {attempt}/{self.max_retries} in {delay:.2f}s: {exc}"
+                )
+                self._sleep(delay)
+
+    def embed(self, texts: List[str], progress_callback: Optional[ProgressCallback] = None) -> List[List[float]]:
+        """Embed ``texts`` and return vectors in input order."""
+        total = len(texts)
+        if not total:
+            return []
+
+        callback = progress_callback or self.progress_callback
+        batches = [texts[start:start + self.batch_size] for start in range(0, total, self.batch_size)]
+        completed = 0
+        progress_lock = threading.Lock()
+
+        def run(batch: List[str]) -> List[List[float]]:
+            nonlocal completed
+            vectors = self._embed_batch(batch)
+            with progress_lock:
+                completed += len(batch)
+                done = completed
+            if callback:
+                callback(done, total)
+            logger.debug(f"Embedded {done}/{total} texts")
+            return vectors
+
+        if len(batches) == 1 or self.concurrency == 1:
+            results = [run(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.concurrency, len(batches))) as executor:
+                results = list(executor.map(run, batches))
+        return [vector for batch_vectors in results for vector in batch_vectors]
+
+    def stats(self) -> dict:
+        """Return request, retry and throttle-wait counters."""
+        with self._stats_lock:
+            return dict(self._stats)
+
+
+class ScheduledEmbeddings(Embeddings):
+    """Embeddings whose ``embed_documents`` goes through an :class:`EmbeddingScheduler`."""
+
+    def __init__(self, scheduler: EmbeddingScheduler) -> None:
+        self.scheduler = scheduler
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.scheduler.embed(list(texts))
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.scheduler.embeddings.embed_query(text)
@@ -0,0 +1,63 @@
+"""Offline chat model with configurable latency and failures.
+
+``REASONING_PROVIDER=fake`` / ``GENERATION_PROVIDER=fake`` select
+``FakeChatModel``, which echoes the last message after ``FAKE_CHAT_LATENCY_MS``
+plus up to ``FAKE_CHAT_JITTER_MS`` of random delay and fails with probability
+``FAKE_CHAT_ERROR_RATE``. It lets load runs and tests exercise hedging,
+failover and timeouts without API keys.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from typing import Any, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+class FakeChatModel(BaseChatModel):
+    """Echo chat model that sleeps and fails like a remote provider."""
+
+    name_tag: str = "fake"
+    latency_ms: float = 50.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _delay(self) -> float:
+        return (self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000
+
+    def _result(self, messages: List[BaseMessage]) -> ChatResult:
+        if self.error_rate and random.random() < self.error_rate:
+            raise RuntimeError(f"{self.name_tag} provider error")
+        question = str(messages[-1].content) if messages else ""
+        message = AIMessage(content=f"[{self.name_tag}] {question[:200]}")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._delay())
+        return self._result(messages)
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        return self._result(messages)
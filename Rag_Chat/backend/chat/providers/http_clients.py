@@ -0,0 +1,208 @@
+"""Shared, pooled HTTP clients for chat providers.
+
+Every ``ChatOpenAI`` model pointing at the same base URL (e.g. the Qwen
+reasoning and generation models behind ``QWEN_API_BASE``) gets the same
+``httpx.Client`` / ``httpx.AsyncClient``, so keep-alive connections and TLS
+sessions are reused across purposes instead of being opened per model.
+Pool size, keep-alive and timeouts come from the environment:
+
+- ``HTTP_MAX_CONNECTIONS`` (default ``100``)
+- ``HTTP_MAX_KEEPALIVE_CONNECTIONS`` (default ``20``)
+- ``HTTP_KEEPALIVE_EXPIRY`` (seconds, default ``30``)
+- ``HTTP_CONNECT_TIMEOUT`` / ``HTTP_READ_TIMEOUT`` / ``HTTP_WRITE_TIMEOUT`` /
+  ``HTTP_POOL_TIMEOUT`` (seconds; defaults ``5`` / ``60`` / ``60`` / ``5``)
+- ``HTTP2`` (default ``false``; needs the ``h2`` package)
+
+Async connections belong to the event loop that opened them, and callers run
+on several loops (ASGI requests, the speculative and hedge loops,
+``async_to_sync``). The async client therefore keeps one connection pool per
+running loop; pools of loops that have been garbage-collected are dropped.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+@dataclass(frozen=True)
+class HttpClientConfig:
+    """Connection pool and timeout settings shared by all provider clients."""
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    read_timeout: float = 60.0
+    write_timeout: float = 60.0
+    pool_timeout: float = 5.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls) -> "HttpClientConfig":
+        http2 = os.getenv("HTTP2", "false").strip().lower() in {"1", "true", "yes", "on"}
+        if http2 and not _h2_available():
+            logger.warning("HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1 keep-alive")
+            http2 = False
+        return cls(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+            connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "60")),
+            write_timeout=float(os.getenv("HTTP_WRITE_TIMEOUT", "60")),
+            pool_timeout=float(os.getenv("HTTP_POOL_TIMEOUT", "5")),
+            http2=http2,
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    @property
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(
+            connect=self.connect_timeout,
+            read=self.read_timeout,
+            write=self.write_timeout,
+            pool=self.pool_timeout,
+        )
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """Async transport with one ``httpx.AsyncHTTPTransport`` per running event loop."""
+
+    def __init__(self, config: HttpClientConfig) -> None:
+        self.config = config
+        self._transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot send a request, as the client has been closed.")
+            transport = self._transports.get(loop)
+            if transport is None:
+                transport = self._transports[loop] = httpx.AsyncHTTPTransport(
+                    limits=self.config.limits, http2=self.config.http2
+                )
+            return transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport().handle_async_request(request)
+
+    def loop_count(self) -> int:
+        with self._lock:
+            return len(self._transports)
+
+    def close(self) -> None:
+        """Close every loop's pool on its own loop.
+
+        Pools of loops that are no longer running cannot be awaited; their
+        connections go away with the loop.
+        """
+        with self._lock:
+            self._closed = True
+            transports = list(self._transports.items())
+            self._transports.clear()
+        try:
+            current: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for loop, transport in transports:
+            if loop is current:
+                loop.create_task(transport.aclose())
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(transport.aclose(), loop)
+
+    async def aclose(self) -> None:
+        self.close()
+
+
+class HttpClientPool:
+    """One sync and one async ``httpx`` client per base URL.
+
+    The async client's connections are pooled per event loop by
+    :class:`LoopLocalTransport`.
+    """
+
+    def __init__(self, config: HttpClientConfig) -> None:
+        self.config = config
+        self._clients: Dict[str, httpx.Client] = {}
+        self._async_clients: Dict[str, httpx.AsyncClient] = {}
+        self._async_transports: Dict[str, LoopLocalTransport] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(base_url: str) -> str:
+        return (base_url or "").rstrip("/")
+
+    def _options(self) -> Dict[str, object]:
+        return {"limits": self.config.limits, "timeout": self.config.timeout, "http2": self.config.http2}
+
+    def client(self, base_url: str) -> httpx.Client:
+        key = self._key(base_url)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or client.is_closed:
+                client = self._clients[key] = httpx.Client(**self._options())
+            return client
+
+    def async_client(self, base_url: str) -> httpx.AsyncClient:
+        key = self._key(base_url)
+        with self._lock:
+            client = self._async_clients.get(key)
+            if client is None or client.is_closed:
+                # Limits and HTTP/2 apply to each loop's pool inside the transport
+                transport = self._async_transports[key] = LoopLocalTransport(self.config)
+                client = self._async_clients[key] = httpx.AsyncClient(timeout=self.config.timeout, transport=transport)
+            return client
+
+    def base_urls(self) -> List[str]:
+        with self._lock:
+            return sorted(set(self._clients) | set(self._async_clients))
+
+    def close(self) -> None:
+        """Close the sync clients and every loop's async connection pool."""
+        with self._lock:
+            clients = list(self._clients.values())
+            transports = list(self._async_transports.values())
+            self._clients.clear()
+            self._async_clients.clear()
+            self._async_transports.clear()
+        for client in clients:
+            client.close()
+        for transport in transports:
+            transport.close()
+
+    def close_later(self, delay: float) -> threading.Timer:
+        """Close the pool after ``delay`` seconds so in-flight requests can finish."""
+        timer = threading.Timer(delay, self.close)
+        timer.daemon = True
+        timer.start()
+        return timer
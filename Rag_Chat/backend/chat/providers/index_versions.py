@@ -0,0 +1,139 @@
+"""Versioned vector store directories with an atomic "active index" pointer.
+
+Each build is written to ``VECTOR_STORE_PATH/versions/<version_id>`` and only
+becomes visible once validated, by replacing the ``ACTIVE`` pointer file with
+``os.replace`` (atomic on POSIX and Windows). Workers compare the pointer
+against the version their cached Chroma handle was opened on and reopen when it
+changes, so re-indexing needs no restart and never serves a half-built store.
+
+When no pointer exists yet, the legacy layout (Chroma files directly under
+``VECTOR_STORE_PATH``) is served unchanged.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+import os
+import shutil
+import uuid
+from typing import Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+VERSIONS_DIRNAME = "versions"
+ACTIVE_POINTER = "ACTIVE"
+
+
+class IndexValidationError(Exception):
+    """Raised when a freshly built index fails validation and is not activated."""
+
+
+class IndexVersionStore:
+    """Manage versioned index directories under one root."""
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+
+    @property
+    def versions_dir(self) -> str:
+        return os.path.join(self.root, VERSIONS_DIRNAME)
+
+    @property
+    def pointer_path(self) -> str:
+        return os.path.join(self.root, ACTIVE_POINTER)
+
+    def version_path(self, version_id: str) -> str:
+        return os.path.join(self.versions_dir, version_id)
+
+    def active_version(self) -> Optional[str]:
+        """Return the active version ID, or None for the legacy layout."""
+        try:
+            with open(self.pointer_path, encoding="utf-8") as handle:
+                version_id = handle.read().strip()
+        except FileNotFoundError:
+            return None
+        return version_id or None
+
+    def active_path(self) -> str:
+        """Return the directory Chroma should be opened on."""
+        version_id = self.active_version()
+        return self.version_path(version_id) if version_id else self.root
+
+    def create_version(self, copy_active: bool = False) -> str:
+        """Create an empty (or copied-from-active) version directory."""
+        version_id = f"{datetime.datetime.now():%Y%m%d%H%M%S}-{uuid.uuid4().hex[:8]}"
+        path = self.version_path(version_id)
+        os.makedirs(self.versions_dir, exist_ok=True)
+        source = self.active_path()
+        if copy_active and os.path.isdir(source):
+            # The legacy root also holds versions/ and the pointer; copy data only
+            shutil.copytree(
+                source,
+                path,
+                ignore=shutil.ignore_patterns(VERSIONS_DIRNAME, ACTIVE_POINTER, f"{ACTIVE_POINTER}.*"),
+            )
+        else:
+            os.makedirs(path)
+        return version_id
+
+    def activate(self, version_id: str) -> None:
+        """Atomically point readers at ``version_id``."""
+        if not os.path.isdir(self.version_path(version_id)):
+            raise IndexValidationError(f"Unknown index version: {version_id}")
+        tmp_path = f"{self.pointer_path}.{uuid.uuid4().hex}"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            handle.write(version_id)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.pointer_path)
+        logger.info(f"Activated vector index version {version_id}")
+
+    def discard(self, version_id: str) -> None:
+        """Delete a version that was never activated."""
+        if version_id != self.active_version():
+            shutil.rmtree(self.version_path(version_id), ignore_errors=True)
+
+    def list_versions(self) -> List[str]:
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.versions_dir)
+            if os.path.isdir(self.version_path(name))
+        )
+
+    def garbage_collect(self, keep: int = 2) -> List[str]:
+        """Remove all but the newest ``keep`` versions; the active one is always kept.
+
+        Keeping the previous version lets workers that have not yet noticed the
+        pointer change finish their in-flight queries.
+        """
+        active = self.active_version()
+        versions = self.list_versions()
+        retained = set(versions[-keep:]) if keep > 0 else set()
+        removed = []
+        for version_id in versions:
+            if version_id == active or version_id in retained:
+                continue
+            shutil.rmtree(self.version_path(version_id), ignore_errors=True)
+            removed.append(version_id)
+        if removed:
+            logger.info(f"Garbage-collected vector index versions: {', '.join(removed)}")
+        return removed
+
+
+def validate_vector_store(
+    vector_store,
+    expected_count: Optional[int] = None,
+    sample_queries: Iterable[str] = (),
+) -> int:
+    """Check document count and sample queries; return the count on success."""
+    count = vector_store._collection.count()
+    if count == 0:
+        raise IndexValidationError("Vector index is empty")
+    if expected_count is not None and count != expected_count:
+        raise IndexValidationError(f"Vector index has {count} documents, expected {expected_count}")
+    for query in sample_queries:
+        if not vector_store.similarity_search(query, k=1):
+            raise IndexValidationError(f"Sample query returned no results: {query}")
+    return count
@@ -0,0 +1,157 @@
+"""Local BM25 index over the indexed chunks, for hybrid retrieval.
+
+Dense embeddings blur exact product tokens ("256GB", "S25 Plus", colour
+names). ``BM25Index`` is built from the same chunks at ingestion time and
+saved as ``lexical_index.json`` next to the Chroma files of each index
+version, so it is activated, served and garbage-collected together with the
+vector store. ``reciprocal_rank_fusion`` merges the dense and lexical rankings.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from heapq import nlargest
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from langchain.schema import Document
+
+LEXICAL_INDEX_FILENAME = "lexical_index.json"
+
+_WORD_RE = re.compile(r"[0-9a-z가-힣]+")
+_PART_RE = re.compile(r"\d+|[a-z]+|[가-힣]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase search terms.
+
+    Mixed tokens are also indexed by their parts ("256gb" → "256", "gb") so
+    "256GB" and "256 GB" match, and Hangul words add character bigrams so
+    particles ("갤럭시는") do not hide the stem.
+    """
+    tokens: List[str] = []
+    for word in _WORD_RE.findall((text or "").lower()):
+        tokens.append(word)
+        parts = _PART_RE.findall(word)
+        if len(parts) > 1:
+            tokens.extend(parts)
+        for part in parts:
+            if len(part) > 2 and "가" <= part[0] <= "힣":
+                tokens.extend(part[i:i + 2] for i in range(len(part) - 1))
+    return tokens
+
+
+def document_key(document: Document) -> str:
+    """Identity used to merge the same chunk returned by both retrievers."""
+    return document.page_content
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents."""
+
+    def __init__(
+        self,
+        documents: List[Document],
+        postings: Dict[str, List[Tuple[int, int]]],
+        doc_lengths: List[int],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> None:
+        self.documents = documents
+        self.postings = postings
+        self.doc_lengths = doc_lengths
+        self.k1 = k1
+        self.b = b
+        self._avgdl = (sum(doc_lengths) / len(doc_lengths)) if doc_lengths else 0.0
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[Document], k1: float = 1.5, b: float = 0.75) -> "BM25Index":
+        documents = list(documents)
+        postings: Dict[str, List[Tuple[int, int]]] = {}
+        doc_lengths = []
+        for index, document in enumerate(documents):
+            term_freqs = Counter(tokenize(document.page_content))
+            doc_lengths.append(sum(term_freqs.values()))
+            for term, freq in term_freqs.items():
+                postings.setdefault(term, []).append((index, freq))
+        return cls(documents, postings, doc_lengths, k1=k1, b=b)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def _idf(self, term: str) -> float:
+        doc_freq = len(self.postings.get(term, ()))
+        return math.log(1 + (len(self.documents) - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[Document, float]]:
+        """Return up to ``k`` ``(document, score)`` pairs, best first."""
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(term)
+            for index, freq in postings:
+                norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[index] / self._avgdl)
+                scores[index] = scores.get(index, 0.0) + idf * freq * (self.k1 + 1) / (freq + norm)
+        best = nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self.documents[index], score) for index, score in best]
+
+    def save(self, directory: str) -> str:
+        """Write the index atomically to ``directory``; return the file path."""
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, LEXICAL_INDEX_FILENAME)
+        payload = {
+            "k1": self.k1,
+            "b": self.b,
+            "documents": [
+                {"page_content": document.page_content, "metadata": document.metadata or {}}
+                for document in self.documents
+            ],
+            "doc_lengths": self.doc_lengths,
+            "postings": self.postings,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["BM25Index"]:
+        """Load the index saved in ``directory``, or None if there is none."""
+        path = os.path.join(directory, LEXICAL_INDEX_FILENAME)
+        try:
+            with open(path, encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except FileNotFoundError:
+            return None
+        return cls(
+            [Document(page_content=item["page_content"], metadata=item["metadata"]) for item in payload["documents"]],
+            {term: [tuple(entry) for entry in entries] for term, entries in payload["postings"].items()},
+            payload["doc_lengths"],
+            k1=payload.get("k1", 1.5),
+            b=payload.get("b", 0.75),
+        )
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Document]],
+    k: int = 60,
+    limit: Optional[int] = None,
+) -> List[Tuple[Document, float]]:
+    """Merge rankings by summing ``1 / (k + rank)`` per document."""
+    scores: Dict[str, float] = {}
+    documents: Dict[str, Document] = {}
+    for ranking in rankings:
+        for rank, document in enumerate(ranking, start=1):
+            key = document_key(document)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+            documents.setdefault(key, document)
+    ordered = sorted(scores, key=scores.get, reverse=True)
+    if limit is not None:
+        ordered = ordered[:limit]
+    return [(documents[key], scores[key]) for key in ordered]
@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import logging
 import os
+import threading
+import time
 from functools import lru_cache
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from django.conf import settings
 
@@ -22,20 +24,59 @@ except ImportError:  # pragma: no cover
     ChatOpenAI = None  # type: ignore
 
 from langchain_community.vectorstores import Chroma
+from langchain_core.embeddings import DeterministicFakeEmbedding
 
 from ..provider_overrides import get_override
+from .embedding_cache import CachedEmbeddings, RedisEmbeddingTier
+from .embedding_scheduler import EmbeddingScheduler, ScheduledEmbeddings
+from .index_versions import IndexVersionStore, validate_vector_store
+from .catalogue_index import CatalogueIndex
+from .chat_routing import HedgedChatModel, ProviderRouter
+from .fake_chat import FakeChatModel
+from .http_clients import HttpClientConfig, HttpClientPool
+from .resilience import Bulkhead, CircuitBreaker, GuardedChatModel
+from .lexical_index import BM25Index
 
 logger = logging.getLogger(__name__)
 
 
+def release_chroma_client(persist_directory: str) -> None:
+    """Stop and forget chromadb's cached client for ``persist_directory``.
+
+    chromadb keeps one ``System`` per persist directory in a class-level
+    registry for the life of the process, so every retired index version
+    would otherwise stay open (SQLite handles, HNSW segments in memory).
+    """
+    try:
+        from chromadb.api.client import SharedSystemClient
+    except Exception:  # chromadb missing or unimportable
+        return
+    system = SharedSystemClient._identifer_to_system.pop(persist_directory, None)
+    if system is None:
+        return
+    try:
+        system.stop()
+    except Exception as e:
+        logger.warning(f"Failed to stop Chroma client for {persist_directory}: {str(e)}")
+    logger.info(f"Released Chroma client for {persist_directory}")
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
 class ProviderManager:
     """Central point for resolving embedding and chat providers.
 
     Environment variables control which providers are used:
 
-    - ``EMBEDDING_PROVIDER``: ``gemini`` (default)
-    - ``REASONING_PROVIDER``: ``gemini`` (default) or ``qwen``
-    - ``GENERATION_PROVIDER``: ``gemini`` (default) or ``qwen``
+    - ``EMBEDDING_PROVIDER``: ``gemini`` (default) or ``fake`` (deterministic,
+      offline; for tests and load runs)
+    - ``REASONING_PROVIDER``: ``gemini`` (default), ``qwen`` or ``fake``
+    - ``GENERATION_PROVIDER``: ``gemini`` (default), ``qwen`` or ``fake``
 
     Additional variables:
 
@@ -45,50 +86,310 @@ class ProviderManager:
     - ``QWEN_API_KEY`` / ``QWEN_API_BASE`` / ``QWEN_MODEL_NAME``
     - ``QWEN_REASONING_MODEL`` (optional override for reasoning)
     - ``QWEN_GENERATION_MODEL`` (optional override for generation)
+    - ``EMBEDDING_CACHE_ENABLED`` (default ``true``)
+    - ``EMBEDDING_CACHE_SIZE`` / ``EMBEDDING_CACHE_TTL`` (in-process LRU tier)
+    - ``EMBEDDING_CACHE_REDIS`` / ``EMBEDDING_CACHE_REDIS_TTL`` (shared tier)
+    - ``EMBEDDING_BATCH_SIZE`` / ``EMBEDDING_CONCURRENCY`` /
+      ``EMBEDDING_RATE_LIMIT`` / ``EMBEDDING_MAX_RETRIES`` (bulk ingestion)
+    - ``FAKE_EMBEDDING_SIZE`` (default ``768``)
+    - ``VECTOR_STORE_POLL_INTERVAL`` / ``VECTOR_STORE_KEEP_VERSIONS`` /
+      ``VECTOR_STORE_VALIDATION_QUERIES`` (blue/green index versions)
+    - ``HYBRID_FETCH_K`` / ``HYBRID_RRF_K`` (hybrid BM25 + vector retrieval)
+    - ``CATALOGUE_FAST_PATH`` (default ``true``; structured spec lookups)
+    - ``PIPELINE_ANSWER_MODE`` (``two_call``, ``single_call`` or ``speculative``) /
+      ``COMPLEX_QUESTION_CHARS`` (default ``120``)
+    - ``PIPELINE_LATENCY_BUDGET_MS`` (default ``4000``) / ``PIPELINE_DRAFT_TIMEOUT_MS``
+      (default ``30000``; speculative reasoning + draft answers)
+    - ``FAKE_CHAT_LATENCY_MS`` / ``FAKE_CHAT_JITTER_MS`` / ``FAKE_CHAT_ERROR_RATE``
+      (offline ``fake`` chat provider)
+    - ``HEDGED_REQUESTS`` (default ``false``) / ``HEDGE_ALTERNATES`` (default
+      ``gemini:qwen,qwen:gemini``) / ``HEDGE_DEFAULT_DELAY_MS`` /
+      ``HEDGE_MIN_DELAY_MS`` / ``HEDGE_MIN_SAMPLES`` / ``HEDGE_WINDOW`` /
+      ``HEDGE_EWMA_ALPHA`` / ``HEDGE_ERROR_THRESHOLD`` / ``HEDGE_STEER_RATIO`` /
+      ``HEDGE_MAX_IN_FLIGHT`` (hedged requests and latency-based failover)
+    - ``PROVIDER_FALLBACK`` (default ``true``; retry failed or rejected chat
+      calls on the ``HEDGE_ALTERNATES`` provider)
+    - ``CIRCUIT_BREAKER_ENABLED`` (default ``true``) /
+      ``CIRCUIT_FAILURE_THRESHOLD`` / ``CIRCUIT_RESET_TIMEOUT`` /
+      ``CIRCUIT_HALF_OPEN_MAX`` (per-provider circuit breaker)
+    - ``PROVIDER_MAX_CONCURRENCY`` / ``<PROVIDER>_MAX_CONCURRENCY`` /
+      ``PROVIDER_BULKHEAD_WAIT_MS`` (per-provider bulkhead; ``0`` = unbounded)
+    - ``HTTP_MAX_CONNECTIONS`` / ``HTTP_MAX_KEEPALIVE_CONNECTIONS`` /
+      ``HTTP_KEEPALIVE_EXPIRY`` / ``HTTP_CONNECT_TIMEOUT`` /
+      ``HTTP_READ_TIMEOUT`` / ``HTTP_WRITE_TIMEOUT`` / ``HTTP_POOL_TIMEOUT`` /
+      ``HTTP2`` (shared provider HTTP clients, see ``http_clients.py``)
+    - ``HTTP_CLIENT_DRAIN_SECONDS`` (default: ``HTTP_READ_TIMEOUT``; how long
+      the previous clients stay open after a configuration reload)
     """
 
     def __init__(self) -> None:
         """Initialise provider defaults from environment variables."""
+        self._vector_store_lock = threading.Lock()
+        self._chat_model_lock = threading.Lock()
+        #: Index paths this process has served, newest last (at most two stay open)
+        self._served_paths: List[str] = []
+        #: Bumped whenever provider configuration is reloaded so dependent
+        #: caches (e.g. compiled prompt chains) can discard stale entries.
+        self.config_version = 0
+        self._load_configuration()
+
+    def _load_configuration(self) -> None:
         self.embedding_provider_name = os.getenv("EMBEDDING_PROVIDER", "gemini").lower()
         self.reasoning_provider_name = os.getenv("REASONING_PROVIDER", "gemini").lower()
         self.generation_provider_name = os.getenv("GENERATION_PROVIDER", "gemini").lower()
 
         self._embedding_model = None
         self._vector_store_cache = None
+        self._vector_store_version: Optional[str] = None
+        #: Side indexes (BM25, catalogue) loaded for the served version
+        self._version_artifacts: Dict[str, object] = {}
+        self._vector_store_checked_at = 0.0
         self._chat_model_cache: Dict[Tuple[str, str], object] = {}
+        self._routed_model_cache: Dict[Tuple[str, str, bool], object] = {}
+        #: Per-provider latency/error tracking for hedged requests
+        self.chat_router = ProviderRouter.from_env()
+        #: Per-provider circuit breakers and bulkheads, shared by all purposes
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._bulkheads: Dict[str, Bulkhead] = {}
+        #: Pooled HTTP clients per base URL, shared by every purpose
+        self.http_clients = HttpClientPool(HttpClientConfig.from_env())
+        #: Gemini models with identical settings share one client (and channel)
+        self._gemini_models: Dict[Tuple[str, float, int], object] = {}
+
+    def reload_configuration(self) -> None:
+        """Re-read provider environment variables and drop every cached client."""
+        with self._chat_model_lock, self._vector_store_lock:
+            http_clients = self.http_clients
+            self._load_configuration()
+            self.config_version += 1
+        if http_clients is not self.http_clients:
+            # Models built before the reload may still have requests in flight
+            http_clients.close_later(
+                float(os.getenv("HTTP_CLIENT_DRAIN_SECONDS", str(http_clients.config.read_timeout)))
+            )
+        logger.info(f"Provider configuration reloaded (version {self.config_version})")
 
     # ------------------------------------------------------------------
     # Embeddings / Vector store
     # ------------------------------------------------------------------
     def get_embedding_model(self):
-        """Return a LangChain embedding model instance."""
+        """Return a LangChain embedding model instance.
+
+        Query embeddings are cached by :class:`CachedEmbeddings` unless
+        ``EMBEDDING_CACHE_ENABLED`` is false.
+        """
 
         if self._embedding_model is None:
             if self.embedding_provider_name == "gemini":
-                self._embedding_model = self._create_gemini_embeddings()
+                embeddings = self._create_gemini_embeddings()
+                model_name = os.getenv("GOOGLE_EMBEDDING_MODEL", "models/text-embedding-004")
+            elif self.embedding_provider_name == "fake":
+                size = int(os.getenv("FAKE_EMBEDDING_SIZE", "768"))
+                embeddings = DeterministicFakeEmbedding(size=size)
+                model_name = f"deterministic-{size}"
             else:
                 raise ValueError(
                     f"Unsupported embedding provider: {self.embedding_provider_name}"
                 )
+            self._embedding_model = self._wrap_embedding_cache(embeddings, model_name)
         return self._embedding_model
 
-    def get_vector_store(self):
-        """Construct a Chroma vector store hooked to the embedding model."""
+    def get_embedding_cache_stats(self) -> Dict[str, object]:
+        """Return hit/miss counters of the query embedding cache, if enabled."""
+        if isinstance(self._embedding_model, CachedEmbeddings):
+            return self._embedding_model.stats()
+        return {}
+
+    def _wrap_embedding_cache(self, embeddings, model_name: str):
+        if not _env_flag("EMBEDDING_CACHE_ENABLED", True):
+            return embeddings
+
+        ttl = int(os.getenv("EMBEDDING_CACHE_TTL", "86400")) or None
+        redis_tier = None
+        if _env_flag("EMBEDDING_CACHE_REDIS", True):
+            redis_ttl = int(os.getenv("EMBEDDING_CACHE_REDIS_TTL", str(7 * 86400))) or None
+            redis_tier = RedisEmbeddingTier(ttl=redis_ttl)
+        return CachedEmbeddings(
+            embeddings,
+            model_name=f"{self.embedding_provider_name}:{model_name}",
+            max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "2048")),
+            ttl=ttl,
+            redis_tier=redis_tier,
+        )
+
+    @property
+    def index_versions(self) -> IndexVersionStore:
+        """Versioned index directories under ``VECTOR_STORE_PATH``."""
+        return IndexVersionStore(settings.VECTOR_STORE_PATH)
 
-        embeddings = self.get_embedding_model()
+    def get_vector_store_path(self) -> str:
+        """Return the directory of the currently active index."""
+        return self.index_versions.active_path()
+
+    def open_vector_store(self, persist_directory: str):
+        """Open a Chroma handle on ``persist_directory`` (not cached)."""
         return Chroma(
-            persist_directory=settings.VECTOR_STORE_PATH,
-            embedding_function=embeddings,
+            persist_directory=persist_directory,
+            embedding_function=self.get_embedding_model(),
         )
 
-    def create_vector_store_from_documents(self, documents):
-        embeddings = self.get_embedding_model()
-        return Chroma.from_documents(
-            documents=documents,
-            embedding=embeddings,
-            persist_directory=settings.VECTOR_STORE_PATH,
+    def _check_active_version(self) -> None:
+        # Another worker (or a Celery build) may have flipped the pointer;
+        # re-read it at most every VECTOR_STORE_POLL_INTERVAL seconds
+        interval = float(os.getenv("VECTOR_STORE_POLL_INTERVAL", "2"))
+        now = time.monotonic()
+        if self._vector_store_cache is None or now - self._vector_store_checked_at < interval:
+            return
+        self._vector_store_checked_at = now
+        active = self.index_versions.active_version()
+        if active != self._vector_store_version:
+            logger.info(f"Active vector index changed to {active}, reopening handle")
+            self.invalidate_vector_store()
+
+    def get_vector_store(self):
+        """Return the process-wide Chroma vector store handle.
+
+        The handle is opened lazily on the active index version and shared by
+        every request served by this worker, so the persistent SQLite/HNSW
+        files are not reopened per question. When the ``ACTIVE`` pointer moves
+        to a new version the handle is reopened on the next call.
+        """
+
+        self._check_active_version()
+        vector_store = self._vector_store_cache
+        if vector_store is not None:
+            return vector_store
+
+        with self._vector_store_lock:
+            if self._vector_store_cache is None:
+                versions = self.index_versions
+                version_id = versions.active_version()
+                path = versions.active_path()
+                self._vector_store_cache = self.open_vector_store(path)
+                self._vector_store_version = version_id
+                self._vector_store_checked_at = time.monotonic()
+                logger.info(f"Opened vector store at {path}")
+                self._track_served_path(path)
+            return self._vector_store_cache
+
+    def _track_served_path(self, path: str) -> None:
+        """Release clients for versions older than the previously served one.
+
+        The previous version stays open so in-flight queries on the old
+        handle can finish.
+        """
+        if path in self._served_paths:
+            self._served_paths.remove(path)
+        self._served_paths.append(path)
+        retired, self._served_paths = self._served_paths[:-2], self._served_paths[-2:]
+        for retired_path in retired:
+            release_chroma_client(retired_path)
+
+    def invalidate_vector_store(self) -> None:
+        """Drop the cached vector store handle so the next call reopens it."""
+        with self._vector_store_lock:
+            self._vector_store_cache = None
+            self._version_artifacts = {}
+        logger.info("Vector store handle invalidated")
+
+    def _get_version_artifact(self, name: str, loader):
+        """Load a side index saved next to the served vector store, once per version."""
+        self.get_vector_store()
+        artifacts = self._version_artifacts
+        if name in artifacts:
+            return artifacts[name]
+
+        with self._vector_store_lock:
+            if name not in self._version_artifacts:
+                versions = self.index_versions
+                version_id = self._vector_store_version
+                path = versions.version_path(version_id) if version_id else versions.root
+                artifact = loader(path)
+                if artifact is None:
+                    logger.warning(f"No {name} index at {path}")
+                self._version_artifacts[name] = artifact
+            return self._version_artifacts[name]
+
+    def get_lexical_index(self) -> Optional[BM25Index]:
+        """Return the BM25 index saved with the served index version.
+
+        Returns None for versions built before lexical indexes existed;
+        hybrid retrieval then uses vectors only.
+        """
+        return self._get_version_artifact("lexical", BM25Index.load)
+
+    def get_catalogue_index(self) -> Optional[CatalogueIndex]:
+        """Return the structured catalogue index saved with the served index version."""
+        return self._get_version_artifact("catalogue", CatalogueIndex.load)
+
+    @staticmethod
+    def save_side_indexes(documents, persist_directory: str) -> None:
+        """Write the BM25 and catalogue indexes for ``documents`` next to the Chroma files."""
+        documents = list(documents)
+        BM25Index.from_documents(documents).save(persist_directory)
+        CatalogueIndex.from_documents(documents).save(persist_directory)
+
+    def get_embedding_scheduler(self, progress_callback=None) -> EmbeddingScheduler:
+        """Return a batched, rate-limited scheduler for bulk document embedding."""
+        return EmbeddingScheduler.from_env(
+            self.get_embedding_model(),
+            progress_callback=progress_callback,
         )
 
+    def get_validation_queries(self):
+        """Sample queries every new index version must answer before activation."""
+        raw = os.getenv("VECTOR_STORE_VALIDATION_QUERIES", "갤럭시 S25")
+        return [query.strip() for query in raw.split(",") if query.strip()]
+
+    def activate_vector_store_version(self, version_id: str) -> None:
+        """Flip the active pointer, reopen locally and remove old versions."""
+        versions = self.index_versions
+        versions.activate(version_id)
+        self.invalidate_vector_store()
+        removed = versions.garbage_collect(keep=int(os.getenv("VECTOR_STORE_KEEP_VERSIONS", "2")))
+        for removed_id in removed:
+            release_chroma_client(versions.version_path(removed_id))
+
+    def discard_vector_store_version(self, version_id: str) -> None:
+        """Close the build's Chroma client and delete a version that was never activated."""
+        versions = self.index_versions
+        release_chroma_client(versions.version_path(version_id))
+        versions.discard(version_id)
+
+    def create_vector_store_from_documents(self, documents, progress_callback=None, source=None):
+        """Build a new index version, validate it, then make it active.
+
+        Readers keep using the previous version until the pointer flips; a
+        build that fails validation is discarded and never served.
+        """
+        from ..indexing import IncrementalIndexer, keyed_documents
+
+        # Same fingerprint IDs (and source stamp) as incremental syncs, so the
+        # next sync recognises these chunks instead of re-embedding them
+        keyed = keyed_documents(documents, source)
+        versions = self.index_versions
+        version_id = versions.create_version()
+        embeddings = ScheduledEmbeddings(self.get_embedding_scheduler(progress_callback))
+        path = versions.version_path(version_id)
+        try:
+            vector_store = Chroma.from_documents(
+                documents=list(keyed.values()),
+                embedding=embeddings,
+                ids=list(keyed),
+                persist_directory=path,
+            )
+            IncrementalIndexer(vector_store=vector_store, persist_directory=path).write_index_files(keyed)
+            validate_vector_store(
+                vector_store,
+                expected_count=len(keyed),
+                sample_queries=self.get_validation_queries(),
+            )
+        except Exception:
+            self.discard_vector_store_version(version_id)
+            raise
+        self.activate_vector_store_version(version_id)
+        return vector_store
+
     def _create_gemini_embeddings(self):
         if GoogleGenerativeAIEmbeddings is None:
             raise ImportError(
@@ -119,12 +420,112 @@ class ProviderManager:
         """Expose the resolved provider choice for external consumers."""
         return self._resolve_provider_selection(session_id)
 
+    def get_chat_model(self, provider: str, purpose: str):
+        """Return the cached chat model for an explicit provider and purpose.
+
+        The model is paired with the provider's ``HEDGE_ALTERNATES`` partner:
+        with ``HEDGED_REQUESTS`` slow calls are duplicated to it, otherwise
+        (``PROVIDER_FALLBACK``) it only takes over failed or rejected calls.
+        """
+        provider = provider.lower()
+        hedge = _env_flag("HEDGED_REQUESTS", False)
+        if hedge or _env_flag("PROVIDER_FALLBACK", True):
+            return self._get_routed_chat_model(provider, purpose, hedge)
+        return self._get_cached_chat_model(provider, purpose)
+
+    def get_chat_routing_stats(self) -> Dict[str, Dict[str, object]]:
+        """Latency/error EWMAs, p90 and hedge counts per chat provider."""
+        return self.chat_router.snapshot()
+
+    @staticmethod
+    def _hedge_alternates() -> Dict[str, str]:
+        pairs = os.getenv("HEDGE_ALTERNATES", "gemini:qwen,qwen:gemini")
+        alternates = {}
+        for pair in pairs.split(","):
+            primary, sep, alternate = pair.strip().partition(":")
+            if sep and primary and alternate:
+                alternates[primary.lower()] = alternate.lower()
+        return alternates
+
+    def get_provider_health(self) -> Dict[str, Dict[str, object]]:
+        """Circuit breaker, bulkhead and routing state per chat provider."""
+        routing = self.chat_router.snapshot()
+        with self._chat_model_lock:
+            providers = sorted(set(self._breakers) | set(self._bulkheads) | set(routing))
+        return {
+            provider: {
+                "circuit": self._breakers[provider].snapshot() if provider in self._breakers else None,
+                "bulkhead": self._bulkheads[provider].snapshot() if provider in self._bulkheads else None,
+                "routing": routing.get(provider),
+            }
+            for provider in providers
+        }
+
+    def _guard_chat_model(self, provider: str, model):
+        """Wrap ``model`` in the provider's circuit breaker and bulkhead."""
+        breaker = self._breakers.get(provider)
+        if breaker is None and _env_flag("CIRCUIT_BREAKER_ENABLED", True):
+            breaker = self._breakers[provider] = CircuitBreaker(
+                provider,
+                failure_threshold=int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5")),
+                reset_timeout=float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30")),
+                half_open_max=int(os.getenv("CIRCUIT_HALF_OPEN_MAX", "1")),
+            )
+        bulkhead = self._bulkheads.get(provider)
+        if bulkhead is None:
+            limit = os.getenv(f"{provider.upper()}_MAX_CONCURRENCY", os.getenv("PROVIDER_MAX_CONCURRENCY", "0"))
+            bulkhead = self._bulkheads[provider] = Bulkhead(
+                provider,
+                max_concurrent=int(limit),
+                wait=float(os.getenv("PROVIDER_BULKHEAD_WAIT_MS", "0")) / 1000,
+            )
+        if breaker is None and not bulkhead.max_concurrent:
+            return model
+        return GuardedChatModel(
+            provider=provider,
+            model=model,
+            bulkhead=bulkhead,
+            breaker=breaker,
+        )
+
+    def _get_routed_chat_model(self, provider: str, purpose: str, hedge: bool):
+        key = (provider, purpose, hedge)
+        model = self._routed_model_cache.get(key)
+        if model is not None:
+            return model
+
+        primary = self._get_cached_chat_model(provider, purpose)
+        alternate_name = self._hedge_alternates().get(provider)
+        alternate = None
+        if alternate_name:
+            try:
+                alternate = self._get_cached_chat_model(alternate_name, purpose)
+            except Exception as e:
+                # e.g. Qwen credentials missing: serve the primary alone
+                logger.warning(f"Hedge alternate {alternate_name} for {provider} unavailable: {str(e)}")
+
+        if alternate is None:
+            model = primary
+        else:
+            model = HedgedChatModel(
+                backends=[(provider, primary), (alternate_name, alternate)],
+                router=self.chat_router,
+                hedge=hedge,
+            )
+        with self._chat_model_lock:
+            return self._routed_model_cache.setdefault(key, model)
+
     def _get_cached_chat_model(self, provider: str, purpose: str):
         """Return a cached chat model or build it if not available."""
         key = (provider, purpose)
-        if key not in self._chat_model_cache:
-            self._chat_model_cache[key] = self._create_chat_model(provider, purpose)
-        return self._chat_model_cache[key]
+        model = self._chat_model_cache.get(key)
+        if model is None:
+            with self._chat_model_lock:
+                model = self._chat_model_cache.get(key)
+                if model is None:
+                    model = self._guard_chat_model(provider, self._create_chat_model(provider, purpose))
+                    self._chat_model_cache[key] = model
+        return model
 
     def _resolve_provider_selection(self, session_id: Optional[str]) -> Dict[str, str]:
         """Resolve defaults merged with any session override."""
@@ -145,6 +546,13 @@ class ProviderManager:
             return self._create_gemini_chat_model(purpose)
         if provider == "qwen":
             return self._create_qwen_chat_model(purpose)
+        if provider == "fake":
+            return FakeChatModel(
+                name_tag=f"fake:{purpose.lower()}",
+                latency_ms=float(os.getenv("FAKE_CHAT_LATENCY_MS", "50")),
+                jitter_ms=float(os.getenv("FAKE_CHAT_JITTER_MS", "0")),
+                error_rate=float(os.getenv("FAKE_CHAT_ERROR_RATE", "0")),
+            )
         raise ValueError(f"Unsupported chat provider: {provider}")
 
     def _create_gemini_chat_model(self, purpose: str):
@@ -157,12 +565,17 @@ class ProviderManager:
         model_name = os.getenv("GOOGLE_CHAT_MODEL", "gemini-1.5-pro")
         temperature = float(os.getenv(f"{purpose}_TEMPERATURE", "0.7"))
         max_tokens = int(os.getenv(f"{purpose}_MAX_OUTPUT_TOKENS", "2048"))
-        return ChatGoogleGenerativeAI(
-            model=model_name,
-            google_api_key=api_key,
-            temperature=temperature,
-            max_output_tokens=max_tokens,
-        )
+        key = (model_name, temperature, max_tokens)
+        model = self._gemini_models.get(key)
+        if model is None:
+            model = self._gemini_models[key] = ChatGoogleGenerativeAI(
+                model=model_name,
+                google_api_key=api_key,
+                temperature=temperature,
+                max_output_tokens=max_tokens,
+                timeout=self.http_clients.config.read_timeout,
+            )
+        return model
 
     def _create_qwen_chat_model(self, purpose: str):
         if ChatOpenAI is None:
@@ -186,6 +599,9 @@ class ProviderManager:
             base_url=base_url,
             model=model_name,
             temperature=temperature,
+            timeout=self.http_clients.config.timeout,
+            http_client=self.http_clients.client(base_url),
+            http_async_client=self.http_clients.async_client(base_url),
         )
 
     # ------------------------------------------------------------------
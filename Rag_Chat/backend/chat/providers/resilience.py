@@ -0,0 +1,277 @@
+"""Per-provider circuit breakers and concurrency bulkheads for chat models.
+
+When a provider degrades, calls to it would otherwise each wait out the full
+client timeout and tie up a worker. ``CircuitBreaker`` opens after
+``failure_threshold`` consecutive failures and rejects calls immediately
+until ``reset_timeout`` has passed; then a limited number of half-open trial
+calls decide whether it closes again. ``Bulkhead`` caps in-flight calls per
+provider so one slow upstream cannot occupy every worker.
+
+``GuardedChatModel`` applies both around a provider's chat model and raises
+``ProviderUnavailable`` on rejection, which ``HedgedChatModel`` treats as a
+failure and fails over to the alternate provider.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from .chat_routing import as_generation_chunk
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class ProviderUnavailable(RuntimeError):
+    """Raised without calling the provider when its breaker or bulkhead rejects."""
+
+
+class CircuitBreaker:
+    """Closed → open after consecutive failures → half-open after a cool-down."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max: int = 1,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trials = 0
+        self.rejections = 0
+        self.times_opened = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._trials = 0
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self.times_opened += 1
+
+    def allow(self) -> bool:
+        """Reserve a call; False (and a rejection is counted) when it must fail fast."""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._trials < self.half_open_max:
+                self._trials += 1
+                return True
+            self.rejections += 1
+            return False
+
+    def record_success(self) -> None:
+        """Reset the failure count; only a successful half-open trial closes the breaker.
+
+        Successes of calls admitted before the breaker opened are ignored while
+        it is open, and in half-open unless a trial call is in flight.
+        """
+        with self._lock:
+            self._refresh()
+            if self._state == OPEN:
+                return
+            if self._state == HALF_OPEN:
+                if self._trials == 0:
+                    return
+                self._state = CLOSED
+            self._failures = 0
+
+    def release(self) -> None:
+        """Give back a call reserved by :meth:`allow` that produced no outcome."""
+        with self._lock:
+            if self._state == HALF_OPEN and self._trials > 0:
+                self._trials -= 1
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            self._refresh()
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "times_opened": self.times_opened,
+                "rejections": self.rejections,
+            }
+
+
+class Bulkhead:
+    """Cap on concurrent calls to one provider; ``max_concurrent=0`` disables it."""
+
+    def __init__(self, name: str, max_concurrent: int = 0, wait: float = 0.0) -> None:
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.wait = wait
+        self._semaphore = threading.BoundedSemaphore(max_concurrent) if max_concurrent > 0 else None
+        self.in_flight = 0
+        self.rejections = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, blocking: bool = True) -> bool:
+        if self._semaphore is not None:
+            acquired = (
+                self._semaphore.acquire(timeout=self.wait)
+                if blocking and self.wait > 0
+                else self._semaphore.acquire(blocking=False)
+            )
+            if not acquired:
+                with self._lock:
+                    self.rejections += 1
+                return False
+        with self._lock:
+            self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "max_concurrent": self.max_concurrent,
+                "rejections": self.rejections,
+            }
+
+
+class GuardedChatModel(BaseChatModel):
+    """Chat model that runs ``model`` behind a circuit breaker and a bulkhead.
+
+    ``breaker`` may be None when only the bulkhead is configured.
+    """
+
+    provider: str
+    model: Any
+    bulkhead: Any
+    breaker: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "guarded-chat"
+
+    def _enter(self, blocking: bool = True) -> None:
+        if self.breaker is not None and not self.breaker.allow():
+            raise ProviderUnavailable(f"Circuit for chat provider {self.provider} is open")
+        if not self.bulkhead.acquire(blocking=blocking):
+            # Not a provider failure: leave the breaker untouched
+            if self.breaker is not None:
+                self.breaker.release()
+            raise ProviderUnavailable(f"Too many concurrent calls to chat provider {self.provider}")
+
+    def _exit(self, ok: Optional[bool]) -> None:
+        self.bulkhead.release()
+        if self.breaker is None:
+            return
+        if ok is True:
+            self.breaker.record_success()
+        elif ok is False:
+            self.breaker.record_failure()
+        else:
+            self.breaker.release()
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        self._enter()
+        ok = False
+        try:
+            message = self.model.invoke(messages, stop=stop, **kwargs)
+            ok = True
+        finally:
+            self._exit(ok)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Never block the event loop on the bulkhead
+        self._enter(blocking=False)
+        ok: Optional[bool] = False
+        try:
+            message = await self.model.ainvoke(messages, stop=stop, **kwargs)
+            ok = True
+        except BaseException as exc:
+            if not isinstance(exc, Exception):
+                ok = None  # cancelled: says nothing about the provider
+            raise
+        finally:
+            self._exit(ok)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        self._enter()
+        ok: Optional[bool] = False
+        try:
+            for chunk in self.model.stream(messages, stop=stop, **kwargs):
+                yield as_generation_chunk(chunk)
+            ok = True
+        except GeneratorExit:
+            ok = None
+            raise
+        finally:
+            self._exit(ok)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self._enter(blocking=False)
+        ok: Optional[bool] = False
+        try:
+            async for chunk in self.model.astream(messages, stop=stop, **kwargs):
+                yield as_generation_chunk(chunk)
+            ok = True
+        except BaseException as exc:
+            if not isinstance(exc, Exception):
+                ok = None
+            raise
+        finally:
+            self._exit(ok)
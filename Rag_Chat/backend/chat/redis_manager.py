@@ -1,21 +1,76 @@
 import json
 import redis
+import threading
 from django.conf import settings
 from datetime import datetime
 import logging
 from typing import Optional, Dict, List, Any
-from redis.connection import ConnectionPool
+from redis.connection import BlockingConnectionPool
 
 logger = logging.getLogger(__name__)
 
+
+class InstrumentedConnectionPool(BlockingConnectionPool):
+    """Blocking connection pool that records checkout/exhaustion metrics.
+
+    When every connection is checked out, callers wait up to ``timeout``
+    seconds for one to be released instead of failing immediately.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "exhausted": 0,
+            "in_use": 0,
+            "peak_in_use": 0,
+        }
+
+    def get_connection(self, *args, **kwargs):
+        # The queue is empty only when every connection is checked out
+        must_wait = self.pool.empty()
+        try:
+            connection = super().get_connection(*args, **kwargs)
+        except redis.ConnectionError:
+            if must_wait:
+                with self._stats_lock:
+                    self._stats["exhausted"] += 1
+                logger.warning(f"Redis connection pool exhausted (max_connections={self.max_connections})")
+            raise
+        with self._stats_lock:
+            self._stats["checkouts"] += 1
+            if must_wait:
+                self._stats["waits"] += 1
+            self._stats["in_use"] += 1
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._stats["in_use"])
+        return connection
+
+    def release(self, connection):
+        super().release(connection)
+        with self._stats_lock:
+            self._stats["in_use"] = max(0, self._stats["in_use"] - 1)
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["max_connections"] = self.max_connections
+        return stats
+
+
 class RedisConnectionManager:
     _instance = None
     _pool = None
+    _client = None
+    _lock = threading.Lock()
 
     @classmethod
     def get_instance(cls) -> 'RedisConnectionManager':
         if cls._instance is None:
-            cls._instance = cls()
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
         return cls._instance
 
     def __init__(self):
@@ -25,31 +80,58 @@ class RedisConnectionManager:
         """Initialize Redis connection pool"""
         try:
             if self._pool is None:
-                self._pool = ConnectionPool(
+                # Connections idle longer than the interval are PINGed lazily on checkout
+                type(self)._pool = InstrumentedConnectionPool(
                     host=settings.REDIS_HOST,
                     port=settings.REDIS_PORT,
                     db=settings.REDIS_MESSAGE_DB,
                     decode_responses=True,
                     socket_timeout=5,
                     retry_on_timeout=True,
-                    max_connections=10
+                    max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    timeout=settings.REDIS_POOL_TIMEOUT,
+                    health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                )
+                logger.info(
+                    f"Redis connection pool initialized (max_connections={settings.REDIS_MAX_CONNECTIONS})"
                 )
-                logger.info("Redis connection pool initialized")
         except Exception as e:
             logger.error(f"Failed to initialize Redis connection pool: {str(e)}")
             raise
 
-    def get_connection(self) -> redis.Redis:
-        """Get Redis connection from pool"""
+    def get_connection(self, check: bool = False) -> redis.Redis:
+        """Get the shared Redis client backed by the pool.
+
+        The client is thread-safe and reused; set ``check`` to force an
+        immediate PING instead of relying on the pool's lazy health checks.
+        """
         try:
-            connection = redis.Redis(connection_pool=self._pool)
-            connection.ping()
-            return connection
+            if self._client is None:
+                type(self)._client = redis.Redis(connection_pool=self._pool)
+            if check:
+                self._client.ping()
+            return self._client
         except redis.ConnectionError as e:
             logger.error(f"Failed to get Redis connection: {str(e)}")
             raise
 
+    def get_pool_stats(self) -> Dict[str, int]:
+        """Return checkout, wait and exhaustion counters for the pool"""
+        return self._pool.get_stats() if self._pool is not None else {}
+
 class RedisMessageManager:
+    _instance = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls) -> 'RedisMessageManager':
+        """Return the process-wide message manager"""
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = cls()
+        return cls._instance
+
     def __init__(self):
         """Initialize Redis message manager with connection pool"""
         try:
@@ -68,8 +150,8 @@ class RedisMessageManager:
         """Centralized error handling for Redis operations"""
         logger.error(f"Redis error during {operation}: {str(error)}")
         try:
-            # Attempt to get a fresh connection
-            self.redis_client = self.connection_manager.get_connection()
+            # Verify the pool can reach Redis again before retrying
+            self.redis_client = self.connection_manager.get_connection(check=True)
         except Exception as e:
             logger.error(f"Failed to reconnect to Redis: {str(e)}")
             raise
@@ -95,6 +177,8 @@ class RedisMessageManager:
                 # Add message to list and set expiry
                 pipeline = self.redis_client.pipeline()
                 pipeline.rpush(message_key, message_json)
+                if settings.REDIS_MESSAGE_MAX_LENGTH:
+                    pipeline.ltrim(message_key, -settings.REDIS_MESSAGE_MAX_LENGTH, -1)
                 pipeline.expire(message_key, settings.REDIS_MESSAGE_TTL)
                 pipeline.execute()
                 
@@ -109,47 +193,78 @@ class RedisMessageManager:
 
         return False
 
-    def get_messages(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
-        """Retrieve chat messages for a user with error handling"""
+    def _parse_messages(self, raw_messages: List[str]) -> List[Dict[str, Any]]:
+        """Decode stored JSON entries, skipping malformed ones"""
+        parsed_messages = []
+        for msg in raw_messages:
+            try:
+                parsed_messages.append(json.loads(msg))
+            except json.JSONDecodeError as e:
+                logger.error(f"Error parsing message JSON: {str(e)}")
+                continue
+        return parsed_messages
+
+    def get_recent_messages(
+        self,
+        user_id: str,
+        window: Optional[int] = None,
+        max_chars: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve the last ``window`` messages for a user, oldest first.
+
+        Only the tail of the list is read (``LRANGE -window -1``), so the cost
+        does not grow with conversation length. When ``max_chars`` is set, the
+        oldest messages are dropped until the total content fits the budget;
+        the newest message is always kept.
+        """
         if not user_id:
             logger.error("Cannot get messages: user_id is required")
             return []
 
+        window = settings.REDIS_HISTORY_WINDOW if window is None else window
+        max_chars = settings.REDIS_HISTORY_MAX_CHARS if max_chars is None else max_chars
+        if window <= 0:
+            return []
+
         retries = 3
         while retries > 0:
             try:
                 message_key = self._get_message_key(user_id)
-                
-                # Get all messages
-                messages = self.redis_client.lrange(message_key, 0, -1)
-                
-                # Parse JSON strings to objects
-                parsed_messages = []
-                for msg in messages:
-                    try:
-                        parsed_messages.append(json.loads(msg))
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Error parsing message JSON: {str(e)}")
-                        continue
-                
-                # Sort by timestamp descending and limit
-                sorted_messages = sorted(
-                    parsed_messages,
-                    key=lambda x: x.get('timestamp', ''),
-                    reverse=True
-                )
-                
-                logger.debug(f"Retrieved {len(sorted_messages)} messages for user {user_id}")
-                return sorted_messages[:limit]
+                messages = self._parse_messages(self.redis_client.lrange(message_key, -window, -1))
+
+                if max_chars:
+                    total = 0
+                    kept = 0
+                    for msg in reversed(messages):
+                        total += len(str(msg.get('content', '')))
+                        if kept and total > max_chars:
+                            break
+                        kept += 1
+                    messages = messages[len(messages) - kept:]
+
+                logger.debug(f"Retrieved {len(messages)} recent messages for user {user_id}")
+                return messages
 
             except redis.RedisError as e:
                 retries -= 1
-                self._handle_redis_error("get_messages", e)
+                self._handle_redis_error("get_recent_messages", e)
                 if retries == 0:
                     return []
 
         return []
 
+    def get_messages(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Retrieve the latest ``limit`` chat messages for a user, newest first.
+
+        Kept for existing callers; prompt history should use
+        ``get_recent_messages``, which returns chronological order.
+        """
+        if limit <= 0:
+            return []
+        messages = self.get_recent_messages(user_id, window=limit, max_chars=0)
+        # Messages are appended in order, so list order is timestamp order
+        return list(reversed(messages))
+
     def clear_messages(self, user_id: str) -> bool:
         """Delete all messages for a user with error handling"""
         if not user_id:
@@ -187,7 +302,8 @@ class RedisMessageManager:
                 'connected_clients': info.get('connected_clients', 0),
                 'used_memory': info.get('used_memory_human', '0B'),
                 'total_connections_received': info.get('total_connections_received', 0),
-                'total_commands_processed': info.get('total_commands_processed', 0)
+                'total_commands_processed': info.get('total_commands_processed', 0),
+                'pool': self.connection_manager.get_pool_stats(),
             }
         except redis.RedisError as e:
             logger.error(f"Failed to get Redis info: {str(e)}")
@@ -0,0 +1,102 @@
+"""Metadata filters for similarity search.
+
+Filters arrive either from the chat request (``{"model": "Galaxy S25 Ultra",
+"color": ["Silver"]}``) or from the question itself, parsed against the
+catalogue index. They are normalised to ``{metadata_key: [values]}`` and
+pushed down into Chroma's ``where`` clause, so only matching chunks are
+scored and fewer, more relevant chunks reach the prompt.
+
+Catalogue columns are stored on every chunk as ``field_<column>`` metadata
+(see :func:`add_field_metadata`).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from langchain.schema import Document
+
+from .providers import provider_manager
+from .providers.catalogue_index import COLUMNS
+
+logger = logging.getLogger(__name__)
+
+Filters = Dict[str, List[str]]
+
+
+def field_key(column: str) -> str:
+    """Metadata key of a catalogue column, e.g. ``Image Path`` → ``field_image_path``."""
+    return f"field_{column.replace(' ', '_').lower()}"
+
+
+#: Request filter names and the chunk metadata they match
+FILTER_KEYS = {
+    "model": field_key("Model"),
+    "color": field_key("Color"),
+    "storage": field_key("Storage"),
+    "ram": field_key("RAM"),
+    "sheet": "sheet",
+    "source": "source",
+}
+
+
+def add_field_metadata(documents: Iterable[Document]) -> List[Document]:
+    """Copy ``Column: value`` catalogue lines of each document into ``field_*`` metadata."""
+    documents = list(documents)
+    for document in documents:
+        for line in document.page_content.splitlines():
+            name, sep, value = line.partition(":")
+            name, value = name.strip(), value.strip()
+            if sep and name in COLUMNS and value:
+                document.metadata.setdefault(field_key(name), value)
+    return documents
+
+
+def normalize_filters(raw: Optional[Dict[str, Any]]) -> Filters:
+    """Validate request filters and map them to metadata keys.
+
+    Raises ValueError for unknown filter names or non-string values.
+    """
+    if not raw:
+        return {}
+    if not isinstance(raw, dict):
+        raise ValueError("filters must be an object")
+
+    filters: Filters = {}
+    for name, value in raw.items():
+        if name not in FILTER_KEYS:
+            raise ValueError(f"Unsupported filter: {name}")
+        values = value if isinstance(value, list) else [value]
+        if not values or not all(isinstance(item, str) and item for item in values):
+            raise ValueError(f"Filter {name} must be a string or a list of strings")
+        filters[FILTER_KEYS[name]] = list(dict.fromkeys(values))
+    return filters
+
+
+def parse_question_filters(question: str) -> Filters:
+    """Extract model/color/storage/RAM filters from the question text."""
+    try:
+        catalogue = provider_manager.get_catalogue_index()
+    except Exception as e:
+        logger.warning(f"Catalogue index unavailable for filter parsing: {str(e)}")
+        return {}
+    if catalogue is None:
+        return {}
+    return {field_key(column): values for column, values in catalogue.parse_filters(question).items()}
+
+
+def build_where(filters: Filters) -> Optional[Dict[str, Any]]:
+    """Translate normalised filters into a Chroma ``where`` clause."""
+    clauses = [
+        {key: values[0]} if len(values) == 1 else {key: {"$in": values}}
+        for key, values in filters.items()
+    ]
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def matches_filters(metadata: Dict[str, Any], filters: Filters) -> bool:
+    """Apply the same filters in Python (for results that bypass Chroma)."""
+    return all(str(metadata.get(key)) in values for key, values in filters.items())
@@ -0,0 +1,120 @@
+"""Opt-in semantic response cache for the chat pipeline.
+
+Answers are stored per provider selection and vector index version. A new
+question reuses a stored answer when its embedding is within
+``SEMANTIC_CACHE_THRESHOLD`` cosine similarity of a cached question. Because
+the active index version (the blue/green pointer) is part of the cache key,
+activating a new vector store version automatically retires every previous
+entry.
+
+Entries live in a Redis list per key so every worker process shares them;
+stores append atomically (``RPUSH`` + ``LTRIM`` in one transaction) instead of
+rewriting the whole list. When Redis is unreachable the cache is bypassed.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from .providers import provider_manager
+from .redis_manager import RedisConnectionManager
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled() -> bool:
+    return os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() in {"1", "true", "yes", "on"}
+
+
+def _threshold() -> float:
+    return float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95"))
+
+
+def _ttl() -> int:
+    return int(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+
+
+def _max_entries() -> int:
+    return int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "256"))
+
+
+def current_index_version() -> str:
+    """Return the ID of the index version being served."""
+    # Builds in progress or failed never move the pointer, so answers keep
+    # their bucket until a new version is actually served
+    return provider_manager.index_versions.active_version() or "legacy"
+
+
+def _key(selection: Dict[str, str], index_version: str) -> str:
+    return (
+        f"semantic_cache:{index_version}:"
+        f"{selection.get('reasoning_provider')}:{selection.get('generation_provider')}"
+    )
+
+
+def _redis():
+    return RedisConnectionManager.get_instance().get_connection()
+
+
+def _embed(question: str) -> np.ndarray:
+    vector = np.asarray(provider_manager.get_embedding_model().embed_query(question), dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def lookup(
+    question: str,
+    selection: Dict[str, str],
+    index_version: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Return the closest cached answer above the threshold, if any."""
+    index_version = index_version or current_index_version()
+    try:
+        raw_entries = _redis().lrange(_key(selection, index_version), 0, -1)
+    except Exception as exc:
+        logger.warning(f"Semantic cache unavailable, skipping lookup: {exc}")
+        return None
+    entries: List[Dict[str, Any]] = [json.loads(raw) for raw in raw_entries]
+    if not entries:
+        return None
+
+    query = _embed(question)
+    matrix = np.asarray([entry["embedding"] for entry in entries], dtype=np.float32)
+    scores = matrix @ query
+    best = int(np.argmax(scores))
+    score = float(scores[best])
+    if score < _threshold():
+        return None
+
+    entry = dict(entries[best])
+    entry.pop("embedding", None)
+    entry["similarity"] = score
+    logger.debug(f"Semantic cache hit ({score:.3f}) for question: {question}")
+    return entry
+
+
+def store(
+    question: str,
+    selection: Dict[str, str],
+    payload: Dict[str, Any],
+    index_version: Optional[str] = None,
+) -> None:
+    """Cache a pipeline result for future semantically similar questions."""
+    index_version = index_version or current_index_version()
+    key = _key(selection, index_version)
+    entry = json.dumps({
+        **payload,
+        "question": question,
+        "embedding": _embed(question).tolist(),
+    }, ensure_ascii=False, default=str)
+    # One MULTI/EXEC: concurrent stores from other workers are never lost
+    pipeline = _redis().pipeline(transaction=True)
+    pipeline.rpush(key, entry)
+    pipeline.ltrim(key, -_max_entries(), -1)
+    pipeline.expire(key, _ttl())
+    pipeline.execute()
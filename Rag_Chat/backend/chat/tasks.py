@@ -15,7 +15,7 @@ def check_session_expiry():
     Check for expired sessions and clean up associated data in both Redis and database
     """
     try:
-        redis_manager = RedisMessageManager()
+        redis_manager = RedisMessageManager.get_instance()
         processed_count = 0
         
         # Get active sessions from Redis
@@ -90,4 +90,16 @@ def check_session_expiry():
         
     except Exception as e:
         logger.error(f"Error in session cleanup task: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+
+@shared_task
+def run_ingestion_job(job_id):
+    """
+    Load, split, embed and persist documents for a vector ingestion job
+    """
+    from .ingestion import run_job
+
+    job = run_job(job_id)
+    logger.info(f"Ingestion job {job_id} finished with status {job['status']}")
+    return {"job_id": job_id, "status": job["status"]}
@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+from langchain.schema import Document
+
+from ..pipeline import ModuleContext, PipelineRunner, RouterModule
+from ..providers.catalogue_index import CatalogueIndex, normalize
+
+ROWS = [
+    ("Galaxy S25", "Phantom Black", "256GB", "12GB", "1199.99", "black_s25.png"),
+    ("Galaxy S25", "Silver", "256GB", "12GB", "1199.99", "silver_s25.png"),
+    ("Galaxy S25 Plus", "Silver", "512GB", "12GB", "1499.99", "silver_s25_plus.png"),
+    ("Galaxy S25 Ultra", "Phantom Black", "512GB", "16GB", "1599.99", "black_s25_ultra.png"),
+    ("Galaxy S25 Ultra", "Silver", "1TB", "16GB", "1799.99", "silver_s25_ultra.png"),
+]
+
+
+def catalogue_documents():
+    return [
+        Document(
+            page_content=(
+                f"Model: {model}\nColor: {color}\nStorage: {storage}\nRAM: {ram}\n"
+                f"Battery: 5000mAh\nPrice: {price}\nImage Path: {image}"
+            ),
+            metadata={"source": "galaxy_s25_data.csv", "row": index},
+        )
+        for index, (model, color, storage, ram, price, image) in enumerate(ROWS)
+    ]
+
+
+class CatalogueIndexTestCase(SimpleTestCase):
+    def setUp(self):
+        self.index = CatalogueIndex.from_documents(
+            # The Excel sheet repeats the CSV rows; non-catalogue chunks are skipped
+            catalogue_documents() + catalogue_documents() + [Document(page_content="반품 정책 안내")]
+        )
+
+    def test_builds_one_column_per_attribute(self):
+        self.assertEqual(len(self.index), 5)
+        self.assertEqual(self.index.columns["Price"][4], "1799.99")
+        self.assertEqual(self.index.filter({"Color": ["Silver"], "Storage": ["256GB", "1TB"]}), [1, 4])
+
+    def test_normalize_maps_korean_terms_and_units(self):
+        self.assertEqual(normalize("갤럭시 S25 울트라 256 기가 실버"), "galaxy s25 ultra 256gb silver")
+
+    def test_price_lookup_by_storage(self):
+        answer = self.index.answer("256GB 모델 가격")
+
+        self.assertEqual(answer.filters, {"Storage": ["256GB"]})
+        self.assertEqual(answer.attributes, ["Price"])
+        self.assertIn("- Galaxy S25 Phantom Black 256GB: 가격 1199.99", answer.response)
+        self.assertEqual(answer.images, ["black_s25.png", "silver_s25.png"])
+
+    def test_colour_availability(self):
+        answer = self.index.answer("실버 색상 있나요")
+
+        self.assertTrue(answer.response.startswith("네, 조건(Silver)"))
+        self.assertEqual([row["Model"] for row in answer.rows], ["Galaxy S25", "Galaxy S25 Plus", "Galaxy S25 Ultra"])
+
+    def test_most_specific_model_wins(self):
+        answer = self.index.answer("S25 울트라 색상 알려줘")
+
+        self.assertEqual(answer.filters, {"Model": ["Galaxy S25 Ultra"]})
+        self.assertIn("- Galaxy S25 Ultra 1TB: 색상 Silver", answer.response)
+
+    def test_unknown_value_answers_no_for_availability(self):
+        self.assertTrue(self.index.answer("핑크 색상 있나요").response.startswith("아니요"))
+        self.assertIsNone(self.index.answer("S24 가격"))
+
+    def test_open_ended_questions_take_rag_path(self):
+        for question in ("S25와 S25 Ultra 비교해줘", "카메라 어때요?", "안녕하세요", "있나요?"):
+            self.assertIsNone(self.index.answer(question), question)
+
+    def test_attribute_keywords_match_whole_words(self):
+        # "램" inside "프로그램" is not a RAM question
+        self.assertIsNone(self.index.answer("프로그램 설치 방법"))
+        self.assertEqual(self.index.answer("램이 얼마나 되나요").attributes, ["RAM"])
+        self.assertEqual(self.index.answer("S25 얼마예요").attributes, ["Price"])
+
+    def test_attribute_without_filter_needs_a_lookup_question(self):
+        self.assertIsNone(self.index.answer("배터리 수명 관리"))
+        self.assertEqual(self.index.answer("가격 알려줘").attributes, ["Price"])
+
+    def test_unknown_model_variant_takes_rag_path(self):
+        self.assertIsNone(self.index.answer("갤럭시 S25 엣지 가격"))
+        self.assertIsNone(self.index.answer("S25 FE 색상"))
+
+    def test_save_and_load_round_trip(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+
+        self.index.save(directory)
+
+        self.assertEqual(CatalogueIndex.load(directory).columns, self.index.columns)
+        self.assertIsNone(CatalogueIndex.load(os.path.join(directory, "missing")))
+
+
+class RouterModuleTestCase(SimpleTestCase):
+    def setUp(self):
+        self.catalogue = CatalogueIndex.from_documents(catalogue_documents())
+        patcher = patch("chat.pipeline.modules.provider_manager.get_catalogue_index", return_value=self.catalogue)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _context(self, question):
+        return ModuleContext(question=question, session_id="s", user_id="u", history=MagicMock())
+
+    def test_catalogue_answer_halts_pipeline(self):
+        retrieve = MagicMock()
+        runner = PipelineRunner(
+            [{"type": "router"}, {"type": "retrieve"}],
+            {"router": RouterModule, "retrieve": lambda: retrieve},
+            hooks=[],
+        )
+
+        context = runner.run(self._context("1TB 가격은?"))
+
+        retrieve.run.assert_not_called()
+        self.assertTrue(context.halted)
+        self.assertEqual(context.extra["route"], "catalogue")
+        self.assertIn("가격 1799.99", context.response)
+        self.assertEqual(context.images, ["silver_s25_ultra.png"])
+        self.assertIn("Model: Galaxy S25 Ultra", context.context_text)
+        self.assertEqual(context.history.add_message.call_count, 2)
+
+    def test_other_questions_pass_through(self):
+        context = RouterModule().run(self._context("S25 카메라 성능 비교"))
+
+        self.assertFalse(context.halted)
+        self.assertIsNone(context.response)
+        context.history.add_message.assert_not_called()
+
+    @patch.dict(os.environ, {"CATALOGUE_FAST_PATH": "false"})
+    def test_fast_path_can_be_disabled(self):
+        self.assertFalse(RouterModule().run(self._context("1TB 가격은?")).halted)
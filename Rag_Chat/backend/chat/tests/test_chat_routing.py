@@ -0,0 +1,186 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from langchain_core.messages import HumanMessage
+from langchain_core.output_parsers import StrOutputParser
+
+from ..providers.chat_routing import HedgedChatModel, ProviderRouter
+from ..providers.fake_chat import FakeChatModel
+from ..providers.manager import ProviderManager
+
+
+def fake(name, latency_ms=10, error_rate=0.0):
+    return FakeChatModel(name_tag=name, latency_ms=latency_ms, error_rate=error_rate)
+
+
+class ProviderRouterTestCase(SimpleTestCase):
+    """Test case for provider latency/error tracking"""
+
+    def test_hedge_delay_uses_p90_after_warmup(self):
+        """The default delay applies until enough samples exist, then the p90"""
+        router = ProviderRouter(min_samples=10, default_delay=2.0, min_delay=0.0)
+        self.assertEqual(router.hedge_delay("gemini"), 2.0)
+
+        for latency in range(1, 11):
+            router.record("gemini", latency / 10, ok=True)
+
+        self.assertAlmostEqual(router.hedge_delay("gemini"), 1.0)
+
+    def test_unhealthy_primary_is_steered_away(self):
+        """A failing or much slower primary is ordered after the alternate"""
+        router = ProviderRouter(alpha=0.5, error_threshold=0.5)
+        backends = [("gemini", "g"), ("qwen", "q")]
+        self.assertEqual(router.order(backends)[0][0], "gemini")
+
+        router.record("gemini", 1.0, ok=False)
+        router.record("qwen", 0.1, ok=True)
+        self.assertEqual(router.order(backends)[0][0], "qwen")
+
+        slow = ProviderRouter(steer_ratio=2.0)
+        slow.record("gemini", 3.0, ok=True)
+        slow.record("qwen", 1.0, ok=True)
+        self.assertEqual(slow.order(backends)[0][0], "qwen")
+
+
+class HedgedChatModelTestCase(SimpleTestCase):
+    """Test case for hedged chat calls using the fake provider"""
+
+    def _model(self, primary, alternate, **router_kwargs):
+        router = ProviderRouter(**{"default_delay": 0.05, **router_kwargs})
+        return HedgedChatModel(backends=[("primary", primary), ("alternate", alternate)], router=router), router
+
+    def test_fast_primary_is_not_hedged(self):
+        model, router = self._model(fake("primary"), fake("alternate"))
+
+        result = model.invoke([HumanMessage(content="질문")])
+
+        self.assertEqual(result.content, "[primary] 질문")
+        self.assertEqual(router.snapshot()["primary"]["hedges"], 0)
+        self.assertEqual(router.snapshot()["alternate"]["calls"], 0)
+
+    def test_slow_primary_is_hedged(self):
+        """Past the hedge delay the alternate answers first"""
+        model, router = self._model(fake("primary", latency_ms=1000), fake("alternate"))
+
+        started = time.monotonic()
+        result = model.invoke([HumanMessage(content="질문")])
+
+        self.assertEqual(result.content, "[alternate] 질문")
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(router.snapshot()["primary"]["hedges"], 1)
+
+    def test_sync_hedge_cancels_slow_call(self):
+        """The sync path cancels the slower duplicate too, instead of leaving it on a thread"""
+        model, router = self._model(fake("primary", latency_ms=1000), fake("alternate"))
+
+        model.invoke([HumanMessage(content="질문")])
+
+        self.assertEqual(router.snapshot()["primary"]["calls"], 0)
+
+    def test_saturated_hedge_slots_wait_on_primary(self):
+        """With every hedge slot busy the call is not duplicated"""
+        model, router = self._model(fake("primary", latency_ms=200), fake("alternate"))
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+
+        with patch("chat.providers.chat_routing._hedge_slots", return_value=slots):
+            result = model.invoke([HumanMessage(content="질문")])
+
+        self.assertEqual(result.content, "[primary] 질문")
+        self.assertEqual(router.snapshot()["primary"]["hedges"], 0)
+        self.assertEqual(router.snapshot()["alternate"]["calls"], 0)
+
+    def test_hedge_slot_is_released(self):
+        model, _ = self._model(fake("primary", latency_ms=1000), fake("alternate"))
+        slots = threading.BoundedSemaphore(1)
+
+        with patch("chat.providers.chat_routing._hedge_slots", return_value=slots):
+            model.invoke([HumanMessage(content="질문")])
+
+        self.assertTrue(slots.acquire(blocking=False))
+
+    def test_failed_primary_fails_over(self):
+        model, router = self._model(fake("primary", error_rate=1.0), fake("alternate"), default_delay=5.0)
+
+        result = model.invoke([HumanMessage(content="질문")])
+
+        self.assertEqual(result.content, "[alternate] 질문")
+        self.assertEqual(router.snapshot()["primary"]["failovers"], 1)
+        self.assertEqual(router.snapshot()["primary"]["errors"], 1)
+
+    def test_failover_only_calls_primary_inline(self):
+        """Without hedging the primary runs on the caller's thread, with no duplicate"""
+        model, router = self._model(fake("primary", latency_ms=200), fake("alternate"))
+        model.hedge = False
+
+        with patch("chat.providers.chat_routing._hedge_loop") as hedge_loop:
+            result = model.invoke([HumanMessage(content="질문")])
+
+        hedge_loop.assert_not_called()
+        self.assertEqual(result.content, "[primary] 질문")
+        self.assertEqual(router.snapshot()["alternate"]["calls"], 0)
+
+    def test_failover_only_moves_to_alternate_on_error(self):
+        model, router = self._model(fake("primary", error_rate=1.0), fake("alternate"))
+        model.hedge = False
+
+        result = model.invoke([HumanMessage(content="질문")])
+
+        self.assertEqual(result.content, "[alternate] 질문")
+        self.assertEqual(router.snapshot()["primary"]["failovers"], 1)
+
+    def test_both_failing_raises(self):
+        model, _ = self._model(fake("primary", error_rate=1.0), fake("alternate", error_rate=1.0))
+
+        with self.assertRaises(RuntimeError):
+            model.invoke([HumanMessage(content="질문")])
+
+    def test_async_hedge_cancels_slow_call(self):
+        """The async path returns the alternate and cancels the primary"""
+        model, router = self._model(fake("primary", latency_ms=1000), fake("alternate"))
+
+        started = time.monotonic()
+        result = asyncio.run(model.ainvoke([HumanMessage(content="질문")]))
+
+        self.assertEqual(result.content, "[alternate] 질문")
+        self.assertLess(time.monotonic() - started, 0.5)
+        # The cancelled primary never completed, so no latency was recorded for it
+        self.assertEqual(router.snapshot()["primary"]["calls"], 0)
+
+    def test_stream_fails_over_before_first_chunk(self):
+        model, _ = self._model(fake("primary", error_rate=1.0), fake("alternate"))
+
+        text = "".join(chunk.content for chunk in model.stream([HumanMessage(content="질문")]))
+
+        self.assertEqual(text, "[alternate] 질문")
+
+
+class HedgedProviderManagerTestCase(SimpleTestCase):
+    """Test case for hedged chat models served by ProviderManager"""
+
+    @patch.dict('os.environ', {
+        "HEDGED_REQUESTS": "true",
+        "HEDGE_ALTERNATES": "fake:fake",
+        "FAKE_CHAT_LATENCY_MS": "1",
+    })
+    def test_fake_provider_is_hedged(self):
+        manager = ProviderManager()
+
+        model = manager.get_chat_model("fake", "GENERATION")
+        answer = (model | StrOutputParser()).invoke([HumanMessage(content="안녕")])
+
+        self.assertIsInstance(model, HedgedChatModel)
+        self.assertIs(manager.get_chat_model("fake", "GENERATION"), model)
+        self.assertEqual(answer, "[fake:generation] 안녕")
+        self.assertEqual(manager.get_chat_routing_stats()["fake"]["calls"], 1)
+
+    @patch.dict('os.environ', {"HEDGED_REQUESTS": "true", "HEDGE_ALTERNATES": "fake:qwen"})
+    def test_unavailable_alternate_serves_primary(self):
+        with patch.dict('os.environ', {"QWEN_API_KEY": "", "QWEN_API_BASE": ""}):
+            model = ProviderManager().get_chat_model("fake", "REASONING")
+
+        self.assertNotIsInstance(model, HedgedChatModel)
+        self.assertIsInstance(model.model, FakeChatModel)
@@ -0,0 +1,139 @@
+import threading
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from langchain_core.embeddings import DeterministicFakeEmbedding, Embeddings
+
+from ..providers.embedding_scheduler import (
+    EmbeddingScheduler,
+    ScheduledEmbeddings,
+    TokenBucket,
+    is_rate_limit_error,
+)
+from ..providers.manager import ProviderManager
+
+
+class RateLimitedEmbedding(Embeddings):
+    """Local fake provider that throttles the first ``failures`` requests"""
+
+    def __init__(self, size=4, failures=0, delay=0.0):
+        self.fake = DeterministicFakeEmbedding(size=size)
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.active = 0
+        self.peak_concurrency = 0
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.peak_concurrency = max(self.peak_concurrency, self.active)
+            throttled = self.failures > 0
+            if throttled:
+                self.failures -= 1
+        try:
+            if throttled:
+                raise RuntimeError("429 Resource has been exhausted (e.g. check quota).")
+            time.sleep(self.delay)
+            return self.fake.embed_documents(texts)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def embed_query(self, text):
+        return self.fake.embed_query(text)
+
+
+class TokenBucketTestCase(SimpleTestCase):
+    def test_waits_for_refill_once_capacity_is_spent(self):
+        now = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=2, capacity=2, clock=lambda: now[0], sleep=sleep)
+        bucket.acquire()
+        bucket.acquire()
+        waited = bucket.acquire()
+
+        self.assertAlmostEqual(waited, 0.5)
+        self.assertEqual(sleeps, [0.5])
+
+
+class EmbeddingSchedulerTestCase(SimpleTestCase):
+    def test_embeds_in_batches_and_preserves_order(self):
+        fake = RateLimitedEmbedding(size=4)
+        scheduler = EmbeddingScheduler(fake, batch_size=3, concurrency=4, requests_per_second=0)
+        texts = [f"row {i}" for i in range(10)]
+
+        vectors = scheduler.embed(texts)
+
+        self.assertEqual(vectors, DeterministicFakeEmbedding(size=4).embed_documents(texts))
+        self.assertEqual(fake.calls, 4)
+
+    def test_runs_batches_concurrently_up_to_limit(self):
+        fake = RateLimitedEmbedding(size=4, delay=0.05)
+        scheduler = EmbeddingScheduler(fake, batch_size=1, concurrency=3, requests_per_second=0)
+
+        scheduler.embed([f"row {i}" for i in range(9)])
+
+        self.assertGreater(fake.peak_concurrency, 1)
+        self.assertLessEqual(fake.peak_concurrency, 3)
+
+    def test_retries_rate_limited_batches_with_backoff(self):
+        fake = RateLimitedEmbedding(size=4, failures=2)
+        sleeps = []
+        scheduler = EmbeddingScheduler(
+            fake, batch_size=10, requests_per_second=0, backoff_base=1.0, sleep=sleeps.append
+        )
+
+        with patch("chat.providers.embedding_scheduler.random.uniform", side_effect=lambda low, high: high):
+            vectors = scheduler.embed(["a", "b"])
+
+        self.assertEqual(len(vectors), 2)
+        self.assertEqual(sleeps, [1.0, 2.0])
+        self.assertEqual(scheduler.stats()["retries"], 2)
+
+    def test_gives_up_after_max_retries(self):
+        fake = RateLimitedEmbedding(size=4, failures=5)
+        scheduler = EmbeddingScheduler(fake, requests_per_second=0, max_retries=1, sleep=lambda _: None)
+
+        with self.assertRaises(RuntimeError):
+            scheduler.embed(["a"])
+
+    def test_does_not_retry_other_errors(self):
+        self.assertFalse(is_rate_limit_error(ValueError("bad input")))
+        self.assertTrue(is_rate_limit_error(RuntimeError("429 Too Many Requests")))
+
+    def test_reports_progress(self):
+        progress = []
+        scheduler = EmbeddingScheduler(
+            RateLimitedEmbedding(size=4), batch_size=2, concurrency=1, requests_per_second=0
+        )
+
+        scheduler.embed(["a", "b", "c"], progress_callback=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual(progress, [(2, 3), (3, 3)])
+
+    def test_scheduled_embeddings_delegates_queries(self):
+        fake = DeterministicFakeEmbedding(size=4)
+        embeddings = ScheduledEmbeddings(EmbeddingScheduler(fake, requests_per_second=0))
+
+        self.assertEqual(embeddings.embed_query("galaxy"), fake.embed_query("galaxy"))
+
+
+class FakeEmbeddingProviderTestCase(SimpleTestCase):
+    @patch.dict("os.environ", {"EMBEDDING_PROVIDER": "fake", "FAKE_EMBEDDING_SIZE": "16", "EMBEDDING_CACHE_ENABLED": "false"})
+    def test_fake_provider_is_deterministic_and_offline(self):
+        manager = ProviderManager()
+
+        model = manager.get_embedding_model()
+
+        self.assertIsInstance(model, DeterministicFakeEmbedding)
+        self.assertEqual(len(model.embed_query("galaxy")), 16)
+        self.assertEqual(model.embed_query("galaxy"), model.embed_query("galaxy"))
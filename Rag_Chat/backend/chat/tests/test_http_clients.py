@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from langchain_core.messages import HumanMessage
+
+from ..management.commands.benchmark_http_clients import MockChatServer
+from ..providers.http_clients import HttpClientConfig, HttpClientPool
+from ..providers.manager import ProviderManager
+
+
+class HttpClientPoolTestCase(SimpleTestCase):
+    """Test case for shared provider HTTP clients"""
+
+    def test_one_client_per_base_url(self):
+        pool = HttpClientPool(HttpClientConfig())
+
+        self.assertIs(pool.client("https://qwen.example/v1"), pool.client("https://qwen.example/v1/"))
+        self.assertIsNot(pool.client("https://qwen.example/v1"), pool.client("https://other.example/v1"))
+        self.assertIs(pool.async_client("https://qwen.example/v1"), pool.async_client("https://qwen.example/v1"))
+        pool.close()
+
+    def test_async_client_works_across_event_loops(self):
+        """Each event loop gets its own connection pool behind the shared client"""
+        pool = HttpClientPool(HttpClientConfig())
+        with MockChatServer() as server:
+            client = pool.async_client(server.base_url)
+
+            async def call():
+                response = await client.post(f"{server.base_url}/chat/completions", json={"model": "m"})
+                return response.status_code
+
+            self.assertEqual([asyncio.run(call()) for _ in range(2)], [200, 200])
+            pool.close()
+
+    def test_close_closes_async_pools_on_their_loops(self):
+        pool = HttpClientPool(HttpClientConfig())
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        self.addCleanup(loop.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(loop.call_soon_threadsafe, loop.stop)
+        with MockChatServer() as server:
+            client = pool.async_client(server.base_url)
+            asyncio.run_coroutine_threadsafe(
+                client.post(f"{server.base_url}/chat/completions", json={"model": "m"}), loop
+            ).result()
+            transport = pool._async_transports[pool._key(server.base_url)]
+            loop_transport = transport._transports[loop]
+            self.assertEqual(transport.loop_count(), 1)
+
+            pool.close()
+            asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), loop).result()
+
+        self.assertEqual(transport.loop_count(), 0)
+        self.assertEqual(loop_transport._pool.connections, [])
+        with self.assertRaises(RuntimeError):
+            asyncio.run_coroutine_threadsafe(
+                client.post(f"{server.base_url}/chat/completions", json={}), loop
+            ).result()
+
+    def test_close_later_waits_for_the_delay(self):
+        pool = HttpClientPool(HttpClientConfig())
+        client = pool.client("https://qwen.example/v1")
+
+        timer = pool.close_later(0.05)
+        self.assertFalse(client.is_closed)
+        timer.join()
+
+        self.assertTrue(client.is_closed)
+
+    @patch.dict('os.environ', {
+        "HTTP_MAX_CONNECTIONS": "8",
+        "HTTP_MAX_KEEPALIVE_CONNECTIONS": "4",
+        "HTTP_CONNECT_TIMEOUT": "2",
+        "HTTP_READ_TIMEOUT": "20",
+    })
+    def test_config_from_env(self):
+        config = HttpClientConfig.from_env()
+
+        self.assertEqual(config.limits.max_connections, 8)
+        self.assertEqual(config.limits.max_keepalive_connections, 4)
+        self.assertEqual(config.timeout.connect, 2.0)
+        self.assertEqual(config.timeout.read, 20.0)
+
+    @patch.dict('os.environ', {"HTTP2": "true"})
+    @patch('chat.providers.http_clients._h2_available', return_value=False)
+    def test_http2_without_h2_falls_back(self, mock_h2):
+        self.assertFalse(HttpClientConfig.from_env().http2)
+
+
+class ReloadDrainTestCase(SimpleTestCase):
+    """Test case for keeping the previous HTTP clients open across a reload"""
+
+    @patch.dict('os.environ', {"HTTP_CLIENT_DRAIN_SECONDS": "30"})
+    def test_reload_drains_old_clients(self):
+        manager = ProviderManager()
+        old = manager.http_clients
+        client = old.client("https://qwen.example/v1")
+
+        with patch.object(HttpClientPool, "close_later") as close_later:
+            manager.reload_configuration()
+
+        self.assertIsNot(manager.http_clients, old)
+        self.assertFalse(client.is_closed)
+        close_later.assert_called_once_with(30.0)
+
+
+class SharedQwenClientTestCase(SimpleTestCase):
+    """Test case for connection reuse across reasoning and generation models"""
+
+    def test_purposes_reuse_connections(self):
+        with MockChatServer() as server, patch.dict('os.environ', {
+            "QWEN_API_KEY": "test",
+            "QWEN_API_BASE": server.base_url,
+            "HEDGE_ALTERNATES": "",
+        }):
+            manager = ProviderManager()
+            reasoning = manager._create_qwen_chat_model("REASONING")
+            generation = manager._create_qwen_chat_model("GENERATION")
+
+            for model in (reasoning, generation) * 3:
+                self.assertEqual(model.invoke([HumanMessage(content="질문")]).content, "ok")
+
+        self.assertIs(reasoning.http_client, generation.http_client)
+        self.assertEqual(server.connections, 1)
@@ -0,0 +1,106 @@
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+from langchain.schema import Document
+
+from ..pipeline.base import ModuleContext
+from ..pipeline.modules import RetrieveModule
+from ..providers.lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+from ..utils import RAGUtils
+
+
+CATALOGUE = [
+    Document(page_content="Model: Galaxy S25\nColor: Icyblue\nStorage: 128GB", metadata={"image_path": "s25.png"}),
+    Document(page_content="Model: Galaxy S25 Plus\nColor: Navy\nStorage: 256GB", metadata={}),
+    Document(page_content="Model: Galaxy S25 Ultra\nColor: Phantom Black\nStorage: 512GB", metadata={}),
+    Document(page_content="Model: Galaxy S25 Ultra\nColor: 실버\nStorage: 256GB", metadata={}),
+]
+
+
+class TokenizeTestCase(SimpleTestCase):
+    def test_mixed_tokens_are_split(self):
+        self.assertEqual(tokenize("256GB S25"), ["256gb", "256", "gb", "s25", "s", "25"])
+
+    def test_hangul_words_add_bigrams(self):
+        self.assertIn("갤럭", tokenize("갤럭시는"))
+        self.assertIn("럭시", tokenize("갤럭시"))
+
+
+class BM25IndexTestCase(SimpleTestCase):
+    def setUp(self):
+        self.index = BM25Index.from_documents(CATALOGUE)
+
+    def test_exact_tokens_rank_first(self):
+        self.assertEqual(self.index.search("Phantom Black", k=1)[0][0], CATALOGUE[2])
+        top_two = [document for document, _ in self.index.search("256 GB", k=2)]
+        self.assertCountEqual(top_two, [CATALOGUE[1], CATALOGUE[3]])
+
+    def test_unknown_terms_return_nothing(self):
+        self.assertEqual(self.index.search("pixel"), [])
+
+    def test_save_and_load_round_trip(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+
+        self.index.save(directory)
+        loaded = BM25Index.load(directory)
+
+        self.assertEqual(loaded.search("실버 256GB", k=4), self.index.search("실버 256GB", k=4))
+        self.assertEqual(loaded.documents[0].metadata, {"image_path": "s25.png"})
+
+    def test_load_missing_index(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+
+        self.assertIsNone(BM25Index.load(directory))
+
+
+class ReciprocalRankFusionTestCase(SimpleTestCase):
+    def test_documents_in_both_rankings_win(self):
+        dense = [CATALOGUE[0], CATALOGUE[1], CATALOGUE[2]]
+        lexical = [CATALOGUE[2], CATALOGUE[3]]
+
+        fused = reciprocal_rank_fusion([dense, lexical], k=60, limit=2)
+
+        self.assertEqual([document for document, _ in fused], [CATALOGUE[2], CATALOGUE[0]])
+        self.assertAlmostEqual(fused[0][1], 1 / 63 + 1 / 61)
+
+
+class HybridRagContextTestCase(SimpleTestCase):
+    def setUp(self):
+        self.vector_store = MagicMock()
+        self.vector_store.similarity_search.return_value = [CATALOGUE[0], CATALOGUE[2]]
+
+    @patch("chat.utils.provider_manager")
+    @patch("chat.utils.RAGUtils.get_vector_store")
+    def test_fuses_dense_and_lexical_results(self, mock_get_vector_store, mock_provider_manager):
+        mock_get_vector_store.return_value = self.vector_store
+        mock_provider_manager.get_lexical_index.return_value = BM25Index.from_documents(CATALOGUE)
+
+        result = RAGUtils.get_hybrid_rag_context("Phantom Black", k=2, fetch_k=5)
+
+        self.vector_store.similarity_search.assert_called_once_with("Phantom Black", k=5)
+        # Second by vector distance, first lexically: fusion moves it to the top
+        self.assertEqual(result["context"], f"{CATALOGUE[2].page_content}\n{CATALOGUE[0].page_content}")
+        self.assertEqual(result["image_paths"], ["s25.png"])
+
+    @patch("chat.utils.provider_manager")
+    @patch("chat.utils.RAGUtils.get_vector_store")
+    def test_falls_back_to_dense_without_lexical_index(self, mock_get_vector_store, mock_provider_manager):
+        mock_get_vector_store.return_value = self.vector_store
+        mock_provider_manager.get_lexical_index.return_value = None
+
+        result = RAGUtils.get_hybrid_rag_context("Navy", k=1)
+
+        self.assertEqual(result["context"], CATALOGUE[0].page_content)
+
+    @patch("chat.pipeline.modules.RAGUtils.get_hybrid_rag_context")
+    def test_retrieve_module_hybrid_mode(self, mock_hybrid):
+        mock_hybrid.return_value = {"context": "ctx", "image_paths": []}
+
+        context = RetrieveModule(mode="hybrid", k=2).run(ModuleContext(question="q", session_id="s", user_id="u"))
+
+        mock_hybrid.assert_called_once_with("q", k=2, filters=None)
+        self.assertEqual(context.context_text, "ctx")
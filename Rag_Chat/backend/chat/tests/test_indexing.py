@@ -0,0 +1,240 @@
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, override_settings
+from langchain.schema import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+from ..indexing import IncrementalIndexer, chunk_fingerprint, keyed_documents, sync_index_version
+from ..providers.embedding_scheduler import EmbeddingScheduler
+from ..providers.index_versions import IndexVersionStore
+from ..providers.lexical_index import BM25Index
+
+
+class ChunkFingerprintTestCase(SimpleTestCase):
+    def test_ignores_volatile_metadata(self):
+        first = Document(page_content="Galaxy S25", metadata={"source": "csv", "build_id": "a", "chunk_id": "1"})
+        second = Document(page_content="Galaxy S25", metadata={"source": "csv", "build_id": "b", "chunk_id": "2"})
+
+        self.assertEqual(chunk_fingerprint(first), chunk_fingerprint(second))
+
+    def test_changes_with_content_or_stable_metadata(self):
+        base = Document(page_content="Galaxy S25", metadata={"source": "csv"})
+
+        self.assertNotEqual(chunk_fingerprint(base), chunk_fingerprint(Document(page_content="Galaxy S25+", metadata={"source": "csv"})))
+        self.assertNotEqual(chunk_fingerprint(base), chunk_fingerprint(Document(page_content="Galaxy S25", metadata={"source": "excel"})))
+
+
+class InMemoryVectorStore:
+    """Minimal stand-in for the Chroma surface used by the indexer"""
+
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.vectors = {}
+        self.documents = {}
+        self.metadatas = {}
+        self._collection = MagicMock()
+        self._collection.get.side_effect = self._get
+        self._collection.count.side_effect = lambda: len(self.vectors)
+        self._collection.upsert.side_effect = self._upsert
+        self._collection.update.side_effect = self._update
+
+    def _get(self, ids=None, where=None, include=None):
+        selected = [
+            chunk_id for chunk_id in self.vectors
+            if (ids is None or chunk_id in ids)
+            and all(self.metadatas[chunk_id].get(key) == value for key, value in (where or {}).items())
+        ]
+        return {
+            "ids": selected,
+            "documents": [self.documents[chunk_id] for chunk_id in selected],
+            "metadatas": [self.metadatas[chunk_id] for chunk_id in selected],
+        }
+
+    def _upsert(self, ids, embeddings, documents, metadatas):
+        self.vectors.update(zip(ids, embeddings))
+        self.documents.update(zip(ids, documents))
+        self.metadatas.update((chunk_id, metadata or {}) for chunk_id, metadata in zip(ids, metadatas))
+
+    def _update(self, ids, metadatas):
+        self.metadatas.update(zip(ids, metadatas))
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            self.vectors.pop(chunk_id, None)
+            self.documents.pop(chunk_id, None)
+            self.metadatas.pop(chunk_id, None)
+
+
+class IncrementalIndexerTestCase(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.embeddings = MagicMock(wraps=DeterministicFakeEmbedding(size=8))
+        self.vector_store = InMemoryVectorStore(self.embeddings)
+        self.indexer = IncrementalIndexer(
+            vector_store=self.vector_store,
+            persist_directory=self.directory,
+            scheduler=EmbeddingScheduler(self.embeddings, requests_per_second=0),
+        )
+
+    def _docs(self, *contents):
+        return [Document(page_content=content, metadata={"source": "csv"}) for content in contents]
+
+    def _embedded_texts(self):
+        return [text for call in self.embeddings.embed_documents.call_args_list for text in call.args[0]]
+
+    def test_first_sync_embeds_everything(self):
+        result = self.indexer.sync(self._docs("silver", "black", "blue"))
+
+        self.assertEqual((result.added, result.deleted, result.unchanged), (3, 0, 0))
+        self.assertEqual(self.vector_store._collection.count(), 3)
+
+    def test_resync_only_embeds_changes(self):
+        self.indexer.sync(self._docs("silver", "black", "blue"))
+        self.embeddings.embed_documents.reset_mock()
+
+        result = self.indexer.sync(self._docs("silver", "black", "mint"))
+
+        self.assertEqual((result.added, result.deleted, result.unchanged), (1, 1, 2))
+        self.assertEqual(self._embedded_texts(), ["mint"])
+        self.assertEqual(self.vector_store._collection.count(), 3)
+
+    def test_unchanged_sync_is_a_no_op(self):
+        self.indexer.sync(self._docs("silver", "black"))
+        self.embeddings.embed_documents.reset_mock()
+
+        result = self.indexer.sync(self._docs("silver", "black"))
+
+        self.assertFalse(result.changed)
+        self.embeddings.embed_documents.assert_not_called()
+
+    def test_writes_manifest(self):
+        docs = self._docs("silver", "black")
+        self.indexer.sync(docs)
+
+        with open(os.path.join(self.directory, "index_manifest.json"), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+        self.assertEqual(set(manifest["chunks"]), {chunk_fingerprint(doc) for doc in docs})
+        self.assertEqual(manifest["chunk_count"], 2)
+
+    def test_writes_lexical_index_for_current_chunks(self):
+        self.indexer.sync(self._docs("silver", "black"))
+        self.indexer.sync(self._docs("silver", "mint"))
+
+        lexical_index = BM25Index.load(self.directory)
+        self.assertEqual(sorted(document.page_content for document in lexical_index.documents), ["mint", "silver"])
+
+
+    def test_source_sync_leaves_other_sources_in_place(self):
+        """An incremental CSV sync never deletes Excel chunks"""
+        excel = [Document(page_content=text, metadata={"sheet": "Sheet1"}) for text in ("excel silver", "excel black")]
+        self.indexer.sync(excel, source="excel")
+        self.indexer.sync(self._docs("silver", "black"), source="csv")
+
+        result = self.indexer.sync(self._docs("silver", "mint"), source="csv")
+
+        self.assertEqual((result.added, result.deleted, result.unchanged, result.total), (1, 1, 1, 4))
+        self.assertEqual(
+            sorted(self.vector_store.documents.values()),
+            ["excel black", "excel silver", "mint", "silver"],
+        )
+        lexical_index = BM25Index.load(self.directory)
+        self.assertEqual(len(lexical_index.documents), 4)
+
+    def test_source_sync_stamps_legacy_chunks_without_reembedding(self):
+        """Chunks indexed before source stamping are adopted, not re-embedded"""
+        self.indexer.sync(self._docs("silver", "black"))
+        self.embeddings.embed_documents.reset_mock()
+
+        result = self.indexer.sync(self._docs("silver", "black"), source="csv")
+
+        self.assertEqual((result.added, result.deleted, result.unchanged), (0, 0, 2))
+        self.embeddings.embed_documents.assert_not_called()
+        self.assertTrue(all(metadata["ingest_source"] == "csv" for metadata in self.vector_store.metadatas.values()))
+
+    def test_source_sync_after_full_build_adds_nothing(self):
+        """Chunks written by a full build are recognised by the next source sync"""
+        built = keyed_documents(self._docs("silver", "black"), source="csv")
+        self.vector_store._upsert(
+            list(built),
+            self.embeddings.embed_documents([doc.page_content for doc in built.values()]),
+            [doc.page_content for doc in built.values()],
+            [doc.metadata for doc in built.values()],
+        )
+        self.embeddings.embed_documents.reset_mock()
+
+        result = self.indexer.sync(self._docs("silver", "black"), source="csv")
+
+        self.assertFalse(result.changed)
+        self.assertEqual(result.total, 2)
+        self.embeddings.embed_documents.assert_not_called()
+
+    def test_full_source_sync_reembeds_only_that_source(self):
+        """A full Excel rebuild replaces the Excel chunks and keeps the CSV ones"""
+        self.indexer.sync(self._docs("silver", "black"), source="csv")
+        excel = [Document(page_content=text, metadata={"sheet": "Sheet1"}) for text in ("excel silver", "excel black")]
+        self.indexer.sync(excel, source="excel")
+        self.embeddings.embed_documents.reset_mock()
+
+        excel = [Document(page_content=text, metadata={"sheet": "Sheet1"}) for text in ("excel silver", "excel mint")]
+        result = self.indexer.sync(excel, source="excel", full=True)
+
+        self.assertEqual((result.added, result.deleted, result.unchanged, result.total), (2, 1, 0, 4))
+        self.assertEqual(sorted(self._embedded_texts()), ["excel mint", "excel silver"])
+        self.assertEqual(
+            sorted(self.vector_store.documents.values()),
+            ["black", "excel mint", "excel silver", "silver"],
+        )
+
+
+class SyncIndexVersionTestCase(SimpleTestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(VECTOR_STORE_PATH=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.embeddings = DeterministicFakeEmbedding(size=8)
+        self.stores = {}
+
+        def open_store(path):
+            store = self.stores.setdefault(path, InMemoryVectorStore(self.embeddings))
+            store.similarity_search = lambda query, k: list(store.vectors)[:k]
+            return store
+
+        patches = [
+            patch("chat.indexing.provider_manager.open_vector_store", side_effect=open_store),
+            patch("chat.indexing.provider_manager.get_embedding_scheduler",
+                  return_value=EmbeddingScheduler(self.embeddings, requests_per_second=0)),
+            patch("chat.indexing.provider_manager.get_vector_store", side_effect=lambda: open_store(
+                IndexVersionStore(self.root).active_path())),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_changes_are_built_in_a_new_version_then_activated(self):
+        docs = [Document(page_content="silver", metadata={"source": "csv"})]
+
+        result, store = sync_index_version(docs)
+
+        versions = IndexVersionStore(self.root)
+        self.assertEqual(result.added, 1)
+        self.assertIs(store, self.stores[versions.active_path()])
+
+    def test_no_changes_discard_the_copy(self):
+        docs = [Document(page_content="silver", metadata={"source": "csv"})]
+        sync_index_version(docs)
+        versions = IndexVersionStore(self.root)
+        active = versions.active_version()
+        # The in-memory fake does not persist, so seed the copy like copytree would
+        with patch.object(IncrementalIndexer, "_indexed_ids", return_value={chunk_fingerprint(docs[0])}):
+            result, _ = sync_index_version(docs)
+
+        self.assertFalse(result.changed)
+        self.assertEqual(versions.active_version(), active)
+        self.assertEqual(versions.list_versions(), [active])
@@ -0,0 +1,132 @@
+import threading
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+from langchain.schema import Document
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from .. import ingestion
+
+
+class IngestionJobTestCase(TestCase):
+    """Test case for ingestion job state, progress and cancellation"""
+
+    def setUp(self):
+        self.documents = [Document(page_content=f"Model: S25 {i}", metadata={"sheet": "Sheet1"}) for i in range(3)]
+        patcher = patch("chat.ingestion.load_source", return_value=self.documents)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @patch("chat.ingestion.RAGUtils.record_vector_build", return_value=None)
+    def test_run_job_records_progress(self, mock_build):
+        job = ingestion.create_job("excel")
+
+        result = ingestion.run_job(job["job_id"])
+
+        self.assertEqual(result["status"], ingestion.COMPLETED)
+        self.assertEqual(result["rows_parsed"], 3)
+        self.assertEqual(result["chunks_total"], 3)
+        self.assertEqual(result["chunks_embedded"], 3)
+        self.assertIsNone(result["eta_seconds"])
+        self.assertFalse(mock_build.call_args.kwargs["incremental"])
+        self.assertEqual(mock_build.call_args.kwargs["source"], "excel")
+
+    def test_cancel_stops_running_job_at_next_progress_check(self):
+        job = ingestion.create_job("csv")
+
+        def build(documents, incremental, progress_callback, source):
+            progress_callback(1, 3)
+            ingestion.request_cancel(job["job_id"])
+            progress_callback(3, 3)
+
+        with patch("chat.ingestion.RAGUtils.record_vector_build", side_effect=build):
+            result = ingestion.run_job(job["job_id"])
+
+        self.assertEqual(result["status"], ingestion.CANCELLED)
+        self.assertTrue(result["cancel_requested"])
+
+    def test_progress_from_pool_threads_goes_through_call_in_worker(self):
+        """Embedding pool threads write progress with their DB connections cleaned up"""
+        job = ingestion.create_job("csv")
+
+        def build(documents, incremental, progress_callback, source):
+            worker = threading.Thread(target=progress_callback, args=(1, 3))
+            worker.start()
+            worker.join()
+            progress_callback(3, 3)
+
+        with patch("chat.ingestion.RAGUtils.record_vector_build", side_effect=build), \
+                patch("chat.ingestion.call_in_worker") as mock_call_in_worker:
+            result = ingestion.run_job(job["job_id"])
+
+        self.assertEqual(result["status"], ingestion.COMPLETED)
+        mock_call_in_worker.assert_called_once()
+        self.assertEqual(mock_call_in_worker.call_args.args[1:], (1, 3))
+        self.assertEqual(result["chunks_embedded"], 3)
+
+    @patch("chat.ingestion.RAGUtils.record_vector_build")
+    def test_cancelled_pending_job_never_runs(self, mock_build):
+        job = ingestion.create_job("csv")
+        ingestion.request_cancel(job["job_id"])
+
+        result = ingestion.run_job(job["job_id"])
+
+        self.assertEqual(result["status"], ingestion.CANCELLED)
+        mock_build.assert_not_called()
+
+    @patch("chat.ingestion.RAGUtils.record_vector_build", side_effect=RuntimeError("quota exceeded"))
+    def test_failure_is_recorded(self, mock_build):
+        job = ingestion.create_job("csv")
+
+        result = ingestion.run_job(job["job_id"])
+
+        self.assertEqual(result["status"], ingestion.FAILED)
+        self.assertEqual(result["error"], "quota exceeded")
+
+    def test_eta_derived_from_throughput(self):
+        job = ingestion.create_job("csv")
+        ingestion.update_job(
+            job["job_id"], status=ingestion.RUNNING, chunks_embedded=50, chunks_to_embed=150, embedding_started=100.0
+        )
+
+        with patch("chat.ingestion.time.time", return_value=110.0):
+            result = ingestion.get_job(job["job_id"])
+
+        self.assertEqual(result["throughput_chunks_per_s"], 5.0)
+        self.assertEqual(result["eta_seconds"], 20.0)
+
+
+class IngestionAPITestCase(TestCase):
+    """Test case for enqueueing ingestion and the job status endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    @patch("chat.tasks.run_ingestion_job.delay")
+    def test_rag_mode_enqueues_job(self, mock_delay):
+        response = self.client.post(reverse("chat-rag"), {"mode": 2, "incremental": True}, format="json")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_id = response.data["job_id"]
+        mock_delay.assert_called_once_with(job_id)
+        self.assertEqual(response.data["status_url"], reverse("ingest-job", kwargs={"job_id": job_id}))
+        self.assertTrue(ingestion.get_job(job_id)["incremental"])
+
+    def test_status_and_cancel_endpoints(self):
+        job = ingestion.create_job("excel")
+        url = reverse("ingest-job", kwargs={"job_id": job["job_id"]})
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], ingestion.PENDING)
+
+        response = self.client.delete(url)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data["status"], ingestion.CANCELLED)
+
+    def test_unknown_job_returns_404(self):
+        response = self.client.get(reverse("ingest-job", kwargs={"job_id": "missing"}))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,607 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch, MagicMock
+
+from django.test import SimpleTestCase
+
+from langchain_community.chat_message_histories import ChatMessageHistory
+
+from ..pipeline import ModuleContext, ModuleError, PipelineModule, PipelineRunner, server_timing_header
+from ..pipeline.modules import ReasonAndAnswerModule, SpeculativeAnswerModule, is_complex_question, split_answer
+from ..pipeline.chains import ChainRegistry
+from ..pipeline.tracing import MetricsHook
+from ..providers import provider_manager
+
+
+class RecordingModule(PipelineModule):
+    """Fake module that records execution order and optional rendezvous"""
+
+    def __init__(self, name, log, provides=(), barrier=None, fail=False):
+        self.name = name
+        self.log = log
+        self.provides = tuple(provides)
+        self.barrier = barrier
+        self.fail = fail
+
+    def run(self, context):
+        if self.barrier is not None:
+            # Both parallel steps must reach the barrier for either to finish
+            self.barrier.wait(timeout=2)
+        if self.fail:
+            raise ModuleError(f"{self.name} failed")
+        self.log.append(self.name)
+        for field_name in self.provides:
+            context.extra[field_name] = self.name
+        return context
+
+
+class StreamingModule(RecordingModule):
+    """Fake final step that streams its answer token by token"""
+
+    def stream(self, context):
+        self.log.append(self.name)
+        for token in ("실버 ", "모델"):
+            yield token
+        context.response = "실버 모델"
+
+
+class ThreadRecordingHistory(ChatMessageHistory):
+    """In-memory history that records which threads read and write it"""
+
+    def __init__(self):
+        super().__init__()
+        object.__setattr__(self, "threads", [])
+
+    def __getattribute__(self, name):
+        if name == "messages":
+            object.__getattribute__(self, "threads").append(threading.get_ident())
+        return super().__getattribute__(name)
+
+    def add_message(self, message):
+        self.threads.append(threading.get_ident())
+        super().add_message(message)
+
+
+def make_context():
+    return ModuleContext(question="질문", session_id="s1", user_id="u1")
+
+
+class PipelineRunnerTestCase(SimpleTestCase):
+    """Test case for linear and dependency-driven pipeline execution"""
+
+    def _registry(self, modules):
+        return {name: (lambda module=module: module) for name, module in modules.items()}
+
+    def test_linear_order_by_default(self):
+        """Without ``requires`` steps execute strictly in sequence"""
+        log = []
+        modules = {name: RecordingModule(name, log) for name in ("a", "b", "c")}
+        runner = PipelineRunner([{"type": "a"}, {"type": "b"}, {"type": "c"}], self._registry(modules))
+
+        runner.run(make_context())
+
+        self.assertEqual(log, ["a", "b", "c"])
+
+    def test_independent_steps_run_concurrently(self):
+        """Steps that share no dependency overlap on the thread pool"""
+        log = []
+        barrier = threading.Barrier(2)
+        modules = {
+            "history": RecordingModule("history", log, provides=["history"], barrier=barrier),
+            "retrieve": RecordingModule("retrieve", log, provides=["context_text"], barrier=barrier),
+            "generation": RecordingModule("generation", log, provides=["response"]),
+        }
+        runner = PipelineRunner(
+            [
+                {"type": "history", "requires": []},
+                {"type": "retrieve", "requires": []},
+                {"type": "generation", "requires": ["history", "context_text"]},
+            ],
+            self._registry(modules),
+        )
+
+        runner.run(make_context())
+
+        self.assertEqual(set(log[:2]), {"history", "retrieve"})
+        self.assertEqual(log[2], "generation")
+
+    def test_async_dag_runs_concurrently(self):
+        """The async runner schedules independent steps as concurrent tasks"""
+        log = []
+        barrier = threading.Barrier(2)
+        modules = {
+            "history": RecordingModule("history", log, provides=["history"], barrier=barrier),
+            "retrieve": RecordingModule("retrieve", log, provides=["context_text"], barrier=barrier),
+            "generation": RecordingModule("generation", log, provides=["response"]),
+        }
+        runner = PipelineRunner(
+            [
+                {"type": "history", "requires": []},
+                {"type": "retrieve", "requires": []},
+                {"type": "generation", "requires": ["history", "context_text"]},
+            ],
+            self._registry(modules),
+        )
+
+        asyncio.run(runner.arun(make_context()))
+
+        self.assertEqual(log[-1], "generation")
+        self.assertEqual(len(log), 3)
+
+    def test_steps_providing_honours_config_overrides(self):
+        """Steps are matched by their module's provides unless the config overrides it"""
+        log = []
+        modules = {
+            "answer": RecordingModule("answer", log, provides=["reasoning", "response"]),
+            "summary": RecordingModule("summary", log, provides=["response"]),
+        }
+        runner = PipelineRunner(
+            [{"type": "answer"}, {"type": "summary", "provides": ["reasoning"]}],
+            self._registry(modules),
+        )
+
+        self.assertEqual(runner.steps_providing("reasoning"), {"answer", "summary"})
+        self.assertEqual(runner.steps_providing("response"), {"answer"})
+
+    def test_failure_propagates(self):
+        """A failing step raises and stops dependent steps"""
+        log = []
+        modules = {
+            "retrieve": RecordingModule("retrieve", log, provides=["context_text"], fail=True),
+            "generation": RecordingModule("generation", log, provides=["response"]),
+        }
+        runner = PipelineRunner(
+            [
+                {"type": "retrieve", "requires": []},
+                {"type": "generation", "requires": ["context_text"]},
+            ],
+            self._registry(modules),
+        )
+
+        with self.assertRaises(ModuleError):
+            runner.run(make_context())
+        self.assertEqual(log, [])
+
+    def _halting_registry(self, log):
+        class HaltingModule(RecordingModule):
+            def run(self, context):
+                context = super().run(context)
+                context.halted = True
+                return context
+
+        return self._registry({
+            "router": HaltingModule("router", log, provides=["response"]),
+            "retrieve": RecordingModule("retrieve", log, provides=["context_text"]),
+            "generation": RecordingModule("generation", log, provides=["response"]),
+        })
+
+    def test_halted_context_skips_remaining_steps(self):
+        """A module that answers the question stops the linear pipeline"""
+        log = []
+        runner = PipelineRunner(
+            [{"type": "router"}, {"type": "retrieve"}, {"type": "generation"}],
+            self._halting_registry(log),
+        )
+
+        self.assertTrue(runner.run(make_context()).halted)
+        self.assertEqual(log, ["router"])
+
+        log.clear()
+        asyncio.run(runner.arun(make_context()))
+        self.assertEqual(log, ["router"])
+
+    def test_halted_context_stops_dag_scheduling(self):
+        """Steps waiting on a halting step are never started"""
+        log = []
+        runner = PipelineRunner(
+            [
+                {"type": "router", "requires": []},
+                {"type": "retrieve", "requires": ["response"]},
+                {"type": "generation", "requires": ["context_text"]},
+            ],
+            self._halting_registry(log),
+        )
+
+        runner.run(make_context())
+        self.assertEqual(log, ["router"])
+
+        log.clear()
+        asyncio.run(runner.arun(make_context()))
+        self.assertEqual(log, ["router"])
+
+
+    @patch('chat.pipeline.base.close_old_connections')
+    def test_pool_threads_close_old_db_connections(self, mock_close):
+        """Steps run on worker threads close stale DB connections before and after"""
+        log = []
+        modules = {name: RecordingModule(name, log) for name in ("a", "b")}
+        runner = PipelineRunner(
+            [{"type": "a", "requires": []}, {"type": "b", "requires": []}],
+            self._registry(modules),
+            hooks=[],
+        )
+
+        runner.run(make_context())
+        self.assertEqual(mock_close.call_count, 4)
+
+        mock_close.reset_mock()
+        asyncio.run(modules["a"].arun(make_context()))
+        self.assertEqual(mock_close.call_count, 2)
+
+    def test_stream_yields_stage_events_and_tokens(self):
+        """The last step streams tokens; earlier steps run through execute()"""
+        log = []
+        modules = {
+            "retrieve": RecordingModule("retrieve", log),
+            "generation": StreamingModule("generation", log),
+        }
+        runner = PipelineRunner([{"type": "retrieve"}, {"type": "generation"}], self._registry(modules), hooks=[])
+        context = make_context()
+
+        events = list(runner.stream(context))
+
+        self.assertEqual(events, [
+            ("start", "retrieve"), ("end", "retrieve"),
+            ("start", "generation"), ("token", "실버 "), ("token", "모델"), ("end", "generation"),
+        ])
+        self.assertEqual([record["module"] for record in context.extra["timings"]], ["retrieve", "generation"])
+        self.assertEqual(context.response, "실버 모델")
+
+    def test_stream_stops_at_halting_step(self):
+        """A halting step's response is streamed as one token"""
+        log = []
+        registry = self._halting_registry(log)
+        runner = PipelineRunner([{"type": "router"}, {"type": "retrieve"}], registry, hooks=[])
+        context = make_context()
+        context.response = "카탈로그 답변"
+
+        events = list(runner.stream(context))
+
+        self.assertEqual(events, [("start", "router"), ("end", "router"), ("token", "카탈로그 답변")])
+        self.assertEqual(log, ["router"])
+
+
+class PipelineTracingTestCase(SimpleTestCase):
+    """Test case for per-stage timing records and hooks"""
+
+    def test_records_timings_and_payload_sizes(self):
+        """Each stage appends a timing record to context.extra"""
+        log = []
+        metrics = MetricsHook()
+        module = RecordingModule("retrieve", log)
+        runner = PipelineRunner([{"type": "retrieve"}], {"retrieve": lambda: module}, hooks=[metrics])
+        context = make_context()
+        context.context_text = "Galaxy S25"
+
+        runner.run(context)
+
+        timings = context.extra["timings"]
+        self.assertEqual(len(timings), 1)
+        self.assertEqual(timings[0]["module"], "retrieve")
+        self.assertEqual(timings[0]["context_chars"], len("Galaxy S25"))
+        self.assertGreaterEqual(timings[0]["duration_ms"], 0)
+        self.assertIn('pipeline_stage_duration_ms_count{module="retrieve"} 1', metrics.render_prometheus())
+        self.assertIn("retrieve;dur=", server_timing_header(context))
+
+    def test_failed_stage_is_recorded(self):
+        """Exceptions are recorded before they propagate"""
+        metrics = MetricsHook()
+        module = RecordingModule("reasoning", [], fail=True)
+        runner = PipelineRunner([{"type": "reasoning"}], {"reasoning": lambda: module}, hooks=[metrics])
+        context = make_context()
+
+        with self.assertRaises(ModuleError):
+            runner.run(context)
+
+        self.assertEqual(context.extra["timings"][0]["error"], "reasoning failed")
+        self.assertEqual(metrics.errors["reasoning"], 1)
+
+
+class ChainRegistryTestCase(SimpleTestCase):
+    """Test case for compiled chain reuse across requests"""
+
+    def setUp(self):
+        self.registry = ChainRegistry()
+
+    def test_chain_is_built_once(self):
+        """The factory runs only on the first lookup of a key"""
+        factory = MagicMock(side_effect=lambda: object())
+
+        first = self.registry.get(("reasoning", "gemini", "REASONING"), factory)
+        second = self.registry.get(("reasoning", "gemini", "REASONING"), factory)
+
+        factory.assert_called_once()
+        self.assertIs(first, second)
+
+    @patch('chat.providers.manager.ProviderManager._load_configuration')
+    def test_provider_reload_invalidates_chains(self, mock_load):
+        """Reloading provider configuration discards compiled chains"""
+        factory = MagicMock(side_effect=lambda: object())
+        first = self.registry.get(("generation", "qwen", "GENERATION"), factory)
+
+        provider_manager.reload_configuration()
+        second = self.registry.get(("generation", "qwen", "GENERATION"), factory)
+
+        self.assertEqual(factory.call_count, 2)
+        self.assertIsNot(first, second)
+
+    def test_runner_reuses_module_instances(self):
+        """Configured modules are instantiated once per class and params"""
+        runner = PipelineRunner([{"type": "retrieve", "config": {}}])
+
+        first = runner._build_module({"type": "retrieve", "config": {}})
+        second = PipelineRunner([])._build_module({"type": "retrieve", "config": {}})
+
+        self.assertIs(first, second)
+
+
+class ReasonAndAnswerModuleTestCase(SimpleTestCase):
+    """Test case for the single-call evidence + answer module"""
+
+    OUTPUT = "근거:\n- S25는 실버 색상이 있다\n답변:\n네, 실버 색상이 있습니다."
+
+    def setUp(self):
+        self.chain = MagicMock()
+        self.chain.invoke.return_value = self.OUTPUT
+        self.chain.stream.return_value = iter(["근거:\n- S25는 실버", " 색상이 있다\n답", "변:\n네, 실버", " 색상이 있습니다."])
+        patcher = patch('chat.pipeline.modules.get_llm_chain', return_value=self.chain)
+        self.get_llm_chain = patcher.start()
+        self.addCleanup(patcher.stop)
+        catalogue = patch('chat.pipeline.modules.provider_manager.get_catalogue_index', return_value=None)
+        catalogue.start()
+        self.addCleanup(catalogue.stop)
+
+    def _context(self, question="S25 실버 색상 있나요?"):
+        return ModuleContext(
+            question=question, session_id="s1", user_id="u1",
+            context_text="Model: Galaxy S25", history=ChatMessageHistory(),
+        )
+
+    def test_split_answer(self):
+        """Evidence and answer are separated; unformatted output is the answer"""
+        self.assertEqual(split_answer(self.OUTPUT), ("- S25는 실버 색상이 있다", "네, 실버 색상이 있습니다."))
+        self.assertEqual(split_answer("그냥 답변"), ("", "그냥 답변"))
+
+    def test_complex_questions(self):
+        """Comparative, multi-product and long questions are complex"""
+        self.assertTrue(is_complex_question("S25와 S25 Ultra 카메라 비교해줘"))
+        self.assertTrue(is_complex_question("S24, S25 가격 알려줘"))
+        self.assertTrue(is_complex_question("가" * 200))
+        self.assertFalse(is_complex_question("S25 실버 색상 있나요?"))
+
+    def test_simple_question_uses_one_call(self):
+        """One model call fills reasoning and response; history keeps only the answer"""
+        context = self._context()
+
+        with patch('chat.pipeline.modules.ReasoningModule.run') as reasoning:
+            ReasonAndAnswerModule().run(context)
+
+        reasoning.assert_not_called()
+        self.chain.invoke.assert_called_once()
+        self.assertEqual(context.reasoning, "- S25는 실버 색상이 있다")
+        self.assertEqual(context.response, "네, 실버 색상이 있습니다.")
+        self.assertEqual(context.extra["answer_path"], "single_call")
+        self.assertEqual(context.history.messages[-1].content, "네, 실버 색상이 있습니다.")
+
+    def test_complex_question_falls_back_to_two_calls(self):
+        """Complex questions run the reasoning and generation modules"""
+        context = self._context("S25와 S25 Ultra 차이가 뭐야?")
+
+        with patch('chat.pipeline.modules.ReasoningModule.run', side_effect=lambda ctx: ctx) as reasoning, \
+                patch('chat.pipeline.modules.GenerationModule.run', side_effect=lambda ctx: ctx) as generation:
+            ReasonAndAnswerModule().run(context)
+
+        reasoning.assert_called_once()
+        generation.assert_called_once()
+        self.chain.invoke.assert_not_called()
+        self.assertEqual(context.extra["answer_path"], "two_call")
+
+    def test_stream_yields_only_the_answer(self):
+        """Streaming holds back the evidence, even when the marker is split"""
+        context = self._context()
+
+        tokens = list(ReasonAndAnswerModule().stream(context))
+
+        self.assertEqual("".join(tokens), "네, 실버 색상이 있습니다.")
+        self.assertEqual(context.reasoning, "- S25는 실버 색상이 있다")
+        self.assertEqual(context.response, "네, 실버 색상이 있습니다.")
+
+    def test_async_stream_yields_only_the_answer(self):
+        """astream applies the same evidence hold-back to async chunks"""
+        chunks = list(self.chain.stream.return_value)
+
+        async def astream(inputs):
+            for chunk in chunks:
+                yield chunk
+
+        self.chain.astream = MagicMock(side_effect=astream)
+        context = self._context()
+
+        async def collect():
+            return [token async for token in ReasonAndAnswerModule().astream(context)]
+
+        self.assertEqual("".join(asyncio.run(collect())), "네, 실버 색상이 있습니다.")
+        self.assertEqual(context.reasoning, "- S25는 실버 색상이 있다")
+
+    def test_async_run(self):
+        """arun awaits the same single call"""
+        self.chain.ainvoke = MagicMock(side_effect=lambda inputs: asyncio.sleep(0, result=self.OUTPUT))
+        context = self._context()
+
+        asyncio.run(ReasonAndAnswerModule().arun(context))
+
+        self.assertEqual(context.response, "네, 실버 색상이 있습니다.")
+
+    def test_async_run_keeps_history_io_off_the_loop(self):
+        """Reading and writing the session history never run on the event loop"""
+        self.chain.ainvoke = MagicMock(side_effect=lambda inputs: asyncio.sleep(0, result=self.OUTPUT))
+        context = self._context()
+        context.history = ThreadRecordingHistory()
+
+        async def run():
+            await ReasonAndAnswerModule().arun(context)
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(run())
+
+        self.assertTrue(context.history.threads)
+        self.assertNotIn(loop_thread, context.history.threads)
+
+    def test_failure_raises_module_error(self):
+        self.chain.invoke.side_effect = RuntimeError("boom")
+
+        with self.assertRaises(ModuleError):
+            ReasonAndAnswerModule().run(self._context())
+
+    def test_answer_step_is_registered(self):
+        module = PipelineRunner([])._build_module({"type": "answer", "config": {"complex_fallback": False}})
+
+        self.assertIsInstance(module, ReasonAndAnswerModule)
+        self.assertFalse(module.complex_fallback)
+
+
+class FakeChain:
+    """Chain stub that answers after ``delay`` seconds"""
+
+    def __init__(self, answer, delay=0.0, fail=False):
+        self.answer = answer
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+        self.cancelled = 0
+
+    def _result(self, inputs):
+        self.calls.append(inputs)
+        if self.fail:
+            raise RuntimeError("provider down")
+        return self.answer(inputs) if callable(self.answer) else self.answer
+
+    def invoke(self, inputs):
+        time.sleep(self.delay)
+        return self._result(inputs)
+
+    async def ainvoke(self, inputs):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return self._result(inputs)
+
+    async def astream(self, inputs):
+        answer = await self.ainvoke(inputs)
+        for word in answer.split(" "):
+            yield f"{word} "
+
+
+class SpeculativeAnswerModuleTestCase(SimpleTestCase):
+    """Test case for parallel reasoning + draft generation under a latency budget"""
+
+    def _run(self, reasoning_delay, budget_ms=200, fail_reasoning=False, use_async=False, stream=False,
+             generation_delay=0.01, draft_timeout_ms=None):
+        self.reasoning = FakeChain("- 근거", delay=reasoning_delay, fail=fail_reasoning)
+        generation = FakeChain(lambda inputs: "정제된 답변" if inputs["reasoning"] else "초안 답변", delay=generation_delay)
+        context = ModuleContext(
+            question="질문", session_id="s1", user_id="u1",
+            context_text="컨텍스트", history=ThreadRecordingHistory(),
+        )
+        with patch('chat.pipeline.modules.ReasoningModule._build_chain', return_value=(self.reasoning, {"question": "질문"})), \
+                patch('chat.pipeline.modules.get_llm_chain', return_value=generation):
+            module = SpeculativeAnswerModule(budget_ms=budget_ms, draft_timeout_ms=draft_timeout_ms)
+            started = time.monotonic()
+            if stream and use_async:
+                async def collect():
+                    self.loop_thread = threading.get_ident()
+                    return [token async for token in module.astream(context)]
+                self.tokens = asyncio.run(collect())
+            elif stream:
+                self.tokens = list(module.stream(context))
+            elif use_async:
+                async def run():
+                    self.loop_thread = threading.get_ident()
+                    await module.arun(context)
+                asyncio.run(run())
+            else:
+                module.run(context)
+            elapsed = time.monotonic() - started
+        return context, generation, elapsed
+
+    def test_fast_reasoning_refines_the_answer(self):
+        """Reasoning inside the budget produces the refined answer"""
+        context, generation, _ = self._run(reasoning_delay=0.01)
+
+        self.assertEqual(context.response, "정제된 답변")
+        self.assertEqual(context.reasoning, "- 근거")
+        self.assertEqual(context.extra["speculative"]["outcome"], "refined")
+        self.assertEqual(len(generation.calls), 2)
+        self.assertEqual(context.history.messages[-1].content, "정제된 답변")
+
+    def test_slow_reasoning_returns_draft_within_budget(self):
+        """A reasoning call slower than the budget does not delay the answer"""
+        context, _, elapsed = self._run(reasoning_delay=1.0, budget_ms=100)
+
+        self.assertEqual(context.response, "초안 답변")
+        self.assertEqual(context.extra["speculative"]["outcome"], "draft")
+        self.assertLess(elapsed, 0.5)
+
+    def test_failed_reasoning_returns_draft(self):
+        context, _, _ = self._run(reasoning_delay=0.0, fail_reasoning=True)
+
+        self.assertEqual(context.response, "초안 답변")
+
+    def test_async_slow_reasoning_returns_draft(self):
+        """arun cancels the reasoning call once the budget runs out"""
+        context, _, elapsed = self._run(reasoning_delay=1.0, budget_ms=100, use_async=True)
+
+        self.assertEqual(context.response, "초안 답변")
+        self.assertLess(elapsed, 0.5)
+
+    def test_async_fast_reasoning_refines(self):
+        context, _, _ = self._run(reasoning_delay=0.01, use_async=True)
+
+        self.assertEqual(context.response, "정제된 답변")
+        # Session history is read and written off the event loop
+        self.assertTrue(context.history.threads)
+        self.assertNotIn(self.loop_thread, context.history.threads)
+
+    def test_abandoned_reasoning_is_cancelled(self):
+        """Calls that miss the budget are cancelled, so later requests are not queued behind them"""
+        for _ in range(3):
+            context, _, elapsed = self._run(reasoning_delay=2.0, budget_ms=100)
+
+            self.assertEqual(context.response, "초안 답변")
+            self.assertLess(elapsed, 0.5)
+            self.assertEqual(self.reasoning.cancelled, 1)
+
+    def test_draft_wait_has_a_deadline(self):
+        with self.assertRaises(ModuleError):
+            self._run(reasoning_delay=2.0, budget_ms=50, generation_delay=2.0, draft_timeout_ms=150)
+
+    def test_stream_yields_draft_tokens_when_reasoning_is_slow(self):
+        context, _, elapsed = self._run(reasoning_delay=1.0, budget_ms=100, stream=True)
+
+        self.assertEqual(self.tokens, ["초안 ", "답변 "])
+        self.assertEqual(context.response, "초안 답변 ")
+        self.assertEqual(context.extra["speculative"]["outcome"], "draft")
+        self.assertEqual(self.reasoning.cancelled, 1)
+        self.assertLess(elapsed, 0.5)
+
+    def test_stream_yields_refined_tokens_when_reasoning_is_fast(self):
+        context, _, _ = self._run(reasoning_delay=0.01, stream=True)
+
+        self.assertEqual(self.tokens, ["정제된 ", "답변 "])
+        self.assertEqual(context.extra["speculative"]["outcome"], "refined")
+        self.assertEqual(context.history.messages[-1].content, "정제된 답변 ")
+
+    def test_async_stream_yields_draft_tokens(self):
+        context, _, _ = self._run(reasoning_delay=1.0, budget_ms=100, stream=True, use_async=True)
+
+        self.assertEqual(self.tokens, ["초안 ", "답변 "])
+        self.assertEqual(context.extra["speculative"]["outcome"], "draft")
+        self.assertNotIn(self.loop_thread, context.history.threads)
+
+    @patch.dict('os.environ', {"PIPELINE_LATENCY_BUDGET_MS": "250"})
+    def test_budget_from_environment(self):
+        self.assertEqual(SpeculativeAnswerModule()._budget(), 0.25)
+        self.assertEqual(SpeculativeAnswerModule(budget_ms=1000)._budget(), 1.0)
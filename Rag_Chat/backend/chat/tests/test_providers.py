@@ -0,0 +1,306 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+from unittest.mock import AsyncMock, patch, MagicMock
+
+from django.test import TestCase, override_settings
+from langchain.schema import Document
+
+from ..indexing import chunk_fingerprint
+from ..providers.embedding_cache import CachedEmbeddings
+from ..providers.index_versions import IndexValidationError, IndexVersionStore
+from ..providers.manager import ProviderManager
+
+
+class ProviderManagerVectorStoreTestCase(TestCase):
+    """Test case for the cached vector store handle in ProviderManager"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(VECTOR_STORE_PATH=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.manager = ProviderManager()
+        self.manager._embedding_model = MagicMock()
+
+    def _docs(self, count):
+        return [Document(page_content=f"Galaxy S25 {i}") for i in range(count)]
+
+    @patch('chat.providers.manager.Chroma')
+    def test_get_vector_store_reuses_handle(self, mock_chroma):
+        """The Chroma handle is opened once and shared across calls"""
+        first = self.manager.get_vector_store()
+        second = self.manager.get_vector_store()
+
+        mock_chroma.assert_called_once()
+        self.assertIs(first, second)
+
+    @patch('chat.providers.manager.Chroma')
+    def test_invalidate_vector_store_reopens(self, mock_chroma):
+        """Invalidation forces the next call to open a fresh handle"""
+        mock_chroma.side_effect = [MagicMock(), MagicMock()]
+
+        first = self.manager.get_vector_store()
+        self.manager.invalidate_vector_store()
+        second = self.manager.get_vector_store()
+
+        self.assertEqual(mock_chroma.call_count, 2)
+        self.assertIsNot(first, second)
+
+    @patch('chat.providers.manager.Chroma')
+    def test_create_from_documents_invalidates_cache(self, mock_chroma):
+        """Rebuilding the store drops the cached read handle"""
+        mock_chroma.from_documents.return_value._collection.count.return_value = 1
+        self.manager.get_vector_store()
+        self.manager.create_vector_store_from_documents([Document(page_content="Galaxy S25")])
+
+        self.assertIsNone(self.manager._vector_store_cache)
+
+    @patch('chat.providers.manager.Chroma')
+    def test_rebuild_writes_new_version_and_flips_pointer(self, mock_chroma):
+        """A validated build lands in its own directory and becomes active"""
+        mock_chroma.from_documents.return_value._collection.count.return_value = 2
+
+        self.manager.create_vector_store_from_documents(self._docs(2))
+
+        versions = IndexVersionStore(self.root)
+        active = versions.active_version()
+        self.assertIsNotNone(active)
+        persist_directory = mock_chroma.from_documents.call_args.kwargs["persist_directory"]
+        self.assertEqual(persist_directory, versions.version_path(active))
+        self.assertEqual(self.manager.get_vector_store_path(), persist_directory)
+
+    @patch('chat.providers.manager.Chroma')
+    def test_rebuild_uses_fingerprint_ids_and_stamps_source(self, mock_chroma):
+        """Full builds store chunks under the IDs incremental syncs look for"""
+        mock_chroma.from_documents.return_value._collection.count.return_value = 2
+        documents = self._docs(2)
+
+        self.manager.create_vector_store_from_documents(documents, source="csv")
+
+        kwargs = mock_chroma.from_documents.call_args.kwargs
+        self.assertEqual(kwargs["ids"], [chunk_fingerprint(document) for document in documents])
+        self.assertTrue(all(document.metadata["ingest_source"] == "csv" for document in kwargs["documents"]))
+        manifest_path = os.path.join(kwargs["persist_directory"], "index_manifest.json")
+        self.assertTrue(os.path.exists(manifest_path))
+
+    @patch('chat.providers.manager.Chroma')
+    def test_failed_validation_keeps_previous_version(self, mock_chroma):
+        """A half-built or empty index is discarded and never activated"""
+        versions = IndexVersionStore(self.root)
+        previous = versions.create_version()
+        versions.activate(previous)
+        mock_chroma.from_documents.return_value._collection.count.return_value = 1
+
+        with self.assertRaises(IndexValidationError):
+            self.manager.create_vector_store_from_documents(self._docs(2))
+
+        self.assertEqual(versions.active_version(), previous)
+        self.assertEqual(versions.list_versions(), [previous])
+
+    @patch.dict(os.environ, {"VECTOR_STORE_POLL_INTERVAL": "0"})
+    @patch('chat.providers.manager.Chroma')
+    def test_pointer_change_reopens_handle_without_restart(self, mock_chroma):
+        """Workers notice an activation made by another process"""
+        mock_chroma.side_effect = [MagicMock(), MagicMock()]
+        first = self.manager.get_vector_store()
+
+        versions = IndexVersionStore(self.root)
+        versions.activate(versions.create_version())
+        second = self.manager.get_vector_store()
+
+        self.assertIsNot(first, second)
+        self.assertEqual(
+            mock_chroma.call_args.kwargs["persist_directory"],
+            versions.version_path(versions.active_version()),
+        )
+
+    @patch.dict(os.environ, {"VECTOR_STORE_POLL_INTERVAL": "0"})
+    @patch('chat.providers.manager.release_chroma_client')
+    @patch('chat.providers.manager.Chroma')
+    def test_retired_versions_release_chroma_clients(self, mock_chroma, mock_release):
+        """Clients older than the previously served version are closed"""
+        versions = IndexVersionStore(self.root)
+        served = []
+        for _ in range(3):
+            versions.activate(versions.create_version())
+            self.manager.get_vector_store()
+            served.append(versions.active_path())
+
+        mock_release.assert_called_once_with(served[0])
+
+    @patch('chat.providers.manager.release_chroma_client')
+    @patch('chat.providers.manager.Chroma')
+    def test_discarded_and_collected_versions_release_chroma_clients(self, mock_chroma, mock_release):
+        """Failed builds and garbage-collected versions do not keep their clients"""
+        versions = IndexVersionStore(self.root)
+        mock_chroma.from_documents.return_value._collection.count.return_value = 1
+        with self.assertRaises(IndexValidationError):
+            self.manager.create_vector_store_from_documents(self._docs(2))
+        failed = mock_chroma.from_documents.call_args.kwargs["persist_directory"]
+
+        created = []
+        for suffix in "abc":
+            path = os.path.join(versions.versions_dir, f"2025010100000{len(created)}-{suffix}")
+            os.makedirs(path)
+            created.append(os.path.basename(path))
+        self.manager.activate_vector_store_version(created[-1])
+
+        released = [call.args[0] for call in mock_release.call_args_list]
+        self.assertEqual(released, [failed, versions.version_path(created[0])])
+
+class IndexVersionStoreTestCase(TestCase):
+    """Test case for versioned index directories and garbage collection"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.versions = IndexVersionStore(self.root)
+
+    def test_legacy_layout_served_without_pointer(self):
+        self.assertIsNone(self.versions.active_version())
+        self.assertEqual(self.versions.active_path(), self.root)
+
+    def test_copy_active_excludes_versions_and_pointer(self):
+        with open(os.path.join(self.root, "chroma.sqlite3"), "w") as handle:
+            handle.write("data")
+        version_id = self.versions.create_version(copy_active=True)
+
+        self.assertEqual(os.listdir(self.versions.version_path(version_id)), ["chroma.sqlite3"])
+
+    def test_garbage_collect_keeps_active_and_newest(self):
+        created = []
+        for suffix in "abcd":
+            path = os.path.join(self.versions.versions_dir, f"2025010100000{len(created)}-{suffix}")
+            os.makedirs(path)
+            created.append(os.path.basename(path))
+        self.versions.activate(created[0])
+
+        removed = self.versions.garbage_collect(keep=2)
+
+        self.assertEqual(removed, created[1:2])
+        self.assertEqual(self.versions.list_versions(), [created[0]] + created[2:])
+
+
+class CachedEmbeddingsTestCase(TestCase):
+    """Test case for the two-tier query embedding cache"""
+
+    def setUp(self):
+        self.inner = MagicMock()
+        self.inner.embed_query.side_effect = lambda text: [float(len(text))]
+
+    def test_embed_query_hits_local_cache(self):
+        """Normalised duplicates are served from the in-process tier"""
+        cached = CachedEmbeddings(self.inner, model_name="test-model")
+
+        first = cached.embed_query("갤럭시 S25  실버 모델 정보")
+        second = cached.embed_query(" 갤럭시 s25 실버 모델 정보 ")
+
+        self.inner.embed_query.assert_called_once()
+        self.assertEqual(first, second)
+        stats = cached.stats()
+        self.assertEqual(stats["local_hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+
+    def test_lru_evicts_oldest_entry(self):
+        """Size-based eviction drops the least recently used key"""
+        cached = CachedEmbeddings(self.inner, model_name="test-model", max_size=1)
+
+        cached.embed_query("first")
+        cached.embed_query("second")
+        cached.embed_query("first")
+
+        self.assertEqual(self.inner.embed_query.call_count, 3)
+
+    @patch('chat.providers.embedding_cache.time.monotonic')
+    def test_ttl_expires_entry(self, mock_monotonic):
+        """Entries older than the TTL are recomputed"""
+        mock_monotonic.return_value = 100.0
+        cached = CachedEmbeddings(self.inner, model_name="test-model", ttl=10)
+        cached.embed_query("question")
+
+        mock_monotonic.return_value = 111.0
+        cached.embed_query("question")
+
+        self.assertEqual(self.inner.embed_query.call_count, 2)
+
+    def test_redis_tier_populates_local_cache(self):
+        """A Redis hit avoids the provider call and warms the local tier"""
+        redis_tier = MagicMock()
+        redis_tier.get.return_value = [0.5, 0.5]
+        cached = CachedEmbeddings(self.inner, model_name="test-model", redis_tier=redis_tier)
+
+        self.assertEqual(cached.embed_query("question"), [0.5, 0.5])
+        self.assertEqual(cached.embed_query("question"), [0.5, 0.5])
+
+        self.inner.embed_query.assert_not_called()
+        redis_tier.get.assert_called_once()
+        self.assertEqual(cached.stats()["redis_hits"], 1)
+
+    def test_aembed_query_reaches_redis_off_the_event_loop(self):
+        """Async lookups and stores never block the loop on Redis"""
+        redis_threads = []
+        redis_tier = MagicMock()
+        redis_tier.get.side_effect = lambda key: redis_threads.append(threading.get_ident())
+        redis_tier.set.side_effect = lambda key, vector: redis_threads.append(threading.get_ident())
+        self.inner.aembed_query = AsyncMock(return_value=[0.5, 0.5])
+        cached = CachedEmbeddings(self.inner, model_name="test-model", redis_tier=redis_tier)
+
+        async def embed():
+            return threading.get_ident(), await cached.aembed_query("question")
+
+        loop_thread, vector = asyncio.run(embed())
+
+        self.assertEqual(vector, [0.5, 0.5])
+        self.assertEqual(len(redis_threads), 2)
+        self.assertNotIn(loop_thread, redis_threads)
+        self.assertEqual(asyncio.run(cached.aembed_query("question")), [0.5, 0.5])
+        self.assertEqual(len(redis_threads), 2)
+
+    def test_model_name_is_part_of_key(self):
+        """Different embedding models never share cache entries"""
+        first = CachedEmbeddings(self.inner, model_name="model-a")
+        second = CachedEmbeddings(self.inner, model_name="model-b")
+
+        self.assertNotEqual(first.cache_key("question"), second.cache_key("question"))
+
+
+class LexicalIndexServingTestCase(TestCase):
+    """Test case for building and serving the BM25 index with each version"""
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        settings_override = override_settings(VECTOR_STORE_PATH=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.manager = ProviderManager()
+        self.manager._embedding_model = MagicMock()
+
+    @patch('chat.providers.manager.Chroma')
+    def test_rebuild_saves_lexical_index_with_version(self, mock_chroma):
+        mock_chroma.from_documents.return_value._collection.count.return_value = 2
+        documents = [Document(page_content="Storage: 256GB"), Document(page_content="Storage: 512GB")]
+
+        self.manager.create_vector_store_from_documents(documents)
+        lexical_index = self.manager.get_lexical_index()
+
+        self.assertEqual(len(lexical_index), 2)
+        self.assertEqual(lexical_index.search("512GB", k=1)[0][0].page_content, "Storage: 512GB")
+        self.assertIs(self.manager.get_lexical_index(), lexical_index)
+
+    @patch('chat.providers.manager.Chroma')
+    def test_rebuild_saves_catalogue_index_with_version(self, mock_chroma):
+        mock_chroma.from_documents.return_value._collection.count.return_value = 1
+        documents = [Document(page_content="Model: Galaxy S25\nColor: Silver\nPrice: 1199.99")]
+
+        self.manager.create_vector_store_from_documents(documents)
+
+        self.assertEqual(self.manager.get_catalogue_index().columns["Price"], ["1199.99"])
+
+    @patch('chat.providers.manager.Chroma')
+    def test_legacy_store_without_lexical_index(self, mock_chroma):
+        self.assertIsNone(self.manager.get_lexical_index())
@@ -0,0 +1,113 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import redis
+from django.test import SimpleTestCase, override_settings
+
+from chat.redis_manager import InstrumentedConnectionPool, RedisConnectionManager, RedisMessageManager
+
+
+class InstrumentedConnectionPoolTestCase(SimpleTestCase):
+    def setUp(self):
+        self.pool = InstrumentedConnectionPool(host="localhost", max_connections=2, timeout=0.01)
+
+    def _checkout(self):
+        # Skip the socket connect; the pool bookkeeping is what is under test
+        with patch("redis.connection.Connection.connect"), \
+                patch("redis.connection.Connection.can_read", return_value=False, create=True):
+            return self.pool.get_connection("PING")
+
+    def test_tracks_in_use_and_peak(self):
+        first = self._checkout()
+        second = self._checkout()
+        self.pool.release(first)
+
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["checkouts"], 2)
+        self.assertEqual(stats["in_use"], 1)
+        self.assertEqual(stats["peak_in_use"], 2)
+        self.assertEqual(stats["max_connections"], 2)
+        self.pool.release(second)
+
+    def test_counts_exhaustion_when_no_connection_frees_up(self):
+        self._checkout()
+        self._checkout()
+
+        with self.assertRaises(redis.ConnectionError):
+            self._checkout()
+        self.assertEqual(self.pool.get_stats()["exhausted"], 1)
+
+
+@override_settings(REDIS_MAX_CONNECTIONS=4, REDIS_POOL_TIMEOUT=0.5, REDIS_HEALTH_CHECK_INTERVAL=15)
+class RedisMessageManagerSharingTestCase(SimpleTestCase):
+    def setUp(self):
+        self._reset()
+        self.addCleanup(self._reset)
+
+    @staticmethod
+    def _reset():
+        RedisConnectionManager._instance = None
+        RedisConnectionManager._pool = None
+        RedisConnectionManager._client = None
+        RedisMessageManager._instance = None
+
+    def test_pool_uses_configured_limits(self):
+        pool = RedisConnectionManager.get_instance()._pool
+
+        self.assertEqual(pool.max_connections, 4)
+        self.assertEqual(pool.timeout, 0.5)
+        self.assertEqual(pool.connection_kwargs["health_check_interval"], 15)
+
+    def test_construction_does_not_ping(self):
+        with patch("redis.Redis.ping") as ping:
+            RedisMessageManager.get_instance()
+        ping.assert_not_called()
+
+    def test_instance_and_client_are_shared(self):
+        first = RedisMessageManager.get_instance()
+        second = RedisMessageManager.get_instance()
+
+        self.assertIs(first, second)
+        self.assertIs(first.redis_client, RedisConnectionManager.get_instance().get_connection())
+
+
+@override_settings(REDIS_HISTORY_WINDOW=50, REDIS_HISTORY_MAX_CHARS=0, REDIS_MESSAGE_MAX_LENGTH=0)
+class RedisMessageWindowTestCase(SimpleTestCase):
+    def setUp(self):
+        self.stored = [
+            json.dumps({"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"})
+            for i in range(10)
+        ]
+        self.client = MagicMock()
+        self.client.lrange.side_effect = lambda key, start, end: self.stored[start:] if start < 0 else self.stored
+        self.manager = RedisMessageManager.__new__(RedisMessageManager)
+        self.manager.redis_client = self.client
+
+    def test_reads_only_the_tail_in_chronological_order(self):
+        messages = self.manager.get_recent_messages("session", window=3)
+
+        self.client.lrange.assert_called_once_with("chat_messages:session", -3, -1)
+        self.assertEqual([m["content"] for m in messages], ["message 7", "message 8", "message 9"])
+
+    def test_character_budget_drops_oldest_messages(self):
+        messages = self.manager.get_recent_messages("session", window=5, max_chars=20)
+
+        self.assertEqual([m["content"] for m in messages], ["message 8", "message 9"])
+
+    def test_budget_always_keeps_latest_message(self):
+        messages = self.manager.get_recent_messages("session", window=5, max_chars=1)
+
+        self.assertEqual([m["content"] for m in messages], ["message 9"])
+
+    def test_get_messages_remains_newest_first(self):
+        messages = self.manager.get_messages("session", limit=2)
+
+        self.client.lrange.assert_called_once_with("chat_messages:session", -2, -1)
+        self.assertEqual([m["content"] for m in messages], ["message 9", "message 8"])
+
+    @override_settings(REDIS_MESSAGE_MAX_LENGTH=100)
+    def test_save_trims_list_when_max_length_set(self):
+        pipeline = self.client.pipeline.return_value
+
+        self.assertTrue(self.manager.save_message("session", {"role": "user", "content": "hi"}))
+        pipeline.ltrim.assert_called_once_with("chat_messages:session", -100, -1)
@@ -0,0 +1,181 @@
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from langchain_core.messages import HumanMessage
+from rest_framework.test import APIClient
+
+from ..providers.chat_routing import HedgedChatModel, ProviderRouter
+from ..providers.fake_chat import FakeChatModel
+from ..providers.manager import ProviderManager
+from ..providers.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    Bulkhead,
+    CircuitBreaker,
+    GuardedChatModel,
+    ProviderUnavailable,
+)
+
+
+def guarded(name, breaker=None, bulkhead=None, **fake_kwargs):
+    return GuardedChatModel(
+        provider=name,
+        model=FakeChatModel(name_tag=name, latency_ms=fake_kwargs.pop("latency_ms", 1), **fake_kwargs),
+        breaker=breaker,
+        bulkhead=bulkhead or Bulkhead(name),
+    )
+
+
+class CircuitBreakerTestCase(SimpleTestCase):
+    """Test case for circuit breaker state transitions"""
+
+    def test_opens_after_consecutive_failures_and_recovers(self):
+        breaker = CircuitBreaker("qwen", failure_threshold=2, reset_timeout=0.05)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow())
+        self.assertEqual(breaker.snapshot()["rejections"], 1)
+
+        time.sleep(0.06)
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # one trial call at a time
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_late_success_does_not_close_open_breaker(self):
+        """A call admitted before the breaker opened cannot close it"""
+        breaker = CircuitBreaker("qwen", failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, OPEN)
+
+        time.sleep(0.06)
+        breaker.record_success()  # still no trial admitted
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker("qwen", failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+
+        self.assertTrue(breaker.allow())
+        breaker.record_failure()
+
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.snapshot()["times_opened"], 2)
+
+
+class GuardedChatModelTestCase(SimpleTestCase):
+    """Test case for fast-fail and fallback around degraded providers"""
+
+    def test_open_circuit_fails_fast(self):
+        breaker = CircuitBreaker("qwen", failure_threshold=1, reset_timeout=60)
+        model = guarded("qwen", breaker=breaker, latency_ms=500, error_rate=1.0)
+
+        with self.assertRaises(RuntimeError):
+            model.invoke([HumanMessage(content="질문")])
+        started = time.monotonic()
+        with self.assertRaises(ProviderUnavailable):
+            model.invoke([HumanMessage(content="질문")])
+
+        self.assertLess(time.monotonic() - started, 0.1)
+
+    def test_bulkhead_rejects_excess_calls(self):
+        """Calls beyond the concurrency cap are rejected without waiting"""
+        bulkhead = Bulkhead("qwen", max_concurrent=1)
+        model = guarded("qwen", bulkhead=bulkhead, latency_ms=200)
+        started = threading.Event()
+
+        def slow_call():
+            started.set()
+            model.invoke([HumanMessage(content="첫 질문")])
+
+        worker = threading.Thread(target=slow_call)
+        worker.start()
+        started.wait()
+        time.sleep(0.05)
+        with self.assertRaises(ProviderUnavailable):
+            model.invoke([HumanMessage(content="두 번째 질문")])
+        worker.join()
+
+        self.assertEqual(bulkhead.snapshot(), {"in_flight": 0, "max_concurrent": 1, "rejections": 1})
+
+    def test_rejected_calls_fall_back_to_alternate(self):
+        """Behind a failover router an open circuit goes straight to the other provider"""
+        breaker = CircuitBreaker("qwen", failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        model = HedgedChatModel(
+            backends=[("qwen", guarded("qwen", breaker=breaker)), ("gemini", guarded("gemini"))],
+            router=ProviderRouter(),
+            hedge=False,
+        )
+
+        result = model.invoke([HumanMessage(content="질문")])
+
+        self.assertEqual(result.content, "[gemini] 질문")
+        self.assertEqual(breaker.snapshot()["rejections"], 1)
+
+    def test_cancelled_async_trial_is_released(self):
+        """A cancelled half-open trial does not leave the circuit stuck"""
+        breaker = CircuitBreaker("qwen", failure_threshold=1, reset_timeout=0.01)
+        breaker.record_failure()
+        time.sleep(0.02)
+        model = guarded("qwen", breaker=breaker, latency_ms=500)
+
+        async def cancel_call():
+            task = asyncio.ensure_future(model.ainvoke([HumanMessage(content="질문")]))
+            await asyncio.sleep(0.02)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(cancel_call())
+
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertTrue(breaker.allow())
+
+
+class ProviderHealthTestCase(SimpleTestCase):
+    """Test case for breaker wiring in ProviderManager and the health endpoint"""
+
+    @patch.dict('os.environ', {
+        "CIRCUIT_FAILURE_THRESHOLD": "1",
+        "FAKE_MAX_CONCURRENCY": "4",
+        "FAKE_CHAT_LATENCY_MS": "1",
+        "FAKE_CHAT_ERROR_RATE": "1",
+        "HEDGE_ALTERNATES": "",
+    })
+    def test_manager_guards_providers(self):
+        manager = ProviderManager()
+        model = manager.get_chat_model("fake", "GENERATION")
+
+        with self.assertRaises(RuntimeError):
+            model.invoke([HumanMessage(content="질문")])
+        with self.assertRaises(ProviderUnavailable):
+            manager.get_chat_model("fake", "REASONING").invoke([HumanMessage(content="질문")])
+
+        health = manager.get_provider_health()["fake"]
+        self.assertEqual(health["circuit"]["state"], OPEN)
+        self.assertEqual(health["circuit"]["rejections"], 1)
+        self.assertEqual(health["bulkhead"]["max_concurrent"], 4)
+
+    def test_health_endpoint(self):
+        providers = {"qwen": {"circuit": {"state": OPEN, "rejections": 3}, "bulkhead": None, "routing": None}}
+        with patch('chat.views.provider_manager.get_provider_health', return_value=providers):
+            response = APIClient().get(reverse('provider-health'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["status"], "degraded")
+        self.assertEqual(response.data["providers"]["qwen"]["circuit"]["rejections"], 3)
@@ -0,0 +1,187 @@
+import asyncio
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from langchain.schema import Document
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from ..models import Chat, User
+from ..pipeline import ModuleContext, RetrieveModule
+from ..providers.catalogue_index import CatalogueIndex
+from ..providers.lexical_index import BM25Index
+from ..retrieval_filters import (
+    add_field_metadata,
+    build_where,
+    matches_filters,
+    normalize_filters,
+    parse_question_filters,
+)
+from ..utils import RAGUtils
+from .test_catalogue import catalogue_documents
+
+
+class FilterTranslationTestCase(SimpleTestCase):
+    def test_request_filters_map_to_metadata_keys(self):
+        filters = normalize_filters({"model": "Galaxy S25 Ultra", "color": ["Silver", "Phantom Black"]})
+
+        self.assertEqual(filters, {"field_model": ["Galaxy S25 Ultra"], "field_color": ["Silver", "Phantom Black"]})
+        self.assertEqual(normalize_filters(None), {})
+
+    def test_invalid_filters_are_rejected(self):
+        for raw in ({"price": "1199.99"}, {"model": 25}, {"color": []}, ["model"]):
+            with self.assertRaises(ValueError):
+                normalize_filters(raw)
+
+    def test_where_clause(self):
+        self.assertIsNone(build_where({}))
+        self.assertEqual(build_where({"field_model": ["Galaxy S25"]}), {"field_model": "Galaxy S25"})
+        self.assertEqual(
+            build_where({"field_model": ["Galaxy S25"], "field_color": ["Silver", "Navy Blue"]}),
+            {"$and": [{"field_model": "Galaxy S25"}, {"field_color": {"$in": ["Silver", "Navy Blue"]}}]},
+        )
+
+    def test_field_metadata_from_catalogue_lines(self):
+        document = add_field_metadata(catalogue_documents()[:1])[0]
+
+        self.assertEqual(document.metadata["field_model"], "Galaxy S25")
+        self.assertEqual(document.metadata["field_image_path"], "black_s25.png")
+        self.assertTrue(matches_filters(document.metadata, {"field_color": ["Phantom Black", "Silver"]}))
+        self.assertFalse(matches_filters(document.metadata, {"field_storage": ["1TB"]}))
+
+    @patch("chat.retrieval_filters.provider_manager.get_catalogue_index")
+    def test_question_parser_uses_catalogue_values(self, mock_catalogue):
+        mock_catalogue.return_value = CatalogueIndex.from_documents(catalogue_documents())
+
+        self.assertEqual(
+            parse_question_filters("S25 울트라 실버 카메라 성능 알려줘"),
+            {"field_model": ["Galaxy S25 Ultra"], "field_color": ["Silver"]},
+        )
+        mock_catalogue.return_value = None
+        self.assertEqual(parse_question_filters("S25 울트라"), {})
+
+
+class FilteredSearchTestCase(SimpleTestCase):
+    def setUp(self):
+        self.vector_store = MagicMock()
+        self.vector_store.similarity_search.return_value = [Document(page_content="Galaxy S25 Ultra Silver")]
+        patcher = patch("chat.utils.RAGUtils.get_vector_store", return_value=self.vector_store)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_filters_are_pushed_into_chroma(self):
+        RAGUtils.get_rag_context("카메라", k=2, filters={"field_model": ["Galaxy S25 Ultra"]})
+
+        self.vector_store.similarity_search.assert_called_once_with(
+            "카메라", k=2, filter={"field_model": "Galaxy S25 Ultra"}
+        )
+
+    def test_unfiltered_search_is_unchanged(self):
+        RAGUtils.get_rag_context("카메라")
+
+        self.vector_store.similarity_search.assert_called_once_with("카메라", k=3)
+
+    @patch("chat.utils.provider_manager")
+    def test_hybrid_filters_lexical_results(self, mock_provider_manager):
+        documents = add_field_metadata(catalogue_documents())
+        mock_provider_manager.get_lexical_index.return_value = BM25Index.from_documents(documents)
+        self.vector_store.similarity_search.return_value = []
+
+        result = RAGUtils.get_hybrid_rag_context(
+            "Galaxy", k=5, fetch_k=5, filters={"field_model": ["Galaxy S25 Ultra"]}
+        )
+
+        self.assertIn("filter", self.vector_store.similarity_search.call_args.kwargs)
+        self.assertEqual(result["context"].count("Model: Galaxy S25 Ultra"), 2)
+        self.assertNotIn("Model: Galaxy S25\n", result["context"])
+
+
+class RetrieveModuleFilterTestCase(SimpleTestCase):
+    def _context(self, **extra):
+        return ModuleContext(question="S25 울트라 카메라", session_id="s", user_id="u", extra=extra)
+
+    @patch("chat.pipeline.modules.parse_question_filters")
+    @patch("chat.pipeline.modules.RAGUtils.get_rag_context")
+    def test_request_filters_take_precedence(self, mock_get_rag_context, mock_parse):
+        mock_get_rag_context.return_value = {"context": "ctx", "image_paths": []}
+        filters = {"field_color": ["Silver"]}
+
+        RetrieveModule(auto_filters=True).run(self._context(filters=filters))
+
+        mock_parse.assert_not_called()
+        mock_get_rag_context.assert_called_once_with("S25 울트라 카메라", k=3, filters=filters)
+
+    @patch("chat.pipeline.modules.parse_question_filters")
+    @patch("chat.pipeline.modules.RAGUtils.get_rag_context")
+    def test_parsed_filters_fall_back_when_nothing_matches(self, mock_get_rag_context, mock_parse):
+        parsed = {"field_model": ["Galaxy S25 Ultra"]}
+        mock_parse.return_value = parsed
+        mock_get_rag_context.side_effect = [{"context": "", "image_paths": []}, {"context": "ctx", "image_paths": []}]
+
+        context = RetrieveModule(auto_filters=True).run(self._context())
+
+        self.assertEqual(
+            [call.kwargs["filters"] for call in mock_get_rag_context.call_args_list],
+            [parsed, None],
+        )
+        self.assertEqual(context.context_text, "ctx")
+        self.assertEqual(context.extra["parsed_filters"], parsed)
+
+    @patch("chat.pipeline.modules.parse_question_filters")
+    @patch("chat.pipeline.modules.RAGUtils.aget_rag_context")
+    def test_async_run_applies_parsed_filters(self, mock_aget_rag_context, mock_parse):
+        mock_parse.return_value = {"field_model": ["Galaxy S25 Ultra"]}
+
+        async def search(question, k, filters):
+            return {"context": f"{filters}", "image_paths": []}
+
+        mock_aget_rag_context.side_effect = search
+
+        context = asyncio.run(RetrieveModule(auto_filters=True).arun(self._context()))
+
+        self.assertIn("Galaxy S25 Ultra", context.context_text)
+
+    @patch("chat.pipeline.modules.parse_question_filters")
+    @patch("chat.pipeline.modules.RAGUtils.get_rag_context")
+    def test_auto_filters_off_by_default(self, mock_get_rag_context, mock_parse):
+        mock_get_rag_context.return_value = {"context": "ctx", "image_paths": []}
+
+        RetrieveModule().run(self._context())
+
+        mock_parse.assert_not_called()
+
+
+class ChatFilterRequestTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create()
+        self.client = APIClient()
+
+    def test_invalid_filters_rejected_before_saving(self):
+        response = self.client.post(
+            reverse('chat-create'),
+            {"question": "가격", "user_id": self.user.user_id, "filters": {"price": "1"}},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Chat.objects.exists())
+
+    @patch('chat.views.history_session_handler')
+    @patch('chat.views.PipelineRunner.run')
+    def test_filters_reach_pipeline_context(self, mock_run, mock_history):
+        def run(context):
+            context.context_text = "Galaxy S25 Ultra"
+            context.response = str(context.extra["filters"])
+            return context
+
+        mock_run.side_effect = run
+
+        response = self.client.post(
+            reverse('chat-create'),
+            {"question": "카메라", "user_id": self.user.user_id, "filters": {"model": "Galaxy S25 Ultra"}},
+            format='json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["response"], "{'field_model': ['Galaxy S25 Ultra']}")
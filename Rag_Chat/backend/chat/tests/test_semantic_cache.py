@@ -0,0 +1,141 @@
+import shutil
+import tempfile
+import threading
+from unittest.mock import patch, MagicMock
+
+from django.test import TestCase, override_settings
+
+from .. import semantic_cache
+from ..providers.index_versions import IndexVersionStore
+from ..utils import MetaDataManager
+
+
+VECTORS = {
+    "갤럭시 S25 실버 가격": [1.0, 0.0, 0.0],
+    "갤럭시 S25 실버 가격 알려줘": [0.99, 0.05, 0.0],
+    "배터리 용량은?": [0.0, 1.0, 0.0],
+}
+
+
+class FakeRedisLists:
+    """In-memory stand-in for the Redis list commands the cache uses."""
+
+    def __init__(self):
+        self.lists = {}
+        self.expiry = {}
+        self.lock = threading.Lock()
+
+    def lrange(self, key, start, end):
+        values = self.lists.get(key, [])
+        return list(values[start:] if end == -1 else values[start:end + 1])
+
+    def pipeline(self, transaction=True):
+        return FakeRedisPipeline(self)
+
+
+class FakeRedisPipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def rpush(self, key, value):
+        self.commands.append(lambda: self.redis.lists.setdefault(key, []).append(value))
+
+    def ltrim(self, key, start, end):
+        self.commands.append(lambda: self.redis.lists.__setitem__(key, self.redis.lrange(key, start, end)))
+
+    def expire(self, key, seconds):
+        self.commands.append(lambda: self.redis.expiry.__setitem__(key, seconds))
+
+    def execute(self):
+        with self.redis.lock:
+            for command in self.commands:
+                command()
+
+
+class SemanticCacheTestCase(TestCase):
+    """Test case for the semantic response cache"""
+
+    def setUp(self):
+        self.redis = FakeRedisLists()
+        redis_patcher = patch('chat.semantic_cache._redis', return_value=self.redis)
+        redis_patcher.start()
+        self.addCleanup(redis_patcher.stop)
+        self.selection = {"reasoning_provider": "gemini", "generation_provider": "gemini"}
+        embeddings = MagicMock()
+        embeddings.embed_query.side_effect = lambda text: VECTORS[text]
+        patcher = patch('chat.semantic_cache.provider_manager.get_embedding_model', return_value=embeddings)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_paraphrase_hits_cache(self):
+        """A question within the cosine threshold reuses the stored answer"""
+        semantic_cache.store("갤럭시 S25 실버 가격", self.selection, {"response": "1199.99달러"}, "build-1")
+
+        hit = semantic_cache.lookup("갤럭시 S25 실버 가격 알려줘", self.selection, "build-1")
+
+        self.assertIsNotNone(hit)
+        self.assertEqual(hit["response"], "1199.99달러")
+        self.assertNotIn("embedding", hit)
+
+    def test_unrelated_question_misses(self):
+        """A dissimilar question does not match"""
+        semantic_cache.store("갤럭시 S25 실버 가격", self.selection, {"response": "1199.99달러"}, "build-1")
+
+        self.assertIsNone(semantic_cache.lookup("배터리 용량은?", self.selection, "build-1"))
+
+    def test_entries_are_scoped_by_selection_and_index(self):
+        """Other provider selections and index versions never share entries"""
+        semantic_cache.store("갤럭시 S25 실버 가격", self.selection, {"response": "1199.99달러"}, "build-1")
+        qwen = {"reasoning_provider": "qwen", "generation_provider": "gemini"}
+
+        self.assertIsNone(semantic_cache.lookup("갤럭시 S25 실버 가격", qwen, "build-1"))
+        self.assertIsNone(semantic_cache.lookup("갤럭시 S25 실버 가격", self.selection, "build-2"))
+
+    def test_concurrent_stores_keep_every_entry(self):
+        """Stores append atomically instead of rewriting the shared list"""
+        threads = [
+            threading.Thread(
+                target=semantic_cache.store,
+                args=("갤럭시 S25 실버 가격", self.selection, {"response": str(i)}, "build-1"),
+            )
+            for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        key = semantic_cache._key(self.selection, "build-1")
+        self.assertEqual(len(self.redis.lists[key]), 20)
+        self.assertEqual(self.redis.expiry[key], 3600)
+
+    @patch.dict('os.environ', {"SEMANTIC_CACHE_MAX_ENTRIES": "2"})
+    def test_store_keeps_newest_entries(self):
+        for answer in ("a", "b", "c"):
+            semantic_cache.store("갤럭시 S25 실버 가격", self.selection, {"response": answer}, "build-1")
+
+        hit = semantic_cache.lookup("갤럭시 S25 실버 가격", self.selection, "build-1")
+        key = semantic_cache._key(self.selection, "build-1")
+        self.assertEqual(len(self.redis.lists[key]), 2)
+        self.assertIn(hit["response"], {"b", "c"})
+
+    def test_redis_outage_is_a_miss(self):
+        with patch('chat.semantic_cache._redis', side_effect=ConnectionError("down")):
+            self.assertIsNone(semantic_cache.lookup("갤럭시 S25 실버 가격", self.selection, "build-1"))
+
+    def test_current_index_version_tracks_active_index(self):
+        """Only activating an index version changes the cache bucket"""
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root, ignore_errors=True)
+        with override_settings(VECTOR_STORE_PATH=root):
+            self.assertEqual(semantic_cache.current_index_version(), "legacy")
+            versions = IndexVersionStore(root)
+            active = versions.create_version()
+            versions.activate(active)
+            self.assertEqual(semantic_cache.current_index_version(), active)
+
+            # A build in progress (or one that failed) does not move the bucket
+            versions.create_version()
+            MetaDataManager.set("vector_build_latest", {"build_id": "def", "status": "started"})
+            self.assertEqual(semantic_cache.current_index_version(), active)
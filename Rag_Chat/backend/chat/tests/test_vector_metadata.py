@@ -0,0 +1,174 @@
+import importlib
+import json
+from unittest.mock import MagicMock, patch
+
+from django.apps import apps
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from langchain.schema import Document
+
+from ..models import MetaData, VectorDocument
+from ..utils import MetaDataManager
+from ..vector_metadata import VectorMetadataManager
+
+
+class VectorBatchMetadataTestCase(TestCase):
+    """Test case for batched document metadata upserts"""
+
+    def test_batch_metadata_uses_constant_number_of_queries(self):
+        documents = [Document(page_content=f"row {i}", metadata={"sheet": "Sheet1"}) for i in range(200)]
+
+        with CaptureQueriesContext(connection) as queries:
+            VectorMetadataManager.store_vector_batch_metadata(documents, "batch")
+
+        self.assertLess(len(queries), 20)
+        stored = VectorMetadataManager.get_document_metadata("batch_199")
+        self.assertEqual(stored["doc_index"], 199)
+        self.assertEqual(stored["batch"], "batch")
+        self.assertEqual(stored["content_length"], len("row 199"))
+
+    def test_batch_metadata_without_conflict_support_splits_insert_and_update(self):
+        VectorMetadataManager.store_vector_batch_metadata([Document(page_content="old", metadata={})], "batch")
+        documents = [Document(page_content=text, metadata={"sheet": "Sheet1"}) for text in ("new", "fresh")]
+
+        with patch.object(connection.features, "supports_update_conflicts_with_target", False):
+            VectorMetadataManager.store_vector_batch_metadata(documents, "batch")
+
+        self.assertEqual(VectorMetadataManager.get_document_metadata("batch_0")["content_length"], len("new"))
+        self.assertEqual(VectorMetadataManager.get_document_metadata("batch_1")["sheet"], "Sheet1")
+
+
+class VectorDocumentTestCase(TestCase):
+    """Test case for the indexed VectorDocument metadata table"""
+
+    def setUp(self):
+        documents = [
+            Document(page_content="Model: S25", metadata={"sheet": "Sheet1", "source": "excel", "color": "Silver"}),
+            Document(page_content="Model: S25+", metadata={"sheet": "Sheet2", "source": "excel", "color": "Navy"}),
+            Document(page_content="Model: S25 Ultra", metadata={"source": "csv", "color": "Silver"}),
+        ]
+        VectorMetadataManager.store_vector_batch_metadata(documents, "batch")
+
+    def test_metadata_round_trips_through_columns(self):
+        metadata = VectorMetadataManager.get_document_metadata("batch_0")
+
+        self.assertEqual(metadata, {
+            "sheet": "Sheet1", "source": "excel", "color": "Silver",
+            "batch": "batch", "doc_index": 0, "content_length": len("Model: S25"),
+        })
+        document = VectorDocument.objects.get(key="batch_0")
+        self.assertEqual(document.sheet, "Sheet1")
+        self.assertEqual(document.extra, {"color": "Silver"})
+
+    def test_find_filters_in_sql_on_columns_and_json(self):
+        with CaptureQueriesContext(connection) as queries:
+            results = VectorMetadataManager.find_documents_by_metadata({"source": "excel", "color": "Silver"})
+
+        self.assertEqual([result["doc_id"] for result in results], ["batch_0"])
+        self.assertEqual(len(queries), 1)
+
+    def test_update_and_delete(self):
+        VectorMetadataManager.update_document_metadata("batch_1", {"color": "Mint"})
+        self.assertEqual(VectorMetadataManager.get_document_metadata("batch_1")["color"], "Mint")
+
+        VectorMetadataManager.delete_document_metadata("batch_1")
+        self.assertEqual(VectorMetadataManager.get_document_metadata("batch_1"), {})
+
+    def test_migration_moves_legacy_key_value_rows(self):
+        migration = importlib.import_module("chat.migrations.0005_vectordocument")
+        MetaDataManager.set("vector_doc_legacy_0", {"batch": "legacy", "doc_index": 0, "sheet": "Sheet1", "color": "Gray"})
+
+        migration.copy_metadata_to_vector_documents(apps, None)
+
+        self.assertFalse(MetaData.objects.filter(key="vector_doc_legacy_0").exists())
+        self.assertEqual(
+            VectorMetadataManager.get_document_metadata("legacy_0"),
+            {"batch": "legacy", "doc_index": 0, "sheet": "Sheet1", "color": "Gray"},
+        )
+
+    def test_migration_keeps_unparseable_rows(self):
+        migration = importlib.import_module("chat.migrations.0005_vectordocument")
+        MetaData.objects.create(key="vector_doc_broken_0", json_value="{not json")
+        MetaDataManager.set("vector_doc_legacy_1", {"batch": "legacy"})
+
+        with self.assertLogs("chat.migrations.0005_vectordocument", level="WARNING"):
+            migration.copy_metadata_to_vector_documents(apps, None)
+
+        self.assertTrue(MetaData.objects.filter(key="vector_doc_broken_0").exists())
+        self.assertFalse(MetaData.objects.filter(key="vector_doc_legacy_1").exists())
+
+    def test_reverse_migration_shortens_keys_that_do_not_fit(self):
+        migration = importlib.import_module("chat.migrations.0005_vectordocument")
+        long_key = "csv_chunks_0f8fad5b-d9cb-469f-a165-70867728950e_17"
+        VectorDocument.objects.all().delete()
+        VectorMetadataManager.store_document_metadata(long_key, {"batch": "csv", "color": "Silver"})
+        VectorMetadataManager.store_document_metadata("short_0", {"batch": "csv"})
+
+        with self.assertLogs("chat.migrations.0005_vectordocument", level="WARNING"):
+            migration.copy_vector_documents_to_metadata(apps, None)
+
+        keys = set(MetaData.objects.filter(key__startswith="vector_doc_").values_list("key", flat=True))
+        self.assertIn("vector_doc_short_0", keys)
+        self.assertEqual(len(keys), 2)
+        self.assertTrue(all(len(key) <= MetaData._meta.get_field("key").max_length for key in keys))
+        restored = MetaData.objects.get(description__endswith=long_key)
+        self.assertEqual(json.loads(restored.json_value), {"batch": "csv", "color": "Silver"})
+
+    def test_full_file_path_source_fits_the_column(self):
+        source = "/srv/rag_chat/data/" + "galaxy_s25_catalogue/" * 10 + "products.csv"
+        VectorMetadataManager.store_document_metadata("csv_0", {"source": source})
+
+        self.assertEqual(VectorDocument.objects.get(key="csv_0").source, source)
+        self.assertEqual(VectorMetadataManager.find_documents_by_metadata({"source": source})[0]["doc_id"], "csv_0")
+
+
+class EnhancedVectorSearchTestCase(TestCase):
+    """Test case for enhanced search with batched metadata lookups"""
+
+    def setUp(self):
+        for i in range(5):
+            VectorMetadataManager.store_document_metadata(
+                f"excel_b_{i}", {"chunk_id": f"chunk_{i}", "sheet": "Sheet1", "price": 1000 + i}
+            )
+        self.vector_store = MagicMock()
+        self.vector_store.similarity_search_with_score.return_value = [
+            (Document(page_content=f"row {i}", metadata={"chunk_id": f"chunk_{i}", "image_path": f"{i}.png"}), 0.1 * i)
+            for i in range(5)
+        ]
+
+    @patch("chat.vector_metadata.RAGUtils.get_vector_store")
+    def test_metadata_fetched_in_one_query_with_scores(self, mock_get_vector_store):
+        mock_get_vector_store.return_value = self.vector_store
+
+        with CaptureQueriesContext(connection) as queries:
+            result = VectorMetadataManager.enhance_vector_search("price", k=5)
+
+        self.assertEqual(len(queries), 1)
+        self.vector_store.similarity_search_with_score.assert_called_once_with("price", k=5, filter=None)
+        self.assertEqual(result["image_paths"], [f"{i}.png" for i in range(5)])
+        enhanced = result["enhanced_metadata"]
+        self.assertEqual([item["score"] for item in enhanced], [0.1 * i for i in range(5)])
+        self.assertEqual([item["metadata"]["price"] for item in enhanced], [1000 + i for i in range(5)])
+
+    def test_results_without_stored_metadata_keep_their_own(self):
+        scored = [(Document(page_content="x", metadata={"chunk_id": "missing", "sheet": "S"}), 0.5)]
+
+        result = VectorMetadataManager.build_enhanced_context(scored)
+
+        self.assertEqual(result["enhanced_metadata"][0]["metadata"], {"chunk_id": "missing", "sheet": "S"})
+        self.assertEqual(result["enhanced_metadata"][0]["doc_id"], "missing")
+
+    @patch("chat.pipeline.modules.VectorMetadataManager.enhance_vector_search")
+    def test_retrieve_module_enhanced_mode(self, mock_enhance):
+        from ..pipeline.base import ModuleContext, ModuleError
+        from ..pipeline.modules import RetrieveModule
+
+        mock_enhance.return_value = {"context": "ctx", "image_paths": ["a.png"], "enhanced_metadata": []}
+        context = RetrieveModule(mode="enhanced", k=5).run(ModuleContext(question="q", session_id="s", user_id="u"))
+
+        mock_enhance.assert_called_once_with("q", k=5, metadata_filters=None)
+        self.assertEqual(context.context_text, "ctx")
+        self.assertEqual(context.extra["rag_metadata"]["enhanced_metadata"], [])
+        with self.assertRaises(ModuleError):
+            RetrieveModule(mode="unknown")
@@ -2,10 +2,17 @@ from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
-from unittest.mock import patch
+from unittest.mock import AsyncMock, MagicMock, patch
+from asgiref.sync import async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_started
+from django.db import close_old_connections
+import asyncio
 import json
+import os
 
 from ..models import User, Chat, RagData, SearchLog
+from ..pipeline.runner import DEFAULT_REGISTRY
 
 
 class SearchLogAPIViewTestCase(TestCase):
@@ -92,4 +99,336 @@ class SearchLogAPIViewTestCase(TestCase):
         response = self.client.get(url)
         
         self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
-        self.assertEqual(response.data['error'], "Failed to retrieve search logs")
\ No newline at end of file
+        self.assertEqual(response.data['error'], "Failed to retrieve search logs")
+
+class FakePipelineModulesMixin:
+    """Replace registered pipeline steps with mocks driven by ``PipelineRunner``"""
+
+    def setUp(self):
+        self.user = User.objects.create()
+        self.client = APIClient()
+        self.modules = {}
+        for name in ("router", "retrieve", "reasoning", "generation", "answer", "speculative"):
+            module_cls = MagicMock()
+            module_cls.return_value.name = name
+            module_cls.return_value.provides = DEFAULT_REGISTRY[name].provides
+            module_cls.return_value.run.side_effect = lambda context: context
+            self.modules[name] = module_cls
+        # The stream is driven by PipelineRunner, which builds steps from the registry
+        patcher = patch.dict('chat.pipeline.runner.DEFAULT_REGISTRY', self.modules)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        history_patcher = patch('chat.views.history_session_handler')
+        history_patcher.start()
+        self.addCleanup(history_patcher.stop)
+
+    def module(self, name):
+        return self.modules[name].return_value
+
+    def _fake_modules(self):
+        def retrieve(context):
+            context.context_text = "Galaxy S25 Silver 256GB"
+            context.images = ["silver_s25.png"]
+            context.extra["rag_metadata"] = {"image_paths": ["silver_s25.png"]}
+            return context
+
+        def stream(context):
+            for token in ["실버 ", "모델", "입니다."]:
+                yield token
+            context.response = "실버 모델입니다."
+
+        self.module("retrieve").run.side_effect = retrieve
+        self.module("generation").stream.side_effect = stream
+        self.module("answer").stream.side_effect = stream
+        self.module("speculative").stream.side_effect = stream
+
+    @staticmethod
+    def _events(body):
+        return [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+
+
+class ChatStreamAPIViewTestCase(FakePipelineModulesMixin, TestCase):
+    """Test case for the SSE streaming chat endpoint"""
+
+    def test_stream_emits_events_and_persists(self):
+        """Retrieval, reasoning and token events are streamed before rows are saved"""
+        self._fake_modules()
+
+        response = self.client.post(
+            reverse('chat-stream'),
+            {"question": "실버 모델?", "user_id": self.user.user_id},
+            format='json',
+        )
+        body = b"".join(response.streaming_content).decode("utf-8")
+
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(
+            self._events(body),
+            ["retrieval", "reasoning", "reasoning", "token", "token", "token", "done"],
+        )
+
+        chat = Chat.objects.get(user=self.user)
+        self.assertEqual(chat.response_text, "실버 모델입니다.")
+        self.assertEqual(chat.data.image_urls, ["silver_s25.png"])
+        self.assertTrue(SearchLog.objects.filter(question=chat).exists())
+
+    @patch('chat.pipeline.runner.get_default_hooks', return_value=[])
+    def test_stream_records_stage_timings(self, mock_hooks):
+        """Streamed answers get the same per-stage timings as the blocking path"""
+        self._fake_modules()
+        captured = {}
+        original = self.module("generation").stream.side_effect
+
+        def stream(context):
+            yield from original(context)
+            captured["context"] = context
+
+        self.module("generation").stream.side_effect = stream
+
+        response = self.client.post(
+            reverse('chat-stream'),
+            {"question": "실버 모델?", "user_id": self.user.user_id},
+            format='json',
+        )
+        b"".join(response.streaming_content)
+
+        self.assertEqual(
+            [record["module"] for record in captured["context"].extra["timings"]],
+            ["router", "retrieve", "reasoning", "generation"],
+        )
+
+    def test_accept_header_streams_from_chat_endpoint(self):
+        """The regular chat endpoint streams when the client asks for SSE"""
+        self._fake_modules()
+
+        response = self.client.post(
+            reverse('chat-create'),
+            {"question": "실버 모델?", "user_id": self.user.user_id},
+            format='json',
+            HTTP_ACCEPT='text/event-stream',
+        )
+
+        self.assertTrue(response.streaming)
+        body = b"".join(response.streaming_content).decode("utf-8")
+        self.assertIn('event: done', body)
+
+    def test_catalogue_answer_skips_llm_stages(self):
+        """A question answered by the router streams one token and no reasoning"""
+        def route(context):
+            context.context_text = "Model: Galaxy S25\nColor: Silver"
+            context.images = ["silver_s25.png"]
+            context.response = "네, 조건(Silver)에 맞는 모델이 있습니다:\n- Galaxy S25 256GB"
+            context.halted = True
+            return context
+
+        self.module("router").run.side_effect = route
+
+        response = self.client.post(
+            reverse('chat-stream'),
+            {"question": "실버 색상 있나요", "user_id": self.user.user_id},
+            format='json',
+        )
+        body = b"".join(response.streaming_content).decode("utf-8")
+
+        self.assertEqual(self._events(body), ["retrieval", "token", "done"])
+        self.module("retrieve").run.assert_not_called()
+        self.module("reasoning").run.assert_not_called()
+        self.module("generation").stream.assert_not_called()
+        self.assertTrue(Chat.objects.get(user=self.user).response_text.startswith("네, 조건(Silver)"))
+
+    @patch.dict('os.environ', {"PIPELINE_ANSWER_MODE": "single_call"})
+    def test_single_call_mode_reports_reasoning_status(self):
+        """Single-call mode streams from the combined module, which reports the reasoning status"""
+        self._fake_modules()
+
+        response = self.client.post(
+            reverse('chat-stream'),
+            {"question": "실버 모델?", "user_id": self.user.user_id},
+            format='json',
+        )
+        body = b"".join(response.streaming_content).decode("utf-8")
+
+        self.assertEqual(
+            self._events(body),
+            ["retrieval", "reasoning", "reasoning", "token", "token", "token", "done"],
+        )
+        self.assertLess(body.index('"started"'), body.index('"completed"'))
+        self.module("answer").stream.assert_called_once()
+        self.module("reasoning").run.assert_not_called()
+        self.assertEqual(Chat.objects.get(user=self.user).response_text, "실버 모델입니다.")
+
+    @patch.dict('os.environ', {"PIPELINE_ANSWER_MODE": "speculative"})
+    def test_speculative_mode_reports_reasoning_status(self):
+        """The speculative step provides reasoning, so its status is streamed too"""
+        self._fake_modules()
+
+        response = self.client.post(
+            reverse('chat-stream'),
+            {"question": "실버 모델?", "user_id": self.user.user_id},
+            format='json',
+        )
+        body = b"".join(response.streaming_content).decode("utf-8")
+
+        self.assertEqual(
+            self._events(body),
+            ["retrieval", "reasoning", "reasoning", "token", "token", "token", "done"],
+        )
+        self.module("speculative").stream.assert_called_once()
+
+
+class ChatStreamASGITestCase(FakePipelineModulesMixin, TestCase):
+    """Test case for SSE streaming when served through the ASGI handler"""
+
+    def setUp(self):
+        super().setUp()
+        # Like django.test.AsyncClient: keep the test transaction's connection open
+        request_started.disconnect(close_old_connections)
+        self.addCleanup(request_started.connect, close_old_connections)
+
+    def _post_asgi(self, path, payload, on_body):
+        body = json.dumps(payload).encode()
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "POST",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"",
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"host", b"testserver"),
+            ],
+            "client": ("127.0.0.1", 1234),
+            "server": ("testserver", 80),
+        }
+        received = []
+
+        async def receive():
+            if received:
+                await asyncio.sleep(3600)
+            received.append(True)
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                on_body(message.get("body", b""), message.get("more_body", False))
+
+        # async_to_sync keeps thread-sensitive ORM calls on the test thread
+        async_to_sync(ASGIHandler())(scope, receive, send)
+
+    def test_first_token_arrives_before_answer_finishes(self):
+        """Under ASGI each SSE frame is sent as soon as it is produced"""
+        self._fake_modules()
+        first_token_sent = asyncio.Event()
+        chunks = []
+
+        async def retrieve(context):
+            context.context_text = "Galaxy S25 Silver 256GB"
+            return context
+
+        async def astream(context):
+            yield "실버 "
+            # Only completes if the first token already reached the client
+            await asyncio.wait_for(first_token_sent.wait(), timeout=2)
+            yield "모델입니다."
+            context.response = "실버 모델입니다."
+
+        def on_body(body, more_body):
+            chunks.append((body, more_body))
+            if b"event: token" in body:
+                first_token_sent.set()
+
+        self.module("router").arun = AsyncMock(side_effect=lambda context: context)
+        self.module("retrieve").arun = AsyncMock(side_effect=retrieve)
+        self.module("reasoning").arun = AsyncMock(side_effect=lambda context: context)
+        self.module("generation").astream.side_effect = astream
+
+        self._post_asgi(reverse('chat-stream'), {"question": "실버 모델?", "user_id": self.user.user_id}, on_body)
+
+        body = b"".join(chunk for chunk, _ in chunks).decode("utf-8")
+        self.assertEqual(
+            self._events(body),
+            ["retrieval", "reasoning", "reasoning", "token", "token", "done"],
+        )
+        # The first token went out in its own message while the body was still open
+        first_token = next(index for index, (chunk, _) in enumerate(chunks) if b"event: token" in chunk)
+        self.assertTrue(chunks[first_token][1])
+        self.assertNotIn("모델입니다".encode(), chunks[first_token][0])
+        self.assertEqual(Chat.objects.get(user=self.user).response_text, "실버 모델입니다.")
+
+
+class ChatAsyncViewTestCase(TestCase):
+    """Test case for the ASGI-native chat endpoint"""
+
+    def setUp(self):
+        self.user = User.objects.create()
+
+    @patch('chat.views.history_session_handler')
+    @patch('chat.views.PipelineRunner.arun')
+    def test_async_chat_awaits_pipeline(self, mock_arun, mock_history):
+        """The async view awaits PipelineRunner.arun and persists the answer"""
+        async def arun(context):
+            context.context_text = "Galaxy S25"
+            context.response = "답변"
+            return context
+
+        mock_arun.side_effect = arun
+
+        response = self.client.post(
+            reverse('chat-async'),
+            data=json.dumps({"question": "질문", "user_id": self.user.user_id}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["response"], "답변")
+        self.assertEqual(Chat.objects.get(user=self.user).response_text, "답변")
+
+    @patch.dict(os.environ, {"SEMANTIC_CACHE_ENABLED": "true"})
+    @patch('chat.views.semantic_cache.lookup')
+    @patch('chat.views.history_session_handler')
+    @patch('chat.views.PipelineRunner.arun')
+    def test_async_chat_serves_semantic_cache_hits(self, mock_arun, mock_history, mock_lookup):
+        """A cached answer skips the pipeline, as in the sync view"""
+        mock_lookup.return_value = {"response": "캐시 답변", "context": "Galaxy S25", "images": []}
+
+        response = self.client.post(
+            reverse('chat-async'),
+            data=json.dumps({"question": "질문", "user_id": self.user.user_id}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["response"], "캐시 답변")
+        self.assertTrue(response.json()["cached"])
+        mock_arun.assert_not_called()
+        self.assertEqual(Chat.objects.get(user=self.user).response_text, "캐시 답변")
+
+    @patch.dict(os.environ, {"SEMANTIC_CACHE_ENABLED": "true", "PIPELINE_TIMING_HEADER": "true"})
+    @patch('chat.views.semantic_cache.store')
+    @patch('chat.views.semantic_cache.lookup', return_value=None)
+    @patch('chat.views.history_session_handler')
+    @patch('chat.views.PipelineRunner.arun')
+    def test_async_chat_stores_answer_and_reports_timings(self, mock_arun, mock_history, mock_lookup, mock_store):
+        """Fresh answers are cached and stage timings are exposed"""
+        async def arun(context):
+            context.context_text = "Galaxy S25"
+            context.response = "답변"
+            context.extra["timings"] = [{"module": "retrieve", "duration_ms": 12.5}]
+            return context
+
+        mock_arun.side_effect = arun
+
+        response = self.client.post(
+            reverse('chat-async'),
+            data=json.dumps({"question": "질문", "user_id": self.user.user_id}),
+            content_type='application/json',
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.json()["cached"])
+        mock_store.assert_called_once()
+        self.assertEqual(response["Server-Timing"], "retrieve;dur=12.5")
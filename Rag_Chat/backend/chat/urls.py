@@ -3,11 +3,16 @@ from . import views
 
 urlpatterns = [
     path("chat/", views.ChatAPIView.as_view(), name='chat-create'),
+    path("chat/stream/", views.ChatStreamAPIView.as_view(), name='chat-stream'),
+    path("chat/async/", views.ChatAsyncView.as_view(), name='chat-async'),
     path("chat-user/", views.ChatUserAPIView.as_view(), name='chat-user'),
     path("chat-rag/", views.ChatRagAPIView.as_view(), name='chat-rag'),
+    path("ingest-jobs/<str:job_id>/", views.IngestionJobAPIView.as_view(), name='ingest-job'),
     path("update-activity/", views.UpdateActivityAPIView.as_view(), name='update-activity'),
     path("providers/", views.ProviderConfigAPIView.as_view(), name='provider-config'),
+    path("providers/health/", views.ProviderHealthAPIView.as_view(), name='provider-health'),
     path("search-logs/", views.SearchLogAPIView.as_view(), name='search-logs'),
+    path("metrics/", views.PipelineMetricsAPIView.as_view(), name='pipeline-metrics'),
     
     # Metadata endpoints
     path("metadata/", views.MetaDataAPIView.as_view(), name='metadata-list'),
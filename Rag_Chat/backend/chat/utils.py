@@ -4,12 +4,51 @@ from langchain.schema import Document
 import logging
 import os
 import json
+import uuid
 from django.utils.timezone import now
 
 from .providers import provider_manager
+from .retrieval_filters import build_where, matches_filters
 
 logger = logging.getLogger(__name__)
 
+def bulk_upsert(model, rows: List[Any], update_fields: List[str], batch_size: int = 500) -> None:
+    """
+    Insert rows or update them when their primary key already exists,
+    using batched statements inside one transaction
+    """
+    from django.db import connection, transaction
+    
+    if not rows:
+        return
+    pk_name = model._meta.pk.name
+    with transaction.atomic():
+        if connection.features.supports_update_conflicts_with_target:
+            model.objects.bulk_create(
+                rows,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=[pk_name],
+                update_fields=update_fields,
+            )
+            return
+        
+        # Backends without ON CONFLICT: split into inserts and updates
+        keys = [row.pk for row in rows]
+        existing = set()
+        for start in range(0, len(keys), batch_size):
+            existing.update(
+                model.objects.filter(pk__in=keys[start:start + batch_size]).values_list(pk_name, flat=True)
+            )
+        updates = [row for row in rows if row.pk in existing]
+        for field in model._meta.concrete_fields:
+            # bulk_update skips pre_save, so apply auto_now explicitly
+            if getattr(field, "auto_now", False) and field.name in update_fields:
+                for row in updates:
+                    setattr(row, field.attname, now())
+        model.objects.bulk_create([row for row in rows if row.pk not in existing], batch_size=batch_size)
+        model.objects.bulk_update(updates, update_fields, batch_size=batch_size)
+
 class MetaDataManager:
     """Utility class for managing system metadata"""
     
@@ -51,28 +90,7 @@ class MetaDataManager:
         from .models import MetaData
         try:
             metadata, created = MetaData.objects.get_or_create(key=key)
-            
-            # Reset all value fields
-            metadata.string_value = None
-            metadata.integer_value = None
-            metadata.float_value = None
-            metadata.boolean_value = None
-            metadata.json_value = None
-            
-            # Set appropriate field based on value type
-            if isinstance(value, str):
-                metadata.string_value = value
-            elif isinstance(value, int):
-                metadata.integer_value = value
-            elif isinstance(value, float):
-                metadata.float_value = value
-            elif isinstance(value, bool):
-                metadata.boolean_value = value
-            elif value is None:
-                pass  # All fields are already None
-            else:
-                # Store as JSON for complex types
-                metadata.set_json(value)
+            MetaDataManager._assign_value(metadata, value)
             
             # Update description if provided
             if description is not None:
@@ -84,6 +102,31 @@ class MetaDataManager:
             logger.error(f"Error setting metadata for key '{key}': {str(e)}")
             return False
     
+    @staticmethod
+    def _assign_value(metadata, value: Any) -> None:
+        """Store value in the typed column that matches its Python type"""
+        # Reset all value fields
+        metadata.string_value = None
+        metadata.integer_value = None
+        metadata.float_value = None
+        metadata.boolean_value = None
+        metadata.json_value = None
+        
+        # Set appropriate field based on value type
+        if isinstance(value, str):
+            metadata.string_value = value
+        elif isinstance(value, int):
+            metadata.integer_value = value
+        elif isinstance(value, float):
+            metadata.float_value = value
+        elif isinstance(value, bool):
+            metadata.boolean_value = value
+        elif value is None:
+            pass  # All fields are already None
+        else:
+            # Store as JSON for complex types
+            metadata.set_json(value)
+    
     @staticmethod
     def delete(key: str) -> bool:
         """Delete metadata entry by key"""
@@ -168,13 +211,20 @@ class RAGUtils:
         }
     
     @staticmethod
-    def get_rag_context(question: str, k: int = 3) -> Dict[str, Any]:
+    def _search_kwargs(filters: Optional[Dict[str, List[str]]]) -> Dict[str, Any]:
+        """Chroma ``filter`` argument for normalised metadata filters, if any"""
+        where = build_where(filters or {})
+        return {"filter": where} if where else {}
+    
+    @staticmethod
+    def get_rag_context(question: str, k: int = 3, filters: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
         """
-        Retrieve RAG context for a given question with improved error handling
+        Retrieve RAG context for a given question with improved error handling.
+        ``filters`` ({metadata_key: [values]}) are applied inside Chroma
         """
         try:
             vector_store = RAGUtils.get_vector_store()
-            search_results = vector_store.similarity_search(question, k=k)
+            search_results = vector_store.similarity_search(question, k=k, **RAGUtils._search_kwargs(filters))
             return RAGUtils.process_search_results(search_results)
         except Exception as e:
             logger.error(f"Error in get_rag_context: {str(e)}")
@@ -184,12 +234,173 @@ class RAGUtils:
             }
     
     @staticmethod
-    def create_vector_store_from_documents(documents: List[Document]):
+    async def aget_rag_context(
+        question: str, k: int = 3, filters: Optional[Dict[str, List[str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of get_rag_context using the vector store's async search
+        """
+        try:
+            vector_store = RAGUtils.get_vector_store()
+            search_results = await vector_store.asimilarity_search(
+                question, k=k, **RAGUtils._search_kwargs(filters)
+            )
+            return RAGUtils.process_search_results(search_results)
+        except Exception as e:
+            logger.error(f"Error in aget_rag_context: {str(e)}")
+            return {
+                "context": "",
+                "image_paths": []
+            }
+    
+    @staticmethod
+    def _fuse_hybrid_results(
+        question: str,
+        dense_results: List[Document],
+        k: int,
+        fetch_k: int,
+        filters: Optional[Dict[str, List[str]]] = None,
+    ) -> Dict[str, Any]:
+        """Fuse dense results with the BM25 ranking using reciprocal rank fusion"""
+        from .providers.lexical_index import reciprocal_rank_fusion
+        
+        lexical_index = provider_manager.get_lexical_index()
+        if lexical_index is None:
+            return RAGUtils.process_search_results(dense_results[:k])
+        
+        # Filters are applied after BM25 scoring, so rank every match first
+        candidates = lexical_index.search(question, k=len(lexical_index) if filters else fetch_k)
+        lexical_results = [
+            document for document, _ in candidates
+            if not filters or matches_filters(document.metadata, filters)
+        ][:fetch_k]
+        fused = reciprocal_rank_fusion(
+            [dense_results, lexical_results],
+            k=int(os.getenv("HYBRID_RRF_K", "60")),
+            limit=k,
+        )
+        return RAGUtils.process_search_results([document for document, _ in fused])
+    
+    @staticmethod
+    def get_hybrid_rag_context(
+        question: str,
+        k: int = 3,
+        fetch_k: Optional[int] = None,
+        filters: Optional[Dict[str, List[str]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Retrieve RAG context with BM25 + vector search fused by reciprocal rank.
+        Each retriever contributes its top ``fetch_k`` (HYBRID_FETCH_K) results
+        """
+        try:
+            fetch_k = fetch_k or int(os.getenv("HYBRID_FETCH_K", "20"))
+            vector_store = RAGUtils.get_vector_store()
+            dense_results = vector_store.similarity_search(question, k=fetch_k, **RAGUtils._search_kwargs(filters))
+            return RAGUtils._fuse_hybrid_results(question, dense_results, k, fetch_k, filters)
+        except Exception as e:
+            logger.error(f"Error in get_hybrid_rag_context: {str(e)}")
+            return {
+                "context": "",
+                "image_paths": []
+            }
+    
+    @staticmethod
+    async def aget_hybrid_rag_context(
+        question: str,
+        k: int = 3,
+        fetch_k: Optional[int] = None,
+        filters: Optional[Dict[str, List[str]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Async variant of get_hybrid_rag_context using the vector store's async search
+        """
+        try:
+            fetch_k = fetch_k or int(os.getenv("HYBRID_FETCH_K", "20"))
+            vector_store = RAGUtils.get_vector_store()
+            dense_results = await vector_store.asimilarity_search(
+                question, k=fetch_k, **RAGUtils._search_kwargs(filters)
+            )
+            return RAGUtils._fuse_hybrid_results(question, dense_results, k, fetch_k, filters)
+        except Exception as e:
+            logger.error(f"Error in aget_hybrid_rag_context: {str(e)}")
+            return {
+                "context": "",
+                "image_paths": []
+            }
+    
+    @staticmethod
+    def sync_vector_store_incrementally(documents: List[Document], progress_callback=None, source=None):
+        """Embed only new or changed chunks into a new index version and activate it.
+
+        With ``source`` only that ingestion source's chunks are synced.
+        """
+        from .indexing import sync_index_version
+
+        try:
+            result, _ = sync_index_version(documents, progress_callback=progress_callback, source=source)
+            return result
+        except Exception as e:
+            logger.error(f"Error syncing vector store: {str(e)}")
+            raise
+
+    @staticmethod
+    def rebuild_vector_store_source(documents: List[Document], source, progress_callback=None):
+        """Re-embed one source into a copy of the active index, keeping the other sources"""
+        from .indexing import sync_index_version
+
+        try:
+            result, vector_store = sync_index_version(
+                documents, progress_callback=progress_callback, source=source, full=True
+            )
+            logger.info(f"Rebuilt {source} chunks; vector store has {vector_store._collection.count()} documents")
+            return result
+        except Exception as e:
+            logger.error(f"Error rebuilding {source} vector store chunks: {str(e)}")
+            raise
+
+    @staticmethod
+    def create_vector_store_from_documents(documents: List[Document], progress_callback=None):
         """Create and persist a vector store from documents"""
         try:
-            vector_store = provider_manager.create_vector_store_from_documents(documents)
+            vector_store = provider_manager.create_vector_store_from_documents(
+                documents, progress_callback=progress_callback
+            )
             logger.info(f"Vector store created with {vector_store._collection.count()} documents")
             return vector_store
         except Exception as e:
             logger.error(f"Error creating vector store: {str(e)}")
             raise
+
+    @staticmethod
+    def record_vector_build(documents: List[Document], incremental: bool = False, progress_callback=None, source=None):
+        """
+        Build (or incrementally sync) the vector store and record the build.
+        Returns the incremental sync summary, or None for a full rebuild.
+        """
+        if incremental:
+            result = RAGUtils.sync_vector_store_incrementally(documents, progress_callback, source=source)
+            if not result.changed:
+                # No new index version was activated, so keep the previous build record
+                return result.as_dict()
+        elif source:
+            # A full build of one source must not drop the other sources' chunks
+            RAGUtils.rebuild_vector_store_source(documents, source, progress_callback)
+            result = None
+        else:
+            RAGUtils.create_vector_store_from_documents(documents, progress_callback)
+            result = None
+
+        # Record the build; the semantic cache rolls over with the activated index version
+        MetaDataManager.set(
+            key="vector_build_latest",
+            value={
+                "build_id": str(uuid.uuid4()),
+                "end_time": now().isoformat(),
+                "status": "completed",
+                "chunk_count": len(documents),
+                "vector_store_path": provider_manager.get_vector_store_path(),
+                "incremental": incremental,
+            },
+            description="Latest vector store build information"
+        )
+        return result.as_dict() if result else None
@@ -1,8 +1,11 @@
 from typing import Dict, Any, List, Optional, Union
 import logging
+from asgiref.sync import sync_to_async
 from django.db import transaction
-from .models import MetaData, RagData
-from .utils import MetaDataManager, RAGUtils
+from django.db.models import Q
+from .models import MetaData, RagData, VectorDocument
+from .retrieval_filters import build_where
+from .utils import MetaDataManager, RAGUtils, bulk_upsert
 import json
 from langchain.schema import Document
 
@@ -14,7 +17,8 @@ class VectorMetadataManager:
     This helps optimize search performance by storing metadata separately.
     """
     
-    # Constants for metadata key prefixes
+    # Constants for metadata key prefixes (document metadata lives in
+    # VectorDocument; DOC_PREFIX is the pre-0005 MetaData key prefix)
     DOC_PREFIX = "vector_doc_"
     INDEX_PREFIX = "vector_index_"
     STATS_PREFIX = "vector_stats_"
@@ -31,17 +35,18 @@ class VectorMetadataManager:
         Args:
             doc_id: Document ID
             metadata: Dictionary of metadata to store
-            description: Optional description
+            description: Unused; kept for backwards compatibility
             
         Returns:
             bool: Success status
         """
-        key = f"{VectorMetadataManager.DOC_PREFIX}{doc_id}"
-        return MetaDataManager.set(
-            key=key,
-            value=metadata,
-            description=description or f"Vector document metadata for {doc_id}"
-        )
+        try:
+            document = VectorDocument.from_metadata(str(doc_id), metadata)
+            document.save()
+            return True
+        except Exception as e:
+            logger.error(f"Error storing document metadata for '{doc_id}': {str(e)}")
+            return False
     
     @staticmethod
     def get_document_metadata(doc_id: Union[str, int]) -> Dict[str, Any]:
@@ -54,9 +59,13 @@ class VectorMetadataManager:
         Returns:
             Dict containing document metadata or empty dict if not found
         """
-        key = f"{VectorMetadataManager.DOC_PREFIX}{doc_id}"
-        result = MetaDataManager.get(key, {})
-        return result if result is not None else {}
+        try:
+            return VectorDocument.objects.get(key=str(doc_id)).as_metadata()
+        except VectorDocument.DoesNotExist:
+            return {}
+        except Exception as e:
+            logger.error(f"Error retrieving document metadata for '{doc_id}': {str(e)}")
+            return {}
     
     @staticmethod
     def update_document_metadata(
@@ -73,20 +82,12 @@ class VectorMetadataManager:
         Returns:
             bool: Success status
         """
-        key = f"{VectorMetadataManager.DOC_PREFIX}{doc_id}"
-        current_metadata = MetaDataManager.get(key, {})
-        
-        if current_metadata is None:
-            current_metadata = {}
+        current_metadata = VectorMetadataManager.get_document_metadata(doc_id)
             
         # Update metadata with new values
         current_metadata.update(metadata_updates)
         
-        return MetaDataManager.set(
-            key=key,
-            value=current_metadata,
-            description=f"Vector document metadata for {doc_id}"
-        )
+        return VectorMetadataManager.store_document_metadata(doc_id, current_metadata)
     
     @staticmethod
     def delete_document_metadata(doc_id: Union[str, int]) -> bool:
@@ -99,8 +100,12 @@ class VectorMetadataManager:
         Returns:
             bool: Success status
         """
-        key = f"{VectorMetadataManager.DOC_PREFIX}{doc_id}"
-        return MetaDataManager.delete(key)
+        try:
+            VectorDocument.objects.filter(key=str(doc_id)).delete()
+            return True
+        except Exception as e:
+            logger.error(f"Error deleting document metadata for '{doc_id}': {str(e)}")
+            return False
     
     @staticmethod
     def create_search_index(index_name: str, index_data: Dict[str, Any]) -> bool:
@@ -178,7 +183,8 @@ class VectorMetadataManager:
     ) -> bool:
         """
         Store metadata for a batch of vector documents.
-        This method efficiently stores metadata for multiple documents.
+        Document rows are upserted into VectorDocument in batches, so a batch
+        costs a handful of queries instead of two or three per document.
         
         Args:
             documents: List of Langchain Document objects
@@ -201,7 +207,8 @@ class VectorMetadataManager:
                 description=f"Metadata for document batch {batch_name}"
             )
             
-            # Store individual document metadata
+            # Store individual document metadata with batched upserts
+            rows = []
             for i, doc in enumerate(documents):
                 doc_id = f"{batch_name}_{i}"
                 
@@ -213,11 +220,15 @@ class VectorMetadataManager:
                 doc_metadata["doc_index"] = i
                 doc_metadata["content_length"] = len(doc.page_content)
                 
-                # Store metadata
-                VectorMetadataManager.store_document_metadata(
-                    doc_id=doc_id,
-                    metadata=doc_metadata
-                )
+                rows.append(VectorDocument.from_metadata(doc_id, doc_metadata))
+            
+            bulk_upsert(
+                VectorDocument,
+                rows,
+                update_fields=[
+                    *VectorDocument.TEXT_FIELDS, *VectorDocument.INTEGER_FIELDS, "extra", "last_updated",
+                ],
+            )
             
             return batch_success
         except Exception as e:
@@ -228,7 +239,8 @@ class VectorMetadataManager:
     def find_documents_by_metadata(criteria: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
         Find documents based on metadata criteria.
-        This performs a database query rather than a vector search.
+        This performs a database query rather than a vector search: typed
+        attributes use their indexed columns, other keys use JSON lookups.
         
         Args:
             criteria: Dictionary of metadata criteria to match
@@ -237,38 +249,99 @@ class VectorMetadataManager:
             List of matching document metadata
         """
         try:
-            from .models import MetaData
-            
-            # Get all document metadata entries
-            doc_metadata_entries = MetaData.objects.filter(
-                key__startswith=VectorMetadataManager.DOC_PREFIX
-            )
-            
-            # Filter based on criteria
-            results = []
-            for entry in doc_metadata_entries:
-                metadata = entry.get_json()
-                if metadata is None:
-                    continue
-                    
-                # Check if all criteria match
-                matches = True
-                for key, value in criteria.items():
-                    if key not in metadata or metadata[key] != value:
-                        matches = False
-                        break
-                        
-                if matches:
-                    results.append({
-                        "doc_id": entry.key.replace(VectorMetadataManager.DOC_PREFIX, ""),
-                        "metadata": metadata
-                    })
+            filters = {}
+            for key, value in criteria.items():
+                if key in VectorDocument.TEXT_FIELDS + VectorDocument.INTEGER_FIELDS:
+                    filters[key] = value
+                else:
+                    filters[f"extra__{key}"] = value
             
-            return results
+            return [
+                {"doc_id": document.key, "metadata": document.as_metadata()}
+                for document in VectorDocument.objects.filter(**filters)
+            ]
         except Exception as e:
             logger.error(f"Error finding documents by metadata: {str(e)}")
             return []
     
+    @staticmethod
+    def _result_keys(document: Document) -> List[str]:
+        """Return the identifiers a search result may be stored under, most specific first"""
+        metadata = document.metadata or {}
+        keys = [getattr(document, 'id', None), metadata.get('id'), metadata.get('chunk_id'), metadata.get('doc_id')]
+        return [str(key) for key in keys if key]
+    
+    @staticmethod
+    def get_metadata_for_results(search_results: List[Document]) -> List[Dict[str, Any]]:
+        """
+        Look up stored metadata for a list of search results in a single query.
+        
+        Args:
+            search_results: Documents returned by the vector store
+            
+        Returns:
+            One metadata dict per result (empty when nothing is stored)
+        """
+        result_keys = [VectorMetadataManager._result_keys(result) for result in search_results]
+        wanted = {key for keys in result_keys for key in keys}
+        if not wanted:
+            return [{} for _ in search_results]
+        
+        rows = VectorDocument.objects.filter(
+            Q(key__in=wanted) | Q(chunk_id__in=wanted) | Q(doc_id__in=wanted)
+        )
+        by_key = {}
+        for row in rows:
+            metadata = row.as_metadata()
+            # Exact keys win over chunk_id, which wins over the coarser doc_id
+            by_key[row.key] = metadata
+            if row.chunk_id:
+                by_key.setdefault(("chunk_id", row.chunk_id), metadata)
+            if row.doc_id:
+                by_key.setdefault(("doc_id", row.doc_id), metadata)
+        
+        matched = []
+        for keys in result_keys:
+            metadata = {}
+            for key in keys:
+                metadata = by_key.get(key) or by_key.get(("chunk_id", key)) or by_key.get(("doc_id", key)) or {}
+                if metadata:
+                    break
+            matched.append(metadata)
+        return matched
+    
+    @staticmethod
+    def build_enhanced_context(scored_results: List[Any]) -> Dict[str, Any]:
+        """
+        Build the enhanced search response from ``(document, score)`` pairs.
+        
+        Args:
+            scored_results: Output of ``similarity_search_with_score``
+            
+        Returns:
+            Dict with context, image paths and per-result metadata and score
+        """
+        documents = [document for document, _ in scored_results]
+        base_results = RAGUtils.process_search_results(documents)
+        stored_metadata = VectorMetadataManager.get_metadata_for_results(documents)
+        
+        enhanced_metadata = []
+        for i, ((document, score), stored) in enumerate(zip(scored_results, stored_metadata)):
+            keys = VectorMetadataManager._result_keys(document)
+            enhanced_metadata.append({
+                "doc_id": keys[0] if keys else None,
+                "position": i,
+                # Chroma returns a distance: lower is more similar
+                "score": float(score) if score is not None else None,
+                "metadata": {**(document.metadata or {}), **stored},
+            })
+        
+        return {
+            "context": base_results["context"],
+            "image_paths": base_results["image_paths"],
+            "enhanced_metadata": enhanced_metadata
+        }
+    
     @staticmethod
     def enhance_vector_search(
         question: str,
@@ -277,51 +350,43 @@ class VectorMetadataManager:
     ) -> Dict[str, Any]:
         """
         Enhanced vector search using separate metadata.
+        Results carry their similarity distance, and their stored metadata is
+        fetched with one query regardless of ``k``.
         
         Args:
             question: Search query
             k: Number of results
-            metadata_filters: Optional metadata criteria to filter results
+            metadata_filters: Optional {metadata_key: [values]} filters applied inside Chroma
             
         Returns:
             Dict containing search results and enhanced metadata
         """
         try:
-            # Get basic search results
             vector_store = RAGUtils.get_vector_store()
-            search_results = vector_store.similarity_search(question, k=k)
-            
-            # Process results as usual
-            base_results = RAGUtils.process_search_results(search_results)
-            
-            # Enhance with additional metadata
-            enhanced_metadata = []
-            for i, result in enumerate(search_results):
-                # Try to identify the document ID
-                doc_id = None
-                if hasattr(result, 'id'):
-                    doc_id = result.id
-                elif 'id' in result.metadata:
-                    doc_id = result.metadata['id']
-                
-                # If we have a doc ID, get its full metadata
-                if doc_id:
-                    enhanced_meta = VectorMetadataManager.get_document_metadata(doc_id)
-                    if enhanced_meta:
-                        enhanced_metadata.append({
-                            "doc_id": doc_id,
-                            "position": i,
-                            "score": getattr(result, 'score', None),
-                            "metadata": enhanced_meta
-                        })
-            
-            # Combine results
-            return {
-                "context": base_results["context"],
-                "image_paths": base_results["image_paths"],
-                "enhanced_metadata": enhanced_metadata
-            }
+            scored_results = vector_store.similarity_search_with_score(
+                question, k=k, filter=build_where(metadata_filters or {})
+            )
+            return VectorMetadataManager.build_enhanced_context(scored_results)
         except Exception as e:
             logger.error(f"Error in enhanced vector search: {str(e)}")
             # Fall back to basic results
-            return RAGUtils.get_rag_context(question, k)
\ No newline at end of file
+            return RAGUtils.get_rag_context(question, k, filters=metadata_filters)
+    
+    @staticmethod
+    async def aenhance_vector_search(
+        question: str,
+        k: int = 3,
+        metadata_filters: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of enhance_vector_search using the vector store's async search
+        """
+        try:
+            vector_store = RAGUtils.get_vector_store()
+            scored_results = await vector_store.asimilarity_search_with_score(
+                question, k=k, filter=build_where(metadata_filters or {})
+            )
+            return await sync_to_async(VectorMetadataManager.build_enhanced_context)(scored_results)
+        except Exception as e:
+            logger.error(f"Error in async enhanced vector search: {str(e)}")
+            return await RAGUtils.aget_rag_context(question, k, filters=metadata_filters)
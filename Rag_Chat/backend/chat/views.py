@@ -4,22 +4,34 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.throttling import UserRateThrottle
-from typing import List, Dict, Any
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views import View
+from django.urls import reverse
+from asgiref.sync import sync_to_async
+from typing import Any, Collection, Dict, List
 from pydantic import BaseModel, Field
 from langchain_core.messages import BaseMessage, AIMessage, HumanMessage
 from langchain_core.chat_history import BaseChatMessageHistory
 from .models import User, Chat, RagData, SearchLog
 from .serializers import ChatSerializer, RagDataSerializer, SearchLogSerializer
 import logging
-from langchain.schema import Document
-from langchain_community.document_loaders import CSVLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from pathlib import Path
-import pandas as pd
 import os
-from .redis_manager import RedisMessageManager
+import json
+from .redis_manager import RedisConnectionManager, RedisMessageManager
 from .provider_overrides import set_override as set_provider_override, get_override as get_provider_override, clear_override as clear_provider_override
-from .pipeline import ModuleContext, PipelineRunner, ModuleError
+from .pipeline import (
+    ModuleContext,
+    PipelineRunner,
+    ModuleError,
+    metrics_hook,
+    server_timing_header,
+)
+from . import semantic_cache
+from .retrieval_filters import normalize_filters
 
 # Ensure Google Gemini API key is set
 os.environ["GOOGLE_API_KEY"] = settings.GOOGLE_API_KEY
@@ -27,9 +39,9 @@ os.environ["GOOGLE_API_KEY"] = settings.GOOGLE_API_KEY
 logger = logging.getLogger(__name__)
 
 def get_message_store() -> RedisMessageManager:
-    """Get or create a Redis message manager instance with error handling"""
+    """Get the shared Redis message manager instance with error handling"""
     try:
-        return RedisMessageManager()
+        return RedisMessageManager.get_instance()
     except Exception as e:
         logger.error(f"Failed to initialize RedisMessageManager: {str(e)}")
         raise
@@ -48,10 +60,10 @@ class RedisMessageHistory(BaseChatMessageHistory):
     
     @property
     def messages(self) -> List[BaseMessage]:
-        """Return a list of messages from Redis"""
+        """Return the recent message window from Redis, oldest first"""
         try:
             message_store = get_message_store()
-            raw_messages = message_store.get_messages(self.user_id)
+            raw_messages = message_store.get_recent_messages(self.user_id)
             
             # Convert raw messages to LangChain BaseMessage objects
             result = []
@@ -92,9 +104,270 @@ class ChatRateThrottle(UserRateThrottle):
 
 from rest_framework.permissions import AllowAny
 
+
+class EventStreamRenderer(BaseRenderer):
+    """Allow DRF content negotiation to accept ``text/event-stream``.
+
+    Streaming responses bypass renderers; this only renders error payloads
+    returned before the stream starts.
+    """
+
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return sse_event("error", data).encode(self.charset)
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format a single Server-Sent Events frame."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+def pipeline_event_frame(
+    pipeline_context, event: str, payload: str, reasoning_steps: Collection[str] = ("reasoning",)
+):
+    """SSE frame for a ``PipelineRunner.stream`` event, or None for silent ones.
+
+    Retrieval results are sent once the retrieve step (or a step that answered
+    early, like the catalogue router) ends; steps that provide ``reasoning``
+    (``PipelineRunner.steps_providing``) report its status, completing it
+    before their first answer token; tokens are forwarded as they arrive.
+    """
+    if event == "token":
+        frame = sse_event("token", {"text": payload})
+        if pipeline_context.extra.pop("reasoning_pending", False):
+            # Single-call and speculative steps reason before they answer
+            frame = sse_event("reasoning", {"status": "completed"}) + frame
+        return frame
+    if payload in reasoning_steps:
+        if event == "start":
+            pipeline_context.extra["reasoning_pending"] = True
+            return sse_event("reasoning", {"status": "started"})
+        if pipeline_context.extra.pop("reasoning_pending", False):
+            return sse_event("reasoning", {"status": "completed"})
+    if event == "end" and (payload == "retrieve" or pipeline_context.halted):
+        return sse_event("retrieval", {
+            "context": pipeline_context.context_text,
+            "images": pipeline_context.images,
+        })
+    return None
+
+
+def persist_chat_results(chat_instance, pipeline_context):
+    """Save RagData/SearchLog rows and the answer; return serializer errors if any."""
+    rag_metadata = pipeline_context.extra.get("rag_metadata", {})
+    rag_data = {
+        "data_text": pipeline_context.context_text,
+        "image_urls": rag_metadata.get("image_paths", pipeline_context.images),
+    }
+    rag_serializer = RagDataSerializer(data=rag_data)
+    if not rag_serializer.is_valid():
+        return rag_serializer.errors
+    rag_instance = rag_serializer.save()
+
+    chat_instance.data_id = rag_instance.data_id
+    chat_instance.response_text = pipeline_context.response or ""
+    chat_instance.save()
+
+    search_log_data = {
+        "data": rag_instance.data_id,
+        "question": chat_instance.question_id
+    }
+    search_log_serializer = SearchLogSerializer(data=search_log_data)
+    if search_log_serializer.is_valid():
+        search_log_serializer.save()
+    else:
+        logger.warning(f"Failed to save search log: {search_log_serializer.errors}")
+    return None
+
+
 class ChatAPIView(APIView):
     throttle_classes = [ChatRateThrottle]
-        
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
+
+    # Model/color/storage named in the question narrow the vector search
+    RETRIEVE_CONFIG = {"auto_filters": True}
+
+    PIPELINE_STEPS = [
+        {"type": "router"},
+        {"type": "retrieve", "config": RETRIEVE_CONFIG},
+        {"type": "reasoning"},
+        {"type": "generation"},
+    ]
+    # Evidence and answer in one model call; complex questions still use two
+    SINGLE_CALL_PIPELINE_STEPS = [
+        {"type": "router"},
+        {"type": "retrieve", "config": RETRIEVE_CONFIG},
+        {"type": "answer"},
+    ]
+    # Reasoning and a draft answer in parallel, bounded by PIPELINE_LATENCY_BUDGET_MS
+    SPECULATIVE_PIPELINE_STEPS = [
+        {"type": "router"},
+        {"type": "retrieve", "config": RETRIEVE_CONFIG},
+        {"type": "speculative"},
+    ]
+
+    @staticmethod
+    def answer_mode() -> str:
+        """``PIPELINE_ANSWER_MODE``: ``two_call`` (default), ``single_call`` or ``speculative``."""
+        return os.getenv("PIPELINE_ANSWER_MODE", "two_call").lower()
+
+    @classmethod
+    def pipeline_steps(cls):
+        """Steps for the configured ``PIPELINE_ANSWER_MODE``."""
+        mode = cls.answer_mode()
+        if mode == "single_call":
+            return cls.SINGLE_CALL_PIPELINE_STEPS
+        if mode == "speculative":
+            return cls.SPECULATIVE_PIPELINE_STEPS
+        return cls.PIPELINE_STEPS
+
+    def _wants_stream(self, request) -> bool:
+        return "text/event-stream" in request.META.get("HTTP_ACCEPT", "")
+
+    def _wants_timings(self, request) -> bool:
+        """Expose stage timings when enabled globally or requested in DEBUG."""
+        if os.getenv("PIPELINE_TIMING_HEADER", "false").lower() in {"1", "true", "yes", "on"}:
+            return True
+        return settings.DEBUG and request.META.get("HTTP_X_DEBUG_TIMINGS") == "1"
+
+    def _lookup_semantic_cache(self, question, user_id, filters=None):
+        """Return ``(cached_entry, selection, index_version)`` for the question.
+
+        Requests with explicit search filters bypass the cache.
+        """
+        if not semantic_cache.is_enabled() or filters:
+            return None, None, None
+        selection = provider_manager.get_active_selection(user_id)
+        index_version = semantic_cache.current_index_version()
+        try:
+            cached = semantic_cache.lookup(question, selection, index_version)
+        except Exception as exc:
+            logger.warning(f"Semantic cache lookup failed: {exc}")
+            cached = None
+        return cached, selection, index_version
+
+    def _apply_cached(self, pipeline_context, cached, history):
+        pipeline_context.context_text = cached.get("context", "")
+        pipeline_context.images = cached.get("images", [])
+        pipeline_context.response = cached.get("response", "")
+        pipeline_context.extra["rag_metadata"] = {"image_paths": cached.get("image_paths", [])}
+        history.add_message(HumanMessage(content=pipeline_context.question))
+        history.add_message(AIMessage(content=pipeline_context.response))
+
+    def _store_semantic_cache(self, pipeline_context, selection, index_version):
+        if not semantic_cache.is_enabled() or not pipeline_context.response:
+            return
+        if pipeline_context.extra.get("route") == "catalogue" or pipeline_context.extra.get("filters"):
+            # Catalogue answers are cheaper to recompute than to look up, and
+            # filtered answers must not be served for unfiltered questions
+            return
+        try:
+            semantic_cache.store(
+                pipeline_context.question,
+                selection,
+                {
+                    "response": pipeline_context.response,
+                    "context": pipeline_context.context_text,
+                    "images": pipeline_context.images,
+                    "image_paths": pipeline_context.extra.get("rag_metadata", {}).get("image_paths", []),
+                },
+                index_version,
+            )
+        except Exception as exc:
+            logger.warning(f"Semantic cache store failed: {exc}")
+
+    def _stream_events(self, chat_instance, pipeline_context, history):
+        """Yield SSE frames: retrieval → reasoning status → tokens → done.
+
+        Database rows are written once generation has finished.
+        """
+        try:
+            cached, selection, index_version = self._lookup_semantic_cache(
+                pipeline_context.question, pipeline_context.user_id, pipeline_context.extra.get("filters")
+            )
+            if cached:
+                self._apply_cached(pipeline_context, cached, history)
+                yield sse_event("retrieval", {
+                    "context": pipeline_context.context_text,
+                    "images": pipeline_context.images,
+                })
+                yield sse_event("token", {"text": pipeline_context.response})
+            else:
+                runner = PipelineRunner(self.pipeline_steps())
+                reasoning_steps = runner.steps_providing("reasoning")
+                for event, payload in runner.stream(pipeline_context):
+                    frame = pipeline_event_frame(pipeline_context, event, payload, reasoning_steps)
+                    if frame:
+                        yield frame
+
+                self._store_semantic_cache(pipeline_context, selection, index_version)
+
+            errors = persist_chat_results(chat_instance, pipeline_context)
+            if errors:
+                yield sse_event("error", errors)
+                return
+
+            yield sse_event("done", {
+                "chat_id": chat_instance.question_id,
+                "images": pipeline_context.images,
+                "cached": bool(cached),
+            })
+        except ModuleError as exc:
+            logger.error(f"Streaming pipeline failed: {exc}")
+            yield sse_event("error", {"error": "죄송합니다. 컨텍스트 생성 중 오류가 발생했습니다."})
+        except Exception as e:
+            logger.error(f"LLM provider error: {str(e)}")
+            yield sse_event("error", {"error": "죄송합니다. 서비스 처리 중 오류가 발생했습니다."})
+
+    async def _astream_events(self, chat_instance, pipeline_context, history):
+        """Async variant of :meth:`_stream_events` used when served over ASGI.
+
+        Django 4.2 buffers a synchronous streaming iterator completely under
+        ASGI, so tokens would only arrive once the answer is finished; frames
+        from this generator are sent as they are produced. ORM and Redis work
+        runs through ``sync_to_async``.
+        """
+        try:
+            cached, selection, index_version = await sync_to_async(self._lookup_semantic_cache)(
+                pipeline_context.question, pipeline_context.user_id, pipeline_context.extra.get("filters")
+            )
+            if cached:
+                await sync_to_async(self._apply_cached)(pipeline_context, cached, history)
+                yield sse_event("retrieval", {
+                    "context": pipeline_context.context_text,
+                    "images": pipeline_context.images,
+                })
+                yield sse_event("token", {"text": pipeline_context.response})
+            else:
+                runner = PipelineRunner(self.pipeline_steps())
+                reasoning_steps = runner.steps_providing("reasoning")
+                async for event, payload in runner.astream(pipeline_context):
+                    frame = pipeline_event_frame(pipeline_context, event, payload, reasoning_steps)
+                    if frame:
+                        yield frame
+
+                await sync_to_async(self._store_semantic_cache)(pipeline_context, selection, index_version)
+
+            errors = await sync_to_async(persist_chat_results)(chat_instance, pipeline_context)
+            if errors:
+                yield sse_event("error", errors)
+                return
+
+            yield sse_event("done", {
+                "chat_id": chat_instance.question_id,
+                "images": pipeline_context.images,
+                "cached": bool(cached),
+            })
+        except ModuleError as exc:
+            logger.error(f"Streaming pipeline failed: {exc}")
+            yield sse_event("error", {"error": "죄송합니다. 컨텍스트 생성 중 오류가 발생했습니다."})
+        except Exception as e:
+            logger.error(f"LLM provider error: {str(e)}")
+            yield sse_event("error", {"error": "죄송합니다. 서비스 처리 중 오류가 발생했습니다."})
+
     def post(self, request):
         try:
             question = request.data.get("question")
@@ -111,6 +384,14 @@ class ChatAPIView(APIView):
                     {"error": "사용자 ID가 필요합니다."},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+
+            try:
+                filters = normalize_filters(request.data.get("filters"))
+            except ValueError as exc:
+                return Response(
+                    {"error": f"잘못된 검색 필터입니다: {exc}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
                 
             # Question Data Save
             chat_data = {
@@ -132,58 +413,52 @@ class ChatAPIView(APIView):
                 user_id=user_id,
                 history_handler=history_session_handler,
                 history=history,
+                extra={"filters": filters} if filters else {},
             )
 
-            pipeline = PipelineRunner(
-                [
-                    {"type": "retrieve"},
-                    {"type": "reasoning"},
-                    {"type": "generation"},
-                ]
-            )
+            if self._wants_stream(request):
+                if isinstance(request._request, ASGIRequest):
+                    events = self._astream_events(chat_instance, pipeline_context, history)
+                else:
+                    events = self._stream_events(chat_instance, pipeline_context, history)
+                response = StreamingHttpResponse(events, content_type="text/event-stream")
+                response["Cache-Control"] = "no-cache"
+                response["X-Accel-Buffering"] = "no"
+                return response
 
-            try:
-                pipeline_context = pipeline.run(pipeline_context)
-            except ModuleError as exc:
-                logger.error(f"Pipeline execution failed: {exc}")
-                return Response(
-                    {"error": "죄송합니다. 컨텍스트 생성 중 오류가 발생했습니다."},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
+            cached, selection, index_version = self._lookup_semantic_cache(question, user_id, filters)
+            if cached:
+                self._apply_cached(pipeline_context, cached, history)
+            else:
+                pipeline = PipelineRunner(self.pipeline_steps())
 
-            rag_metadata = pipeline_context.extra.get("rag_metadata", {})
-            rag_data = {
-                "data_text": pipeline_context.context_text,
-                "image_urls": rag_metadata.get("image_paths", pipeline_context.images),
-            }
-            rag_serializer = RagDataSerializer(data=rag_data)
-            if not rag_serializer.is_valid():
+                try:
+                    pipeline_context = pipeline.run(pipeline_context)
+                except ModuleError as exc:
+                    logger.error(f"Pipeline execution failed: {exc}")
+                    return Response(
+                        {"error": "죄송합니다. 컨텍스트 생성 중 오류가 발생했습니다."},
+                        status=status.HTTP_500_INTERNAL_SERVER_ERROR
+                    )
+
+                self._store_semantic_cache(pipeline_context, selection, index_version)
+
+            errors = persist_chat_results(chat_instance, pipeline_context)
+            if errors:
                 return Response(
-                    rag_serializer.errors,
+                    errors,
                     status=status.HTTP_400_BAD_REQUEST
                 )
-            rag_instance = rag_serializer.save()
 
-            response_text = pipeline_context.response or ""
-            chat_instance.data_id = rag_instance.data_id
-            chat_instance.response_text = response_text
-            chat_instance.save()
-
-            search_log_data = {
-                "data": rag_instance.data_id,
-                "question": chat_instance.question_id
-            }
-            search_log_serializer = SearchLogSerializer(data=search_log_data)
-            if search_log_serializer.is_valid():
-                search_log_serializer.save()
-            else:
-                logger.warning(f"Failed to save search log: {search_log_serializer.errors}")
-
-            return Response({
-                "response": response_text,
+            response = Response({
+                "response": pipeline_context.response or "",
                 "chat_id": chat_instance.question_id,
-                "images": pipeline_context.images
+                "images": pipeline_context.images,
+                "cached": bool(cached),
             }, status=status.HTTP_200_OK)
+            if self._wants_timings(request) and pipeline_context.extra.get("timings"):
+                response["Server-Timing"] = server_timing_header(pipeline_context)
+            return response
                 
         except Exception as e:
             logger.error(f"LLM provider error: {str(e)}")
@@ -192,7 +467,166 @@ class ChatAPIView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+
+class ChatStreamAPIView(ChatAPIView):
+    """Streaming variant of :class:`ChatAPIView` that always answers with SSE."""
+
+    renderer_classes = [EventStreamRenderer, *api_settings.DEFAULT_RENDERER_CLASSES]
+
+    def _wants_stream(self, request) -> bool:
+        return True
+
+
+class ChatAsyncView(View):
+    """ASGI-native chat endpoint.
+
+    The pipeline is awaited through ``PipelineRunner.arun`` so an ASGI worker
+    can serve many I/O-bound chats concurrently; ORM and Redis work is
+    delegated to ``sync_to_async``. The semantic cache and the
+    ``Server-Timing`` header behave as in :class:`ChatAPIView`.
+    """
+
+    pipeline_steps = ChatAPIView.pipeline_steps
+    _wants_timings = ChatAPIView._wants_timings
+    _lookup_semantic_cache = ChatAPIView._lookup_semantic_cache
+    _apply_cached = ChatAPIView._apply_cached
+    _store_semantic_cache = ChatAPIView._store_semantic_cache
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Match APIView: clients authenticate with user_id, not CSRF cookies
+        view.csrf_exempt = True
+        return view
+
+    async def post(self, request):
+        try:
+            try:
+                payload = json.loads(request.body or b"{}")
+            except json.JSONDecodeError:
+                return JsonResponse({"error": "잘못된 JSON 형식입니다."}, status=400)
+
+            question = payload.get("question")
+            if not question:
+                return JsonResponse({"error": "질문을 입력해주세요."}, status=400)
+
+            user_id = payload.get("user_id")
+            if not user_id:
+                return JsonResponse({"error": "사용자 ID가 필요합니다."}, status=400)
+
+            try:
+                filters = normalize_filters(payload.get("filters"))
+            except ValueError as exc:
+                return JsonResponse({"error": f"잘못된 검색 필터입니다: {exc}"}, status=400)
+
+            chat_serializer = ChatSerializer(data={"user": user_id, "question_text": question})
+            if not await sync_to_async(chat_serializer.is_valid)():
+                return JsonResponse(chat_serializer.errors, status=400)
+            chat_instance = await sync_to_async(chat_serializer.save)()
+
+            history = history_session_handler(user_id)
+            pipeline_context = ModuleContext(
+                question=question,
+                session_id=user_id,
+                user_id=user_id,
+                history_handler=history_session_handler,
+                history=history,
+                extra={"filters": filters} if filters else {},
+            )
+
+            cached, selection, index_version = await sync_to_async(self._lookup_semantic_cache)(
+                question, user_id, filters
+            )
+            if cached:
+                await sync_to_async(self._apply_cached)(pipeline_context, cached, history)
+            else:
+                try:
+                    pipeline_context = await PipelineRunner(self.pipeline_steps()).arun(pipeline_context)
+                except ModuleError as exc:
+                    logger.error(f"Async pipeline execution failed: {exc}")
+                    return JsonResponse(
+                        {"error": "죄송합니다. 컨텍스트 생성 중 오류가 발생했습니다."},
+                        status=500,
+                    )
+
+                await sync_to_async(self._store_semantic_cache)(pipeline_context, selection, index_version)
+
+            errors = await sync_to_async(persist_chat_results)(chat_instance, pipeline_context)
+            if errors:
+                return JsonResponse(errors, status=400)
+
+            response = JsonResponse({
+                "response": pipeline_context.response or "",
+                "chat_id": chat_instance.question_id,
+                "images": pipeline_context.images,
+                "cached": bool(cached),
+            }, json_dumps_params={"ensure_ascii": False})
+            if self._wants_timings(request) and pipeline_context.extra.get("timings"):
+                response["Server-Timing"] = server_timing_header(pipeline_context)
+            return response
+
+        except Exception as e:
+            logger.error(f"LLM provider error: {str(e)}")
+            return JsonResponse(
+                {"error": "죄송합니다. 서비스 처리 중 오류가 발생했습니다."},
+                status=500,
+            )
+
             
+class PipelineMetricsAPIView(APIView):
+    """Expose pipeline stage metrics in the Prometheus text format"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        body = metrics_hook.render_prometheus()
+        cache_stats = provider_manager.get_embedding_cache_stats()
+        if cache_stats:
+            body += "# TYPE embedding_cache_lookups_total counter\n"
+            for outcome in ("local_hits", "redis_hits", "misses"):
+                body += f'embedding_cache_lookups_total{{outcome="{outcome}"}} {cache_stats[outcome]}\n'
+        pool_stats = RedisConnectionManager.get_instance().get_pool_stats()
+        if pool_stats:
+            body += "# TYPE redis_pool_connections gauge\n"
+            for name in ("in_use", "peak_in_use", "max_connections"):
+                body += f'redis_pool_connections{{state="{name}"}} {pool_stats[name]}\n'
+            body += "# TYPE redis_pool_events_total counter\n"
+            for name in ("checkouts", "waits", "exhausted"):
+                body += f'redis_pool_events_total{{event="{name}"}} {pool_stats[name]}\n'
+        provider_health = provider_manager.get_provider_health()
+        circuits = {name: state["circuit"] for name, state in provider_health.items() if state["circuit"]}
+        if circuits:
+            body += "# TYPE chat_provider_circuit_open gauge\n"
+            for name, circuit in circuits.items():
+                body += f'chat_provider_circuit_open{{provider="{name}"}} {int(circuit["state"] != "closed")}\n'
+        rejections = [
+            (name, source, state[source]["rejections"])
+            for name, state in provider_health.items()
+            for source in ("circuit", "bulkhead")
+            if state[source]
+        ]
+        if rejections:
+            body += "# TYPE chat_provider_rejections_total counter\n"
+            for name, source, count in rejections:
+                body += f'chat_provider_rejections_total{{provider="{name}",source="{source}"}} {count}\n'
+        return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+class ProviderHealthAPIView(APIView):
+    """Circuit breaker, bulkhead and routing state of each chat provider"""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        providers = provider_manager.get_provider_health()
+        degraded = any(
+            state["circuit"] and state["circuit"]["state"] != "closed"
+            for state in providers.values()
+        )
+        return Response({
+            "status": "degraded" if degraded else "ok",
+            "providers": providers,
+        })
+
+
 class ChatUserAPIView(APIView):
     
     def post(self, request):
@@ -393,67 +827,41 @@ class ChatRagAPIView(APIView):
     - Process CSV data (mode=1)
     - Process Excel data (mode=2)
     - Test similarity search (mode=3)
+
+    Modes 1 and 2 enqueue a Celery ingestion job and return ``202`` with its
+    ID; poll ``ingest-jobs/<job_id>/`` for progress. ``incremental: true``
+    embeds only new or changed chunks, and ``background: false`` runs the job
+    inline (useful without a Celery worker).
     """
-    
-    def _create_vector_store(self, documents, embedding_model="models/text-embedding-004"):
-        """Create and persist a vector store from documents"""
-        # Use the RAGUtils from utils.py to leverage shared code
-        return RAGUtils.create_vector_store_from_documents(documents, embedding_model)
-        
-    def _process_csv_data(self):
+
+    def _start_ingestion(self, source, incremental=False, background=True):
+        """Create an ingestion job and run it in Celery or inline"""
+        from . import ingestion
+        from .tasks import run_ingestion_job
+
+        job = ingestion.create_job(source, incremental=incremental)
+        if not background:
+            job = ingestion.run_job(job["job_id"])
+            if job["status"] == ingestion.FAILED:
+                raise RuntimeError(job.get("error", "Ingestion failed"))
+            return Response(job, status=status.HTTP_200_OK)
+
+        run_ingestion_job.delay(job["job_id"])
+        return Response(
+            {
+                **job,
+                "status_url": reverse("ingest-job", kwargs={"job_id": job["job_id"]}),
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    def _process_csv_data(self, incremental=False, background=True):
         """Process CSV data into vector store"""
-        # Load CSV documents
-        loader = CSVLoader(file_path=os.path.join(settings.BASE_DIR, "galaxy_s25_data.csv"))
-        docs = loader.load()
-        logger.info(f"CSV 로드된 문서 수: {len(docs)}")
-        
-        # Split into chunks
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        splits = text_splitter.split_documents(docs)
-        logger.info(f"청크 수: {len(splits)}")
-        
-        # Create vector store
-        self._create_vector_store(splits)
-        return Response({}, status=status.HTTP_200_OK)
-    
-    def _process_excel_data(self):
+        return self._start_ingestion("csv", incremental=incremental, background=background)
+
+    def _process_excel_data(self, incremental=False, background=True):
         """Process Excel data into vector store with image metadata"""
-        # Load Excel data
-        excel_path = os.path.join(settings.BASE_DIR, "galaxy_s25_data.xlsx")
-        sheets = pd.read_excel(excel_path, sheet_name=None, engine="openpyxl")
-        all_docs = []
-        
-        # Determine sheet with images
-        sheet_names = list(sheets.keys())
-        second_sheet_name = sheet_names[1] if len(sheet_names) > 1 else None
-        
-        # Process each sheet
-        for sheet_name, df in sheets.items():
-            for _, row in df.iterrows():
-                # Create document text
-                text = "\n".join(f"{col}: {row[col]}" for col in df.columns if pd.notna(row[col]))
-                metadata = {"sheet": sheet_name}
-                
-                # Add image path if available
-                if sheet_name == second_sheet_name and "Image Path" in df.columns:
-                    image_path = row.get("Image Path", None)
-                    if pd.notna(image_path):
-                        metadata["image_path"] = image_path
-                
-                # Create document
-                doc = Document(page_content=text, metadata=metadata)
-                all_docs.append(doc)
-        
-        logger.info(f"📌 총 문서 수: {len(all_docs)}")
-        
-        # Split into chunks
-        text_splitter = RecursiveCharacterTextSplitter(chunk_size=1000, chunk_overlap=200)
-        splits = text_splitter.split_documents(all_docs)
-        logger.info(f"📌 총 청크 수: {len(splits)}")
-        
-        # Create vector store
-        self._create_vector_store(splits)
-        return Response({}, status=status.HTTP_200_OK)
+        return self._start_ingestion("excel", incremental=incremental, background=background)
     
     def _test_similarity_search(self):
         """Test similarity search functionality"""
@@ -504,13 +912,15 @@ class ChatRagAPIView(APIView):
         try:
             # Determine mode from request data
             mode = request.data.get("mode")
+            incremental = str(request.data.get("incremental", "false")).lower() in {"1", "true", "yes"}
+            background = str(request.data.get("background", "true")).lower() in {"1", "true", "yes"}
             
             try:
                 # Process based on mode
                 if mode == 1:
-                    return self._process_csv_data()
+                    return self._process_csv_data(incremental=incremental, background=background)
                 elif mode == 2:
-                    return self._process_excel_data()
+                    return self._process_excel_data(incremental=incremental, background=background)
                 elif mode == 3:
                     return self._test_similarity_search()
                 else:
@@ -533,6 +943,30 @@ class ChatRagAPIView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
             
+class IngestionJobAPIView(APIView):
+    """
+    API view for vector ingestion job progress and cancellation
+    """
+
+    def get(self, request, job_id):
+        """Report rows parsed, chunks embedded, throughput and ETA"""
+        from . import ingestion
+
+        job = ingestion.get_job(job_id)
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job, status=status.HTTP_200_OK)
+
+    def delete(self, request, job_id):
+        """Request cancellation; the worker stops at its next progress check"""
+        from . import ingestion
+
+        job = ingestion.request_cancel(job_id)
+        if job is None:
+            return Response({"error": "Job not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job, status=status.HTTP_202_ACCEPTED)
+
+
 class SearchLogAPIView(APIView):
     """
     API view for accessing and managing search logs
@@ -65,6 +65,16 @@ REDIS_PORT = int(os.getenv('REDIS_PORT', '6379'))
 REDIS_MESSAGE_DB = 1  # Use different DB for message logs
 REDIS_MESSAGE_TTL = 60 * 60 * 24 * 7  # 7 days in seconds
 
+# Redis connection pool (shared by every RedisMessageManager user in a process)
+REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', '50'))
+REDIS_POOL_TIMEOUT = float(os.getenv('REDIS_POOL_TIMEOUT', '5'))  # seconds to wait for a free connection
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', '30'))
+
+# Chat history window sent to the generation model
+REDIS_HISTORY_WINDOW = int(os.getenv('REDIS_HISTORY_WINDOW', '50'))  # most recent messages
+REDIS_HISTORY_MAX_CHARS = int(os.getenv('REDIS_HISTORY_MAX_CHARS', '0'))  # 0 disables the budget
+REDIS_MESSAGE_MAX_LENGTH = int(os.getenv('REDIS_MESSAGE_MAX_LENGTH', '0'))  # trim stored list on save; 0 keeps all
+
 # Session settings
 SESSION_TIMEOUT = int(os.getenv('SESSION_TIMEOUT', '300'))  # Default: 5 minutes
 
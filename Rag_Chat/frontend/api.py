@@ -12,18 +12,40 @@ logger = logging.getLogger(__name__)
 
 # Use consistent API URL format between frontend and backend
 API_BASE_URL = os.getenv("BACKEND_URL", "http://localhost:8000") + "/api/v1/triple"
-def load_phone_data():
+def load_phone_data(progress_callback=None, poll_interval=1.0, timeout=1800):
     """
-    Call the backend to load and process the phone data from xlsx file.
+    Start the backend ingestion job for the phone data xlsx file and wait for it.
+    The backend returns a job ID right away; progress is polled from the job
+    status endpoint and passed to progress_callback(job) when given.
     Returns True if successful, False otherwise.
     """
     try:
         response = requests.post(
             f"{API_BASE_URL}/chat-rag/",
-            json={"mode": 2}  # mode 2 for xlsx processing
+            json={"mode": 2},  # mode 2 for xlsx processing
+            timeout=30
         )
         response.raise_for_status()
-        return response.status_code == 200
+        job = response.json()
+        if response.status_code == 200:
+            return job.get("status", "completed") == "completed"
+
+        status_url = f"{API_BASE_URL}/ingest-jobs/{job['job_id']}/"
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            status_response = requests.get(status_url, timeout=10)
+            status_response.raise_for_status()
+            job = status_response.json()
+            if progress_callback:
+                progress_callback(job)
+            if job["status"] in ("completed", "failed", "cancelled"):
+                if job["status"] == "failed":
+                    logger.error(f"Phone data ingestion failed: {job.get('error')}")
+                return job["status"] == "completed"
+            time.sleep(poll_interval)
+
+        logger.error(f"Phone data ingestion job {job['job_id']} did not finish in {timeout}s")
+        return False
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to load phone data: {e}")
         logger.error(f"Error loading phone data: {e}")
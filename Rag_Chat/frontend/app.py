@@ -272,47 +272,48 @@ def determine_provider_combo(selection: Dict[str, Any]) -> str:
         return "qwen_only"
     return "custom"
 
-def send_chat_request(prompt):
-    """Send chat request to backend API"""
+def stream_chat_request(prompt, result):
+    """Stream answer tokens from the backend SSE endpoint.
+
+    Yields text tokens for ``st.write_stream``; retrieval images, the chat id
+    and any error are written into ``result``.
+    """
+    user_id = st.session_state.get("user_id")
+    if not user_id:
+        logger.error("No user_id found in session state")
+        result["error"] = "Session not found. Please refresh the page."
+        return
+
+    request_url = f"{API_BASE_URL}/chat/stream/"
     try:
-        # Get user_id from session state
-        user_id = st.session_state.get("user_id")
-        if not user_id:
-            logger.error("No user_id found in session state")
-            st.error("Session not found. Please refresh the page.")
-            return None
-
-        # Log request details
-        logger.info(f"Sending chat request - User ID: {user_id}, Prompt: {prompt}")
-        
-        # Make the API request using the API_BASE_URL from api.py
-        request_url = f"{API_BASE_URL}/chat/"
-        logger.info(f"Making request to: {request_url}")
-        
-        response = requests.post(
+        with requests.post(
             request_url,
-            json={
-                "question": prompt,
-                "user_id": st.session_state.get("user_id", None)  # Include user_id in JSON payload
-            },
-            headers={"Content-Type": "application/json"},
-            timeout=10
-        )
-        response.raise_for_status()
-        return response.json()
+            json={"question": prompt, "user_id": user_id},
+            headers={"Accept": "text/event-stream"},
+            stream=True,
+            timeout=(5, 60),
+        ) as response:
+            response.raise_for_status()
+            event = None
+            for line in response.iter_lines(decode_unicode=True):
+                if line.startswith("event: "):
+                    event = line[len("event: "):]
+                elif line.startswith("data: "):
+                    data = json.loads(line[len("data: "):])
+                    if event == "token":
+                        yield data.get("text", "")
+                    elif event == "retrieval":
+                        result["images"] = data.get("images", [])
+                    elif event == "done":
+                        result["chat_id"] = data.get("chat_id")
+                    elif event == "error":
+                        result["error"] = data.get("error", "Failed to get response from chat service.")
     except requests.Timeout:
-        logger.error("Request timed out")
-        st.error("Request timed out. Please try again.")
-        return None
+        logger.error("Streaming request timed out")
+        result["error"] = "Request timed out. Please try again."
     except requests.RequestException as e:
-        logger.error(f"API request failed: {e}")
-        logger.error(f"Request details: URL={request_url}, user_id={user_id}")
-        st.error("Failed to get response from chat service. Please try again.")
-        return None
-    except Exception as e:
-        logger.error(f"Unexpected error: {str(e)}")
-        st.error("An unexpected error occurred. Please try again.")
-        return None
+        logger.error(f"Streaming API request failed: {e}")
+        result["error"] = "Failed to get response from chat service. Please try again."
 
 # Initialize session state
 init_session()
@@ -400,11 +401,11 @@ def check_session_timeout():
         
     return True
 
-def load_phone_data():
+def load_phone_data(progress_callback=None):
     """Load phone data from backend"""
     try:
         from api import load_phone_data as api_load_phone_data
-        return api_load_phone_data()
+        return api_load_phone_data(progress_callback=progress_callback)
     except Exception as e:
         logger.error(f"Failed to load phone data: {e}")
         return False
@@ -422,8 +423,17 @@ else:
 st.sidebar.markdown("---")
 st.sidebar.markdown("### Admin Controls")
 if st.sidebar.button("Load Phone Data"):
-    with st.sidebar.status("Loading phone data..."):
-        if load_phone_data():
+    with st.sidebar.status("Loading phone data...") as load_status:
+        def show_ingestion_progress(job):
+            eta = f", ETA {job['eta_seconds']}s" if job.get("eta_seconds") is not None else ""
+            load_status.update(
+                label=(
+                    f"{job['status'].capitalize()}: {job.get('chunks_embedded', 0)}/"
+                    f"{job.get('chunks_to_embed') or job.get('chunks_total', 0)} chunks embedded{eta}"
+                )
+            )
+
+        if load_phone_data(progress_callback=show_ingestion_progress):
             st.sidebar.success("Phone data loaded successfully!")
         else:
             st.sidebar.error("Failed to load phone data. Please try again.")
@@ -483,22 +493,22 @@ if not st.session_state.session_expired and st.session_state.user_id and is_sess
 
         # Get AI response
         with st.chat_message("assistant"):
-            with st.spinner("Thinking..."):
-                if response_data := send_chat_request(prompt):
-                    response = response_data.get("response", "Sorry, I couldn't process that.")
-                    images = response_data.get("images", [])
-            
-                    # Response Text
-                    st.write(response)
-                    
-                    # Response Image
-                    if images:
-                        st.write("🔹 Related Images:")
-                        for image in images:
-                            image_url = STATIC_IMAGE_URL + image + ".png"
-                            st.image(image_url, use_container_width=True)
-                    
-                    st.session_state.messages.append({"role": "assistant", "content": response})
+            stream_result = {}
+            # Response Text (streamed token by token)
+            response = st.write_stream(stream_chat_request(prompt, stream_result))
+            images = stream_result.get("images", [])
+
+            if stream_result.get("error"):
+                st.error(stream_result["error"])
+            else:
+                # Response Image
+                if images:
+                    st.write("🔹 Related Images:")
+                    for image in images:
+                        image_url = STATIC_IMAGE_URL + image + ".png"
+                        st.image(image_url, use_container_width=True)
+
+                st.session_state.messages.append({"role": "assistant", "content": response})
 
 else:
     st.warning("Your session has expired. Please refresh the page to start a new session.")